@@ -8,15 +8,81 @@ class Settings(BaseSettings):
     fuseki_dataset:  str = Field(..., alias="FUSEKI_DATASET")
     fuseki_user:     str = Field(..., alias="FUSEKI_USER")
     fuseki_password: str = Field(..., alias="FUSEKI_PASSWORD")
+    # SELECT-Credentials: auto (je Endpoint lernen), preemptive (immer senden), none (nie); Updates immer mit
+    fuseki_auth_mode:         str   = Field("auto", alias="FUSEKI_AUTH_MODE")
+    # http (Fuseki unter FUSEKI_BASE_URL) | embedded (rdflib-Dataset im Prozess, geladen aus EMBEDDED_DATA)
+    fuseki_backend:           str   = Field("http", alias="FUSEKI_BACKEND")
+    embedded_data:            str   = Field("vendor/pfarrerdaten", alias="EMBEDDED_DATA")  # Dateien/Verzeichnisse, kommagetrennt
+    # HTTP-Pool zu Fuseki (Verbindungen, Keep-Alive) und Timeouts je Operation (Sekunden)
+    fuseki_pool_size:         int   = Field(20, alias="FUSEKI_POOL_SIZE")
+    fuseki_keepalive:         int   = Field(10, alias="FUSEKI_KEEPALIVE")
+    fuseki_keepalive_expiry:  float = Field(30.0, alias="FUSEKI_KEEPALIVE_EXPIRY")
+    fuseki_connect_timeout:   float = Field(5.0, alias="FUSEKI_CONNECT_TIMEOUT")
+    fuseki_select_timeout:    float = Field(60.0, alias="FUSEKI_SELECT_TIMEOUT")
+    fuseki_update_timeout:    float = Field(60.0, alias="FUSEKI_UPDATE_TIMEOUT")
+    # Circuit Breaker: offen nach N Fehlern bzw. zu langsamen Aufrufen (ms, 0 = aus), Probe nach S Sekunden
+    fuseki_breaker_failures:     int   = Field(5, alias="FUSEKI_BREAKER_FAILURES")
+    fuseki_breaker_slow_ms:      int   = Field(15000, alias="FUSEKI_BREAKER_SLOW_MS")
+    fuseki_breaker_open_seconds: float = Field(30.0, alias="FUSEKI_BREAKER_OPEN_SECONDS")
+    # Wiederholungen lesender Zugriffe (Backoff mit Jitter) und Hedging für SELECTs (Verzögerung >= p95)
+    fuseki_retries:          int  = Field(2, alias="FUSEKI_RETRIES")
+    fuseki_retry_backoff_ms: int  = Field(100, alias="FUSEKI_RETRY_BACKOFF_MS")
+    fuseki_hedge:            bool = Field(False, alias="FUSEKI_HEDGE")
+    fuseki_hedge_min_ms:     int  = Field(50, alias="FUSEKI_HEDGE_MIN_MS")
 
     # LLM
     openai_api_key:        str = Field(..., alias="OPENAI_API_KEY")
     llm_model:             str = Field("gpt-4.1-mini", alias="LLM_MODEL")
     llm_temperature:       float = Field(0.2, alias="LLM_TEMPERATURE")
     llm_max_output_tokens: int = Field(1200, alias="LLM_MAX_OUTPUT_TOKENS")
+    llm_base_url:          str = Field("", alias="LLM_BASE_URL")  # leer = OpenAI-Default
+    llm_backend:           str = Field("openai", alias="LLM_BACKEND")  # openai | openai_compat | template
+    llm_template_latency_ms: float = Field(0.0, alias="LLM_TEMPLATE_LATENCY_MS")
+
+    # Spekulative Kandidaten: N parallele LLM-Entwürfe, der erste valide gewinnt (1 = aus)
+    gen_candidates:            int = Field(1, alias="GEN_CANDIDATES")
+    gen_candidates_max:        int = Field(4, alias="GEN_CANDIDATES_MAX")
+    gen_candidate_temperature: float = Field(0.7, alias="GEN_CANDIDATE_TEMPERATURE")  # für Kandidat 2..N
+
+    # Batch-Generierung
+    gen_batch_concurrency: int = Field(4, alias="GEN_BATCH_CONCURRENCY")
+    gen_batch_max_items:   int = Field(100, alias="GEN_BATCH_MAX_ITEMS")
+
+    # Prompt: Auswahl relevanter Ontologie-Terme
+    prompt_term_budget_tokens: int = Field(600, alias="PROMPT_TERM_BUDGET_TOKENS")
+    prompt_max_classes:        int = Field(120, alias="PROMPT_MAX_CLASSES")
+    prompt_max_properties:     int = Field(200, alias="PROMPT_MAX_PROPERTIES")
+
+    # Cache validierter Generierungen (0 = aus)
+    gen_cache_max_entries: int = Field(256, alias="GEN_CACHE_MAX_ENTRIES")
+    gen_cache_ttl_seconds: int = Field(3600, alias="GEN_CACHE_TTL_SECONDS")
+    # Schutz für /nl2sparql/select: LIMIT ergänzen/begrenzen (0 = aus), Server-Timeout, Lese-Obergrenzen
+    select_default_limit:   int   = Field(1000, alias="SELECT_DEFAULT_LIMIT")
+    select_max_limit:       int   = Field(10000, alias="SELECT_MAX_LIMIT")
+    select_timeout_seconds: float = Field(30.0, alias="SELECT_TIMEOUT_SECONDS")
+    select_max_rows:        int   = Field(10000, alias="SELECT_MAX_ROWS")
+    select_max_bytes:       int   = Field(20_000_000, alias="SELECT_MAX_BYTES")
+    # Cache für SELECT-Ergebnisse lesender Endpoints (0 = aus); Updates machen ihn ungültig
+    select_cache_max_entries:     int = Field(512, alias="SELECT_CACHE_MAX_ENTRIES")
+    select_cache_ttl_seconds:     int = Field(300, alias="SELECT_CACHE_TTL_SECONDS")
+    select_cache_max_entry_bytes: int = Field(1_000_000, alias="SELECT_CACHE_MAX_ENTRY_BYTES")
+
+    # Perf-Log: Queue/Batches des Hintergrund-Schreibers, Aufbewahrung der Segmente (0 = unbegrenzt)
+    perf_log_queue_size:     int = Field(10000, alias="PERF_LOG_QUEUE_SIZE")
+    perf_log_batch_size:     int = Field(256, alias="PERF_LOG_BATCH_SIZE")
+    perf_log_flush_ms:       int = Field(200, alias="PERF_LOG_FLUSH_MS")
+    perf_log_retention_days: int = Field(30, alias="PERF_LOG_RETENTION_DAYS")
+    # Perf- und Change-Log: Segmentlänge, geschlossene Segmente komprimieren
+    log_segment_minutes: int  = Field(60, alias="LOG_SEGMENT_MINUTES")
+    log_segment_gzip:    bool = Field(False, alias="LOG_SEGMENT_GZIP")
 
     changes_graph: str = Field("urn:nl2sparql:changes", alias="CHANGES_GRAPH")
 
+    # Ontologie-Registry (Sekunden; 0 = keine periodische Prüfung, Erstladung läuft trotzdem im Hintergrund)
+    ontology_check_seconds:   int = Field(60, alias="ONTOLOGY_CHECK_SECONDS")
+    ontology_refresh_seconds: int = Field(3600, alias="ONTOLOGY_REFRESH_SECONDS")
+    ontology_retry_seconds:   int = Field(5, alias="ONTOLOGY_RETRY_SECONDS")
+
     # Security & Monitoring
     api_auth_token: str = Field(..., alias="API_AUTH_TOKEN")
     rate_limit_per_minute: int = Field(120, alias="RATE_LIMIT_PER_MINUTE")
@@ -1,12 +1,17 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.backend.config import get_settings
 from app.backend.routers.nl2sparql import router as nl2sparql_router
 from app.backend.routers.ontology import router as ontology_router
 from app.backend.routers.logs import router as logs_router
-from app.backend.services.validator import refresh_allowed_cache
+from app.backend.services.ontology import OntologyNotReady, registry as ontology_registry
 from app.backend.services.metrics import RequestTimingMiddleware
 from app.backend.services.security import refresh_rate_limiter
+from app.backend.services.llm import refresh_generation_cache
+from app.backend.services.llm_backends import aclose_backends
+from app.backend.services import perflog, sparql
+from app.backend.services.resilience import CircuitOpenError
 from app.backend.routers.metrics import router as metrics_router
 from app.backend.routers.kps import router as kps_router
 
@@ -36,12 +41,33 @@ app.include_router(kps_router)
 
 @app.get("/health")
 def health():
-    return {"ok": True}
+    return {"ok": True, "fuseki": sparql.breaker.state}
+
+@app.exception_handler(CircuitOpenError)
+async def _fuseki_unavailable(request: Request, ex: CircuitOpenError):
+    # Fail-fast statt Timeout: Client soll nach Retry-After erneut versuchen
+    return JSONResponse(status_code=503, content={"detail": str(ex)},
+                        headers={"Retry-After": str(max(1, round(ex.retry_after)))})
+
+@app.exception_handler(OntologyNotReady)
+async def _ontology_loading(request: Request, ex: OntologyNotReady):
+    # erster Ladevorgang läuft noch: lieber 503 als Antworten ohne Vokabular
+    return JSONResponse(status_code=503, content={"detail": str(ex)},
+                        headers={"Retry-After": str(max(1, round(ex.retry_after)))})
 
 @app.on_event("startup")
 def _startup():
-    refresh_allowed_cache()
+    ontology_registry.start()
     refresh_rate_limiter()
+    refresh_generation_cache()
+    sparql.refresh_select_cache()
+
+@app.on_event("shutdown")
+async def _shutdown():
+    ontology_registry.stop()
+    await aclose_backends()
+    await sparql.aclose()
+    perflog.close()  # restliche Perf-Events schreiben
 
 app.add_middleware(RequestTimingMiddleware)
 app.include_router(metrics_router)
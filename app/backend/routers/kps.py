@@ -8,7 +8,7 @@ KPS_GRAPH = "http://meta-pfarrerbuch.evangelische-archive.de/data/kps/"
 
 
 @router.get("/sample")
-def sample_select():
+async def sample_select():
     query = f"""
     PREFIX voc:<http://meta-pfarrerbuch.evangelische-archive.de/vocabulary#>
     PREFIX rdfs:<http://www.w3.org/2000/01/rdf-schema#>
@@ -22,4 +22,4 @@ def sample_select():
     }}
     LIMIT 10
     """
-    return sparql.query_select(query)
+    return await sparql.aquery_select(query, cache=True)
@@ -1,8 +1,10 @@
 # app/backend/routers/logs.py
-from fastapi import APIRouter, Query, Depends
-import json, os
-from app.backend.services.pseudonymizer import mask_log_record  
+from fastapi import APIRouter, HTTPException, Query, Depends
+from typing import Optional
+from app.backend.services import changelog
+from app.backend.services.pseudonymizer import mask_log_record
 from app.backend.services.security import rate_limit_dependency
+from app.backend.services.segments import parse_ts
 
 router = APIRouter(
     prefix="/logs",
@@ -10,22 +12,37 @@ router = APIRouter(
     dependencies=[Depends(rate_limit_dependency)],
 )
 
-LOG_PATH = "app/backend/logs/changes.jsonl"
+
+def _time(name: str, value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    t = parse_ts(value)
+    if t is None:
+        raise HTTPException(status_code=400, detail=f"{name}: ISO-Zeitstempel erwartet, z. B. 2026-10-18T14:00:00Z")
+    return t
+
 
 @router.get("/recent")
-def recent_logs(limit: int = Query(50, ge=1, le=500)):
-    if not os.path.exists(LOG_PATH):
-        return {"items": []}
+def recent_logs(
+    limit: int = Query(50, ge=1, le=500),
+    before: Optional[str] = Query(None, description="Cursor `next_before` der vorigen Seite"),
+    status: Optional[str] = Query(None, description="kommagetrennt: applied, failed, undo_applied, undo_failed"),
+    since: Optional[str] = Query(None, description="ISO-Zeitstempel (inklusive)"),
+    until: Optional[str] = Query(None, description="ISO-Zeitstempel (inklusive)"),
+):
+    # vom Ende her gelesen: nur so viele Blöcke/Segmente wie für eine Seite nötig
+    statuses = [s.strip() for s in status.split(",") if s.strip()] if status else None
+    if statuses and any(s not in changelog.STATUSES for s in statuses):
+        raise HTTPException(status_code=400, detail=f"status: erlaubt sind {', '.join(changelog.STATUSES)}")
+    try:
+        recs, next_before = changelog.page(
+            limit, before=before, statuses=statuses, since=_time("since", since), until=_time("until", until))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="before: ungültiger Cursor")
     items = []
-    with open(LOG_PATH, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                rec = json.loads(line)
-                rec = mask_log_record(rec)         
-                items.append(rec)
-            except Exception:
-                continue
-    return {"items": items[-limit:][::-1]}
+    for rec in recs:
+        try:
+            items.append(mask_log_record(rec))
+        except Exception:
+            continue
+    return {"items": items, "next_before": next_before}
@@ -1,14 +1,9 @@
 # app/backend/routers/metrics.py
-from collections import Counter
-import datetime
-import json
-import os
-import time
-
-from fastapi import APIRouter, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends
 from fastapi.responses import Response
 from prometheus_client import CONTENT_TYPE_LATEST
 
+from app.backend.services import perfstats
 from app.backend.services.monitoring import prometheus_latest
 from app.backend.services.security import rate_limit_dependency
 
@@ -18,69 +13,46 @@ router = APIRouter(
     dependencies=[Depends(rate_limit_dependency)],
 )
 
-PERF_FILE = os.getenv("PERF_LOG_FILE", "app/backend/logs/perf.jsonl")
-
-def _read_rows(minutes: int):
-    cutoff = time.time() - minutes * 60
-    rows = []
-    if not os.path.exists(PERF_FILE):
-        return rows
-    with open(PERF_FILE, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                row = json.loads(line)
-            except Exception:
-                continue
-            ts = row.get("ts")
-            try:
-                t = datetime.datetime.strptime(ts, "%Y-%m-%dT%H:%M:%SZ").replace(
-                    tzinfo=datetime.timezone.utc
-                ).timestamp()
-            except Exception:
-                continue
-            if t >= cutoff:
-                rows.append(row)
-    return rows
-
-def _stats(durs):
-    if not durs:
-        return {"n": 0, "p50_ms": 0, "p95_ms": 0, "max_ms": 0}
-    d = sorted(durs)
-    def pct(p: float):
-        k = (len(d) - 1) * p
-        i = int(k)
-        j = min(i + 1, len(d) - 1)
-        val = d[i] if i == j else d[i] + (d[j] - d[i]) * (k - i)
-        return round(val, 1)
-    return {
-        "n": len(d),
-        "p50_ms": pct(0.50),
-        "p95_ms": pct(0.95),
-        "max_ms": round(d[-1], 1),
-    }
+def _quantiles(raw: str) -> list:
+    try:
+        qs = sorted({float(q) for q in raw.split(",") if q.strip()})
+    except ValueError:
+        qs = []
+    if not qs or any(not 0 < q < 1 for q in qs):
+        raise HTTPException(status_code=400, detail="quantiles: kommagetrennte Werte zwischen 0 und 1, z. B. 0.5,0.99")
+    return qs
 
 @router.get("/perf")
-def perf(minutes: int = Query(60, ge=1, le=1440)):
-    rows = _read_rows(minutes)
-    http_durs = [r.get("dur_ms") for r in rows if r.get("kind") == "http" and isinstance(r.get("dur_ms"), (int, float))]
-    sel_durs  = [r.get("dur_ms") for r in rows if r.get("kind") == "fuseki" and r.get("op") == "select" and isinstance(r.get("dur_ms"), (int, float))]
-    upd_durs  = [r.get("dur_ms") for r in rows if r.get("kind") == "fuseki" and r.get("op") == "update" and isinstance(r.get("dur_ms"), (int, float))]
-
-    paths = Counter([r.get("path") for r in rows if r.get("kind") == "http" and r.get("path")])
-    top_http_paths = [{"path": p, "count": c} for p, c in paths.most_common(10)]
-
-    return {
+def perf(
+    minutes: int = Query(60, ge=1, le=perfstats.RETENTION_MINUTES),
+    quantiles: str = Query("0.5,0.95,0.99,0.999"),
+    breakdown: bool = Query(False, description="zusätzlich Statistik je HTTP-Pfad und je Operation"),
+):
+    """Latenzen aus dem rollierenden In-Memory-Aggregat (Minuten-Buckets); perf.jsonl bleibt nur Audit-Log."""
+    qs = _quantiles(quantiles)
+    window = perfstats.aggregator.window(minutes)
+    http = {path: s for (kind, path), s in window.items() if kind == "http"}
+    empty = perfstats.Sketch()
+
+    out = {
         "window_minutes": minutes,
-        "http": _stats(http_durs),
+        "http": perfstats.stats(perfstats.merge(http.values()), qs),
         "fuseki": {
-            "select": _stats(sel_durs),
-            "update": _stats(upd_durs),
+            "select": perfstats.stats(window.get(("fuseki", "select"), empty), qs),
+            "update": perfstats.stats(window.get(("fuseki", "update"), empty), qs),
         },
-        "top_http_paths": top_http_paths,
+        "top_http_paths": [
+            {"path": p, "count": s.n} for p, s in sorted(http.items(), key=lambda kv: (-kv[1].n, kv[0]))[:10]
+        ],
     }
+    if breakdown:
+        out["paths"] = {p: perfstats.stats(s, qs) for p, s in sorted(http.items())}
+        ops: dict = {}
+        for (kind, op), s in sorted(window.items()):
+            if kind != "http":
+                ops.setdefault(kind, {})[op] = perfstats.stats(s, qs)
+        out["ops"] = ops
+    return out
 
 
 @router.get("/prometheus", include_in_schema=False)
@@ -1,15 +1,21 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+import contextlib
 import re
 from uuid import uuid4
 from time import time
 from typing import Optional
 
-from app.backend.services import sparql
+from app.backend.services import ontology, sparql
 from app.backend.services.validator import validate as validate_sparql
 from app.backend.services.explain import explain_update
+from app.backend.services.sparql_analysis import analyze
+from app.backend.services.select_guard import guard_select
+from app.backend.services.resilience import CircuitOpenError
 
-from app.backend.services.llm import generate_sparql_with_guardrails
+from app.backend.services.llm import agenerate_sparql_with_guardrails, astream_sparql_with_guardrails, agenerate_batch
+from app.backend.services.llm_backends import classify_intent
 from app.backend.config import get_settings
 from app.backend.services.security import rate_limit_dependency
 
@@ -35,6 +41,11 @@ PREFIX = f"PREFIX voc:<{VOC}>\n"
 class GenerateReq(BaseModel):
     text: str
     intent: Optional[str] = None
+    candidates: Optional[int] = None  # spekulative Parallel-Entwürfe (Default: GEN_CANDIDATES)
+class GenerateBatchReq(BaseModel):
+    items: list[GenerateReq]
+    concurrency: Optional[int] = None
+    stream: bool = False
 class SelectReq(BaseModel):
     sparql: str
 
@@ -62,8 +73,7 @@ def _rehydrate_placeholders(q: str, ph: dict) -> str:
     return _RE_PH_LITERAL.sub(lambda m: ph.get(m.group(1), m.group(0)), q)
 
 def _is_update_query(q: str) -> bool:
-    U = (q or "").upper()
-    return any(k in U for k in ("INSERT", "DELETE", "UPDATE"))
+    return analyze(q or "").is_update
 
 # ----------------- Draft (bereits vorhanden) -----------------
 class DraftReq(BaseModel):
@@ -72,17 +82,7 @@ class DraftReq(BaseModel):
 
 @router.post("/draft")
 def draft(req: DraftReq):
-    t = (req.text or "").lower()
-    intent = req.intent
-    if not intent:
-        if any(k in t for k in ["füge", "hinzufügen", "insert", "neu"]):
-            intent = "insert"
-        elif any(k in t for k in ["ändere", "update", "ersetze", "korrigiere"]):
-            intent = "update"
-        elif any(k in t for k in ["lösche", "delete", "entferne"]):
-            intent = "delete"
-        else:
-            intent = "select"
+    intent = req.intent or classify_intent(req.text)
 
     if intent == "insert":
         sparql_text = PREFIX + """
@@ -145,34 +145,23 @@ class PreviewReq(BaseModel):
 
 def _ensure_changes_graph(update_q: str) -> str:
     g = get_settings().changes_graph
-
-    # INSERT DATA { ... } -> INSERT DATA { GRAPH <g> { ... } }
-    m = re.search(r'INSERT\s+DATA\s*{(.*)}\s*$', update_q, flags=re.IGNORECASE | re.DOTALL)
-    if m and "GRAPH" not in m.group(1).upper():
-        body = m.group(1).strip()
-        return re.sub(
-            r'INSERT\s+DATA\s*{.*}\s*$',
-            f'INSERT DATA {{ GRAPH <{g}> {{\n{body}\n}} }}',
-            update_q,
-            flags=re.IGNORECASE | re.DOTALL
-        )
-
-    # DELETE DATA { ... } -> DELETE DATA { GRAPH <g> { ... } }
-    m = re.search(r'DELETE\s+DATA\s*{(.*)}\s*$', update_q, flags=re.IGNORECASE | re.DOTALL)
-    if m and "GRAPH" not in m.group(1).upper():
-        body = m.group(1).strip()
-        return re.sub(
-            r'DELETE\s+DATA\s*{.*}\s*$',
-            f'DELETE DATA {{ GRAPH <{g}> {{\n{body}\n}} }}',
-            update_q,
-            flags=re.IGNORECASE | re.DOTALL
-        )
-
-    # DELETE/INSERT/WHERE -> WITH <g> prefixen (falls nicht vorhanden)
-    if re.search(r'\b(DELETE|INSERT)\b.*\bWHERE\b', update_q, flags=re.IGNORECASE) and "WITH " not in update_q.upper():
-        return f'WITH <{g}>\n{update_q}'
-
-    return update_q
+    a = analyze(update_q)
+    edits: list[tuple[int, int, str]] = []
+    for op in a.operations:
+        # INSERT DATA / DELETE DATA / DELETE WHERE { ... } -> { GRAPH <g> { ... } }
+        for b in op.blocks:
+            if b.keyword in ("INSERT DATA", "DELETE DATA", "DELETE WHERE") and not b.has_graph:
+                body = a.block_text(b).strip()
+                edits.append((b.open, b.close + 1, f'{{ GRAPH <{g}> {{\n{body}\n}} }}'))
+        # DELETE/INSERT/WHERE -> WITH <g> vor die Operation (nach dem Prolog), falls nicht vorhanden
+        templates = [b for b in op.blocks if b.keyword in ("INSERT", "DELETE")]
+        if templates and op.with_graph is None and not all(b.has_graph for b in templates):
+            edits.append((op.start, op.start, f'WITH <{g}>\n'))
+
+    out = update_q
+    for start, end, repl in sorted(edits, reverse=True):
+        out = out[:start] + repl + out[end:]
+    return out
 
 @router.post("/preview")
 def preview(req: PreviewReq):
@@ -189,7 +178,7 @@ class ExecuteReq(BaseModel):
     confirm_token: str
 
 @router.post("/execute")
-def execute(req: ExecuteReq):
+async def execute(req: ExecuteReq):
     payload = _consume_token(req.confirm_token)
     if not payload:
         raise HTTPException(status_code=400, detail="Ungültiger oder abgelaufener Bestätigungs-Token.")
@@ -213,7 +202,7 @@ def execute(req: ExecuteReq):
 
     # Ausführen + Logging
     try:
-        sparql.query_update(sparql_text_exec)
+        await sparql.aquery_update(sparql_text_exec)
         log_sparql = mask_sparql_for_log(sparql_text) if pseudo_enabled() else sparql_text
         log_undo   = mask_sparql_for_log(undo) if (pseudo_enabled() and undo) else undo
       
@@ -237,38 +226,31 @@ def execute(req: ExecuteReq):
             undo_sparql=log_undo,
             error=str(ex)
         )
+        if isinstance(ex, CircuitOpenError):
+            raise  # -> 503
         raise HTTPException(status_code=400, detail=f"Ausführung fehlgeschlagen: {ex}")
 
 
 # ----------------- Undo Helper & Logging -----------------
-import os, json, datetime, re
+import json, datetime, re
 
-LOG_DIR = "app/backend/logs"
-LOG_FILE = os.path.join(LOG_DIR, "changes.jsonl")
-os.makedirs(LOG_DIR, exist_ok=True)
+from app.backend.services import changelog
 
-def _make_undo(q: str) -> str | None:
-    # PREFIX-Zeilen einsammeln
-    prefixes = []
-    for line in (q or "").splitlines():
-        if line.strip().upper().startswith("PREFIX "):
-            prefixes.append(line)
-    prefix_block = ("\n".join(prefixes) + "\n") if prefixes else ""
-
-    # INSERT DATA -> DELETE DATA
-    m_ins = re.search(r'INSERT\s+DATA\s*{(.*)}', q, flags=re.DOTALL | re.IGNORECASE)
-    if m_ins:
-        body = m_ins.group(1).strip()
-        return f"{prefix_block}DELETE DATA {{\n{body}\n}}"
-
-    # DELETE DATA -> INSERT DATA
-    m_del = re.search(r'DELETE\s+DATA\s*{(.*)}', q, flags=re.DOTALL | re.IGNORECASE)
-    if m_del:
-        body = m_del.group(1).strip()
-        return f"{prefix_block}INSERT DATA {{\n{body}\n}}"
+_UNDO_INVERSE = {"INSERT DATA": "DELETE DATA", "DELETE DATA": "INSERT DATA"}
 
+def _make_undo(q: str) -> str | None:
+    a = analyze(q or "")
     # komplexe Updates -> kein automatisches Undo
-    return None
+    if not a.operations or any(op.kind not in _UNDO_INVERSE for op in a.operations):
+        return None
+    prefix_block = ("\n".join(a.prefix_decls) + "\n") if a.prefix_decls else ""
+
+    # INSERT DATA <-> DELETE DATA, bei mehreren Operationen in umgekehrter Reihenfolge
+    parts = []
+    for op in reversed(a.operations):
+        body = a.block_text(op.blocks[0]).strip()
+        parts.append(f"{_UNDO_INVERSE[op.kind]} {{\n{body}\n}}")
+    return prefix_block + " ;\n".join(parts)
 
 def _log_change(status: str, sparql_text: str, validation: dict, explain: dict, undo_sparql: str | None, error: str | None = None):
     rec = {
@@ -281,8 +263,7 @@ def _log_change(status: str, sparql_text: str, validation: dict, explain: dict,
         "error": error,
     }
     rec = mask_log_record(rec)  # <--- NEU: sicherheitshalber nochmals maskieren
-    with open(LOG_FILE, "a", encoding="utf-8") as f:
-        f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    changelog.append(rec)
 
 
 class UndoReq(BaseModel):
@@ -290,12 +271,12 @@ class UndoReq(BaseModel):
     log_record: Optional[dict] = None
 
 @router.post("/undo")
-def undo(req: UndoReq):
+async def undo(req: UndoReq):
     undo_q = req.undo_sparql or (req.log_record or {}).get("undo_sparql")
     if not undo_q:
         raise HTTPException(status_code=400, detail="Kein undo_sparql angegeben.")
     try:
-        sparql.query_update(undo_q)
+        await sparql.aquery_update(undo_q)
 
         log_q = mask_sparql_for_log(undo_q) if pseudo_enabled() else undo_q
 
@@ -317,17 +298,18 @@ def undo(req: UndoReq):
             undo_sparql=None,
             error=str(ex),
         )
+        if isinstance(ex, CircuitOpenError):
+            raise
         raise HTTPException(status_code=400, detail=f"Undo fehlgeschlagen: {ex}")
       
-@router.post("/generate")
-def generate(req: GenerateReq):
-    out = generate_sparql_with_guardrails(req.text, intent_hint=req.intent)
+def _finalize_generation(out: dict) -> dict:
     if not out.get("ok"):
         return {"ok": False, "reason": out.get("reason"), "sparql": out.get("sparql"), "validation": out.get("validation")}
     sparql_text = out["sparql"]
     if _is_update_query(sparql_text):
         sparql_text = _ensure_changes_graph(sparql_text)  # <--- hinzu
-    validation = validate_sparql(sparql_text)
+    # Validierung aus der Pipeline wiederverwenden, solange der Text unverändert ist
+    validation = out["validation"] if sparql_text == out["sparql"] and out.get("validation") else validate_sparql(sparql_text)
     e = explain_update(sparql_text)
     token = _new_token({
         "sparql": sparql_text,
@@ -344,14 +326,127 @@ def generate(req: GenerateReq):
         "confirm_token": token,
         "ttl_seconds": _TOKEN_TTL,
         "attempts": out.get("attempts", 1),
+        "repair": out.get("repair"),
+        "cached": out.get("cached", False),
+        "coalesced": out.get("coalesced", False),
+        "usage": out.get("usage"),
     }
 
-    
+@router.post("/generate")
+async def generate(req: GenerateReq):
+    snap = ontology.ready_snapshot()  # 503, solange die Ontologie noch lädt
+    out = await agenerate_sparql_with_guardrails(req.text, intent_hint=req.intent, candidates=req.candidates, snap=snap)
+    return _finalize_generation(out)
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@router.post("/generate/stream")
+async def generate_stream(req: GenerateReq):
+    """
+    Server-Sent Events: `token` (Text-Deltas des LLM), danach `sparql`, `validation`,
+    `explain` und `done` (Confirm-Token) – bzw. `error`, wenn die Guardrails ablehnen oder
+    der LLM-Aufruf unterwegs fehlschlägt.
+    """
+    snap = ontology.ready_snapshot()  # vor dem ersten Event, damit der Status noch 503 sein kann
+
+    async def events():
+        yield _sse("start", {"model": get_settings().llm_model})
+        out: dict = {}
+        try:
+            async with contextlib.aclosing(astream_sparql_with_guardrails(req.text, intent_hint=req.intent, snap=snap)) as stream:
+                async for kind, data in stream:
+                    if kind == "token":
+                        yield _sse("token", data)
+                    else:
+                        out = data
+        except Exception as ex:
+            yield _sse("error", {"ok": False, "reason": f"LLM-Aufruf fehlgeschlagen: {ex}"})
+            return
+        res = _finalize_generation(out)
+        if not res["ok"]:
+            yield _sse("error", res)
+            return
+        yield _sse("sparql", {"sparql": res["sparql"], "cached": res["cached"], "attempts": res["attempts"], "repair": res.get("repair")})
+        yield _sse("validation", res["validation"])
+        yield _sse("explain", res["explain"])
+        yield _sse("done", {"confirm_token": res["confirm_token"], "ttl_seconds": res["ttl_seconds"]})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post("/generate/batch")
+async def generate_batch(req: GenerateBatchReq):
+    """
+    Mehrere Texte in einem Aufruf (gemeinsamer Ontologie-Snapshot/Prompt-Präfix,
+    begrenzte Parallelität). `stream=true` liefert NDJSON in Fertigstellungsreihenfolge.
+    """
+    s = get_settings()
+    if not req.items:
+        raise HTTPException(status_code=400, detail="Keine Einträge angegeben.")
+    if len(req.items) > s.gen_batch_max_items:
+        raise HTTPException(status_code=400, detail=f"Maximal {s.gen_batch_max_items} Einträge pro Batch.")
+    concurrency = max(1, min(req.concurrency or s.gen_batch_concurrency, s.gen_batch_concurrency))
+    snap = ontology.ready_snapshot()
+    results = agenerate_batch([(it.text, it.intent) for it in req.items], concurrency, snap)
+
+    # aclosing: bei Abbruch (Client weg, Fehler) sofort die laufenden LLM-Aufrufe abbrechen, nicht erst beim GC
+    if req.stream:
+        async def lines():
+            async with contextlib.aclosing(results):
+                async for i, out in results:
+                    yield json.dumps({"index": i, **_finalize_generation(out)}, ensure_ascii=False) + "\n"
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    items: list = [None] * len(req.items)
+    async with contextlib.aclosing(results):
+        async for i, out in results:
+            items[i] = {"index": i, **_finalize_generation(out)}
+    return {"items": items, "concurrency": concurrency}
 
 @router.post("/select")
-def run_select(req: SelectReq):
+async def run_select(req: SelectReq):
+    """SELECT mit Schutz: LIMIT ergänzen/begrenzen, Fuseki-Timeout, Zeilen-/Byte-Obergrenze (`truncated`)."""
+    s = get_settings()
+    g = guard_select(req.sparql, s.select_default_limit, s.select_max_limit)
+    caps = sparql.SelectCaps(s.select_max_rows, s.select_max_bytes, s.select_timeout_seconds)
+    try:
+        data, truncated = await sparql.aquery_select_capped(g.query, caps, cache=True)
+    except CircuitOpenError:
+        raise
+    except Exception as ex:
+        raise HTTPException(status_code=400, detail=f"SELECT fehlgeschlagen: {ex}")
+    return {
+        "ok": True,
+        "results": data,
+        "truncated": truncated is not None,
+        "truncated_by": truncated,  # rows | bytes
+        "limit": {"value": g.limit, "action": g.action},
+    }
+
+@router.post("/select/stream")
+async def run_select_stream(req: SelectReq, request: Request):
+    """
+    Reicht die Fuseki-Antwort stückweise durch (für große Ergebnisse/Exporte).
+    Format per `Accept`: SPARQL-JSON (Default), `text/csv`, `text/tab-separated-values`
+    oder `application/x-ndjson` (ein Binding je Zeile). LIMIT-Guard, Server-Timeout und
+    Zeilen-/Byte-Obergrenzen wie bei `/select`; das wirksame LIMIT steht in den Headern
+    `X-Select-Limit`/`X-Select-Limit-Action`, ein Abbruch bei SPARQL-JSON in `truncated`.
+    """
+    s = get_settings()
+    g = guard_select(req.sparql, s.select_default_limit, s.select_max_limit)
+    caps = sparql.SelectCaps(s.select_max_rows, s.select_max_bytes, s.select_timeout_seconds)
+    fmt = sparql.negotiate_format(request.headers.get("accept"))
     try:
-        data = sparql.query_select(req.sparql)
-        return {"ok": True, "results": data}
+        content_type, body = await sparql.astream_select(g.query, fmt, caps)
+    except CircuitOpenError:
+        raise
     except Exception as ex:
         raise HTTPException(status_code=400, detail=f"SELECT fehlgeschlagen: {ex}")
+    headers = {"X-Select-Limit-Action": g.action}
+    if g.limit is not None:
+        headers["X-Select-Limit"] = str(g.limit)
+    return StreamingResponse(body, media_type=content_type, headers=headers)
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import json
+import os
+from collections import deque
+from typing import BinaryIO, Callable, Iterator, List, Optional, Tuple
+
+from app.backend.services.segments import Segment, SegmentedLog, parse_ts
+
+# ---------- Audit-Log der Updates (execute/undo) ----------
+# Zeitsegmente wie beim Perf-Log, aber ohne Aufbewahrungsfrist: die Einträge tragen die
+# Undo-Payloads. Ein Eintrag je Aufruf, synchron geschrieben (selten, muss sofort sichtbar sein).
+# Gelesen wird vom Ende her: Segmente neu -> alt, darin blockweise rückwärts, bis die Seite voll
+# ist – Laufzeit und Speicher hängen von `limit` ab, nicht von der Größe des Logs.
+
+CHANGE_LOG = os.getenv("CHANGE_LOG_FILE", "app/backend/logs/changes.jsonl")
+STATUSES = ("applied", "failed", "undo_applied", "undo_failed")
+_BLOCK = 64 * 1024
+
+log = SegmentedLog(CHANGE_LOG)
+
+Hit = Tuple[int, dict]  # (Byte-Offset des Zeilenanfangs, Eintrag)
+
+
+def append(rec: dict) -> None:
+    log.append([rec])
+
+
+def _key(seg: Segment) -> str:
+    return seg.path.name.split(".", 1)[0]  # bleibt gleich, wenn das Segment komprimiert wird
+
+
+def parse_cursor(before: str) -> Tuple[str, int]:
+    """`<Segment>:<Offset>` -> (Segment, Offset); ValueError bei Unsinn."""
+    key, sep, offset = before.rpartition(":")
+    if not sep or not key or not offset.isdigit():
+        raise ValueError(before)
+    return key, int(offset)
+
+
+def _parse(line: bytes) -> Optional[dict]:
+    try:
+        rec = json.loads(line)
+    except ValueError:
+        return None
+    return rec if isinstance(rec, dict) else None
+
+
+def _reverse_lines(f: BinaryIO, start: int, end: int) -> Iterator[Tuple[int, bytes]]:
+    """Zeilen in [start, end) von hinten nach vorn, je Block ein seek/read."""
+    pos, tail = end, b""
+    while pos > start:
+        n = min(_BLOCK, pos - start)
+        pos -= n
+        f.seek(pos)
+        parts = (f.read(n) + tail).split(b"\n")
+        tail = parts[0]  # evtl. unvollständig, kommt mit dem nächsten Block
+        offsets, off = [], pos + len(tail) + 1
+        for part in parts[1:]:
+            offsets.append(off)
+            off += len(part) + 1
+        for off, part in zip(reversed(offsets), reversed(parts[1:])):
+            if part.strip():
+                yield off, part
+    if tail.strip():
+        yield start, tail
+
+
+def _scan(seg: Segment, start: int, end: Optional[int], match: Callable[[dict], bool], need: int) -> List[Hit]:
+    """Bis zu `need` passende Einträge aus [start, end), neueste zuerst."""
+    if seg.compressed:
+        # gzip lässt sich nicht rückwärts lesen: vorwärts durch das (begrenzte) Segment, die letzten `need` behalten
+        hits: deque = deque(maxlen=need)
+        with seg.open() as f:
+            f.seek(start)
+            pos = start
+            for line in f:
+                if end is not None and pos >= end:
+                    break
+                rec = _parse(line)
+                if rec is not None and match(rec):
+                    hits.append((pos, rec))
+                pos += len(line)
+        return list(reversed(hits))
+    out: List[Hit] = []
+    with seg.open() as f:
+        size = f.seek(0, os.SEEK_END)
+        for pos, line in _reverse_lines(f, start, size if end is None else min(end, size)):
+            rec = _parse(line)
+            if rec is not None and match(rec):
+                out.append((pos, rec))
+                if len(out) >= need:
+                    break
+    return out
+
+
+def page(
+    limit: int,
+    before: Optional[str] = None,
+    statuses: Optional[List[str]] = None,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Eine Seite (neueste zuerst) und der Cursor für die nächste (None: Ende erreicht).
+    `before` ist der Cursor der vorigen Seite; ValueError, wenn er nicht passt.
+    """
+    cursor = parse_cursor(before) if before else None
+    wanted = set(statuses) if statuses else None
+
+    def match(rec: dict) -> bool:
+        if wanted is not None and rec.get("status") not in wanted:
+            return False
+        if since is not None or until is not None:
+            t = parse_ts(rec.get("ts"))
+            if t is None or (since is not None and t < since) or (until is not None and t > until):
+                return False
+        return True
+
+    segs = list(reversed(log.segments(since, until)))
+    if cursor is not None:
+        keys = [_key(seg) for seg in segs]
+        if cursor[0] not in keys:
+            # Segment liegt außerhalb des Zeitfensters: nur ältere lesen (Altbestand ist immer das älteste)
+            segs = [seg for seg in segs if seg.path == log.legacy or _key(seg) < cursor[0]]
+        else:
+            segs = segs[keys.index(cursor[0]):]
+
+    items: List[dict] = []
+    last: Optional[str] = None
+    for seg in segs:
+        end = seg.end_offset_for(until)
+        if cursor is not None and _key(seg) == cursor[0]:
+            end = cursor[1] if end is None else min(end, cursor[1])
+        for pos, rec in _scan(seg, seg.offset_for(since), end, match, limit - len(items)):
+            items.append(rec)
+            last = f"{_key(seg)}:{pos}"
+        if len(items) >= limit:
+            return items, last
+    return items, None
+
+
+__all__ = ["CHANGE_LOG", "STATUSES", "append", "log", "page", "parse_cursor"]
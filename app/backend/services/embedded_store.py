@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import gzip
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs
+
+import httpx
+from fastapi import FastAPI, Request, Response
+from rdflib import ConjunctiveGraph, Dataset, URIRef
+from rdflib.graph import DATASET_DEFAULT_GRAPH_ID
+from rdflib.term import BNode, Literal
+
+from app.backend.config import get_settings
+
+# ---------- Eingebetteter RDF-Store (rdflib) als Fuseki-Ersatz für Tests und Benchmarks ----------
+# Spricht das Fuseki-Protokoll (/sparql, /update, /data) – als httpx-Transport im Prozess
+# (FUSEKI_BACKEND=embedded) oder als kleiner HTTP-Server (tools/fuseki_embedded.py).
+
+_FILE_FORMATS = {".nt": "nt", ".nq": "nquads", ".ttl": "turtle", ".trig": "trig"}
+_MEDIA_FORMATS = {
+    "application/n-triples": "nt", "text/plain": "nt", "application/n-quads": "nquads",
+    "text/turtle": "turtle", "application/trig": "trig",
+}
+_QUAD_FORMATS = ("nquads", "trig")
+_DEFAULT_SUFFIX = f" <{DATASET_DEFAULT_GRAPH_ID}> .\n"
+
+JSON = "application/sparql-results+json"
+CSV = "text/csv"
+TSV = "text/tab-separated-values"
+
+
+class Reply(NamedTuple):
+    status: int
+    media: str
+    body: bytes
+
+
+def _text(status: int, message: str) -> Reply:
+    return Reply(status, "text/plain; charset=utf-8", message.encode("utf-8"))
+
+
+def _file_format(path: Path) -> Optional[str]:
+    suffixes = path.suffixes[-2:] if path.suffix == ".gz" else path.suffixes[-1:]
+    return _FILE_FORMATS.get(suffixes[0]) if suffixes else None
+
+
+def _term(t) -> dict:
+    if isinstance(t, URIRef):
+        return {"type": "uri", "value": str(t)}
+    if isinstance(t, BNode):
+        return {"type": "bnode", "value": str(t)}
+    out = {"type": "literal", "value": str(t)}
+    if t.language:
+        out["xml:lang"] = t.language
+    elif t.datatype:
+        out["datatype"] = str(t.datatype)
+    return out
+
+
+def _tsv_term(t) -> str:
+    if t is None:
+        return ""
+    if isinstance(t, Literal):
+        # JSON-Escapes entsprechen den SPARQL-String-Escapes (\n, \t, \", \\)
+        s = json.dumps(str(t), ensure_ascii=False)
+        if t.language:
+            return f"{s}@{t.language}"
+        return f"{s}^^<{t.datatype}>" if t.datatype else s
+    return t.n3()
+
+
+def _accept(accept: str) -> str:
+    for media in (part.split(";")[0].strip().lower() for part in (accept or "").split(",")):
+        if media in (CSV, TSV):
+            return media
+        if media in (JSON, "application/json"):
+            return JSON
+    return JSON
+
+
+class _UnionView(ConjunctiveGraph):
+    """
+    SPARQL-Sicht auf das Dataset wie TDB2 mit `unionDefaultGraph true`: der Default-Graph einer
+    Query ist die Vereinigung der Named Graphs (plus des gespeicherten Default-Graphen, in den
+    .nt/.ttl geladen werden); INSERT/DELETE ohne GRAPH schreiben in den gespeicherten Default-Graphen.
+    Die Sicht ist zugleich ihr eigener Default-Graph – damit gilt das unabhängig von rdflibs
+    globalem `SPARQL_DEFAULT_GRAPH_UNION`.
+    """
+
+    def __init__(self, dataset: Dataset) -> None:
+        super().__init__(store=dataset.store, identifier=DATASET_DEFAULT_GRAPH_ID)
+        self.default_context = self
+        self._stored = dataset.default_context
+
+    def add(self, triple):
+        self._stored.add(triple[:3])
+        return self
+
+    def addN(self, quads):
+        self._stored.addN((s, p, o, self._stored) for s, p, o, _ in quads)
+        return self
+
+    def remove(self, triple):
+        self._stored.remove(triple[:3])
+        return self
+
+
+class EmbeddedStore:
+    """
+    rdflib-Dataset mit Fuseki-Semantik (Default-Graph der Queries = Union, siehe `_UnionView`).
+    Zugriffe laufen nacheinander über eine Sperre.
+    """
+
+    def __init__(self) -> None:
+        self.dataset = Dataset()
+        self._sparql = _UnionView(self.dataset)
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(1 for _ in self.dataset.quads((None, None, None, None)))
+
+    # ---- Laden / Graph Store --------------------------------------------------
+
+    def load(self, paths: Iterable[str]) -> int:
+        """Dateien bzw. Verzeichnisse (rekursiv; .nt/.nq/.ttl/.trig, auch .gz); liefert die Anzahl Quads."""
+        for path in paths:
+            p = Path(path)
+            files = sorted(f for f in p.rglob("*") if f.is_file()) if p.is_dir() else [p]
+            for f in files:
+                fmt = _file_format(f)
+                if fmt is None:
+                    continue
+                with (gzip.open(f, "rb") if f.suffix == ".gz" else open(f, "rb")) as fh:
+                    self.add(fh, fmt)
+        return len(self)
+
+    def add(self, source, fmt: str, graph: Optional[str] = None) -> None:
+        """Tripel-Formate landen in `graph` (None = Default-Graph), Quad-Formate in ihren Graphen."""
+        src = {"data": source} if isinstance(source, (bytes, str)) else {"source": source}
+        with self._lock:
+            if fmt in _QUAD_FORMATS:
+                self.dataset.parse(format=fmt, **src)
+            else:
+                self.dataset.graph(URIRef(graph) if graph else DATASET_DEFAULT_GRAPH_ID).parse(format=fmt, **src)
+
+    def clear(self, graph: Optional[str] = None) -> None:
+        with self._lock:
+            if graph is None:
+                self.dataset.default_context.remove((None, None, None))
+            else:
+                self.dataset.remove_graph(URIRef(graph))
+
+    def dump(self, graph: Optional[str] = None, everything: bool = False) -> Reply:
+        with self._lock:
+            if everything:
+                text = self.dataset.serialize(format="nquads")
+                # Default-Graph als Tripel ausgeben, wie Fuseki
+                lines = [ln[:-len(_DEFAULT_SUFFIX)] + " .\n" if ln.endswith(_DEFAULT_SUFFIX) else ln
+                         for ln in text.splitlines(keepends=True)]
+                return Reply(200, "application/n-quads", "".join(lines).encode("utf-8"))
+            g = self.dataset.graph(URIRef(graph)) if graph else self.dataset.default_context
+            return Reply(200, "application/n-triples", g.serialize(format="nt").encode("utf-8"))
+
+    # ---- SPARQL -----------------------------------------------------------------
+
+    def query(self, query: str, accept: str = JSON) -> Reply:
+        with self._lock:
+            result = self._sparql.query(query)
+            if result.type == "ASK":
+                return Reply(200, JSON, json.dumps({"head": {}, "boolean": bool(result.askAnswer)}).encode())
+            if result.type in ("CONSTRUCT", "DESCRIBE"):
+                return Reply(200, "text/turtle", result.graph.serialize(format="turtle").encode("utf-8"))
+            names = [str(v) for v in result.vars or ()]
+            rows = list(result)
+            media = _accept(accept)
+            if media == CSV:
+                return Reply(200, CSV, result.serialize(format="csv"))
+        if media == TSV:
+            lines = ["\t".join(f"?{n}" for n in names)]
+            lines += ["\t".join(_tsv_term(t) for t in row) for row in rows]
+            return Reply(200, TSV, ("\n".join(lines) + "\n").encode("utf-8"))
+        # "head" vor "results" wie bei Fuseki (Stream-Zerleger erwartet diese Reihenfolge)
+        bindings = [{n: _term(t) for n, t in zip(names, row) if t is not None} for row in rows]
+        body = json.dumps({"head": {"vars": names}, "results": {"bindings": bindings}}, ensure_ascii=False)
+        return Reply(200, JSON, body.encode("utf-8"))
+
+    def update(self, update: str) -> None:
+        with self._lock:
+            self._sparql.update(update)
+
+    # ---- Fuseki-Protokoll -------------------------------------------------------
+
+    def handle(self, method: str, endpoint: str, params: Dict[str, List[str]], content_type: str,
+               accept: str, body: bytes) -> Reply:
+        """Beantwortet einen Request an `/<dataset>/<endpoint>`; `timeout`-Parameter werden ignoriert."""
+        media = (content_type or "").split(";")[0].strip().lower()
+        form = parse_qs(body.decode("utf-8"), keep_blank_values=True) \
+            if media == "application/x-www-form-urlencoded" else {}
+        try:
+            if endpoint in ("sparql", "query"):
+                q = (form.get("query") or params.get("query") or [None])[0]
+                if q is None and media == "application/sparql-query":
+                    q = body.decode("utf-8")
+                if not q or method not in ("GET", "POST"):
+                    return _text(400, "Keine Query angegeben.")
+                return self.query(q, accept)
+            if endpoint == "update":
+                u = (form.get("update") or [None])[0]
+                if u is None and media == "application/sparql-update":
+                    u = body.decode("utf-8")
+                if not u or method != "POST":
+                    return _text(400, "Kein Update angegeben.")
+                self.update(u)
+                return Reply(204, "text/plain", b"")
+            if endpoint == "data":
+                return self._graph_store(method, params, media, body)
+        except Exception as ex:  # Parser-/Auswertungsfehler wie bei Fuseki als 400 melden
+            return _text(400, f"{type(ex).__name__}: {ex}")
+        return _text(404, f"Unbekannter Endpoint: {endpoint}")
+
+    def _graph_store(self, method: str, params: Dict[str, List[str]], media: str, body: bytes) -> Reply:
+        graph = (params.get("graph") or [None])[0]
+        everything = graph is None and "default" not in params
+        if method == "GET":
+            return self.dump(graph, everything=everything)
+        if method == "DELETE":
+            self.clear(graph)
+            return Reply(204, "text/plain", b"")
+        if method not in ("POST", "PUT"):
+            return _text(405, "Methode nicht erlaubt.")
+        fmt = _MEDIA_FORMATS.get(media)
+        if fmt is None:
+            return _text(415, f"Nicht unterstützter Content-Type: {media}")
+        with self._lock:
+            if method == "PUT":
+                self.clear(graph)
+            self.add(body, fmt, graph)
+        return Reply(204 if method == "PUT" else 200, "text/plain", b"")
+
+
+def _params(query: bytes) -> Dict[str, List[str]]:
+    return parse_qs(query.decode("utf-8"), keep_blank_values=True)
+
+
+class EmbeddedTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """httpx-Transport auf den eingebetteten Store; async-Requests laufen in einem Worker-Thread."""
+
+    def __init__(self, store: Optional[EmbeddedStore] = None) -> None:
+        self._store = store
+
+    def _respond(self, request: httpx.Request, body: bytes) -> httpx.Response:
+        store = self._store or get_store()
+        reply = store.handle(request.method, request.url.path.rstrip("/").rsplit("/", 1)[-1],
+                             _params(request.url.query), request.headers.get("content-type", ""),
+                             request.headers.get("accept", ""), body)
+        return httpx.Response(reply.status, headers={"content-type": reply.media}, content=reply.body)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self._respond(request, request.read())
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        return await asyncio.to_thread(self._respond, request, body)
+
+
+_store: Optional[EmbeddedStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> EmbeddedStore:
+    """Prozessweiter Store, beim ersten Zugriff aus EMBEDDED_DATA geladen."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            store = EmbeddedStore()
+            paths = [p.strip() for p in get_settings().embedded_data.split(",") if p.strip()]
+            store.load(p for p in paths if Path(p).exists())
+            _store = store
+        return _store
+
+
+def reset_store(store: Optional[EmbeddedStore] = None) -> None:
+    """Verwirft den Store (bzw. setzt `store`); der nächste Zugriff lädt neu."""
+    global _store
+    with _store_lock:
+        _store = store
+
+
+# ---- HTTP-Server mit Fuseki-Pfaden -------------------------------------------
+
+def _authorized(header: Optional[str], credentials: Tuple[str, str]) -> bool:
+    expected = base64.b64encode(":".join(credentials).encode("utf-8")).decode("ascii")
+    return header == f"Basic {expected}"
+
+
+def create_app(store: EmbeddedStore, credentials: Optional[Tuple[str, str]] = None) -> FastAPI:
+    """
+    `/<dataset>/sparql|query|update|data` und `/$/ping`. Mit `credentials` verlangen Updates
+    und schreibende Graph-Store-Zugriffe Basic Auth (401 sonst), Queries bleiben offen.
+    """
+    app = FastAPI(title="Embedded Fuseki")
+
+    @app.get("/$/ping")
+    def ping():
+        return Response("ok", media_type="text/plain")
+
+    @app.api_route("/{dataset}/{endpoint}", methods=["GET", "POST", "PUT", "DELETE"])
+    async def endpoint(dataset: str, endpoint: str, request: Request):
+        writes = endpoint == "update" or (endpoint == "data" and request.method != "GET")
+        if credentials and writes and not _authorized(request.headers.get("authorization"), credentials):
+            return Response(status_code=401, headers={"WWW-Authenticate": f'Basic realm="{dataset}"'})
+        body = await request.body()
+        reply = await asyncio.to_thread(
+            store.handle, request.method, endpoint, _params(request.url.query.encode("utf-8")),
+            request.headers.get("content-type", ""), request.headers.get("accept", ""), body,
+        )
+        return Response(reply.body, status_code=reply.status, media_type=reply.media)
+
+    return app
+
+
+__all__ = ["EmbeddedStore", "EmbeddedTransport", "Reply", "create_app", "get_store", "reset_store"]
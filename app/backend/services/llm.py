@@ -1,35 +1,30 @@
 from __future__ import annotations
-import os, re, textwrap
-from typing import Tuple, Optional, List, Dict
+import asyncio, contextlib, re, textwrap, time
+from typing import AsyncIterator, Tuple, Optional, List, Dict
 
-from openai import OpenAI
 from app.backend.config import get_settings
-from app.backend.services import sparql
+from app.backend.services import ontology
+from app.backend.services.cache import TTLCache
+from app.backend.services.llm_backends import get_backend
+from app.backend.services.monitoring import record_generation_cache, record_llm_candidates
+from app.backend.services.repair import repair_sparql, unknown_terms
+from app.backend.services.singleflight import SingleFlight
+from app.backend.services.sparql import _perf
+from app.backend.services.sparql_analysis import analyze
+from app.backend.services.term_index import select_terms
 from app.backend.services.validator import validate as validate_sparql
 
-# ---------- OpenAI Client ----------
-def _client() -> OpenAI:
-    s = get_settings()
-    os.environ.setdefault("OPENAI_API_KEY", s.openai_api_key)
-    return OpenAI()
-
 # ---------- Ontologie-Kontext: nur Klassen/Properties (keine Instanzen) ----------
-def _fetch_terms(limit_each: int = 150) -> Tuple[List[str], List[str]]:
-    q_classes = """
-    PREFIX rdfs:<http://www.w3.org/2000/01/rdf-schema#>
-    PREFIX owl:<http://www.w3.org/2002/07/owl#>
-    SELECT DISTINCT ?x WHERE { { ?x a rdfs:Class } UNION { ?x a owl:Class } } ORDER BY ?x
-    """
-    q_props = """
-    PREFIX rdf:<http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-    PREFIX owl:<http://www.w3.org/2002/07/owl#>
-    SELECT DISTINCT ?p WHERE {
-      { ?p a rdf:Property } UNION { ?p a owl:ObjectProperty } UNION { ?p a owl:DatatypeProperty }
-    } ORDER BY ?p
-    """
-    cls = [b["x"]["value"] for b in sparql.query_select(q_classes)["results"]["bindings"]][:limit_each]
-    props = [b["p"]["value"] for b in sparql.query_select(q_props)["results"]["bindings"]][:limit_each]
-    return cls, props
+def _select_terms(snap: ontology.OntologySnapshot, anon_text: str) -> Tuple[List[str], List[str]]:
+    """Nach Relevanz zum anonymisierten Text gewählte Terme innerhalb des Prompt-Budgets."""
+    s = get_settings()
+    return select_terms(
+        snap, anon_text,
+        budget_tokens=s.prompt_term_budget_tokens,
+        max_classes=s.prompt_max_classes,
+        max_properties=s.prompt_max_properties,
+        render=_short,
+    )
 
 # ---------- Mini-Anonymisierung des Usertexts ----------
 _ANON_NUMBER = re.compile(r'\b\d{1,4}([.-]\d{1,2}([.-]\d{1,2})?)?\b')
@@ -67,6 +62,22 @@ def anonymize_text(user_text: str) -> Tuple[str, Dict[str, str]]:
     t = _ANON_NUMBER.sub("PH_YEAR", t)
     return t, placeholders
 
+# ---------- Cache validierter Generierungen ----------
+# Schlüssel: normalisierter anonymisierter Text + Intent + Modell + Ontologie-Fingerprint.
+# Gespeichert wird nur die anonymisierte Fassung; Platzhalter kommen pro Request dazu.
+_GEN_CACHE = TTLCache()
+
+def refresh_generation_cache() -> None:
+    s = get_settings()
+    _GEN_CACHE.configure(s.gen_cache_max_entries, s.gen_cache_ttl_seconds)
+
+def _cache_key(anon_text: str, intent_hint: Optional[str], model: str, fingerprint: str) -> Tuple[str, str, str, str]:
+    norm = " ".join((anon_text or "").split()).casefold()
+    return norm, (intent_hint or "").strip().casefold(), model, fingerprint
+
+# Gleichzeitige identische Anfragen (gleicher Cache-Schlüssel) warten auf eine Generierung.
+_INFLIGHT = SingleFlight()
+
 # ---------- Prompt/Guardrails ----------
 VOC = "http://meta-pfarrerbuch.evangelische-archive.de/vocabulary#"
 PREFIX_BLOCK = textwrap.dedent(f"""
@@ -75,13 +86,15 @@ PREFIX_BLOCK = textwrap.dedent(f"""
     PREFIX rdfs:<http://www.w3.org/2000/01/rdf-schema#>
     PREFIX owl:<http://www.w3.org/2002/07/owl#>
 """).strip()
+_CANONICAL_PREFIXES = dict(re.findall(r"PREFIX\s+(\w+):<([^>]+)>", PREFIX_BLOCK))
 
 DISALLOWED = ("DROP", "LOAD", "CREATE", "CLEAR", "MOVE", "COPY", "ADD", "SERVICE")
 
+def _short(u: str) -> str: return u.replace(VOC, "voc:")
+
 def _system_prompt(classes: List[str], props: List[str], graph: str) -> str:
-    def short(u: str) -> str: return u.replace(VOC, "voc:#")
-    classes_s = ", ".join(short(c) for c in classes[:120]) or "(keine)"
-    props_s   = ", ".join(short(p) for p in props[:200]) or "(keine)"
+    classes_s = ", ".join(_short(c) for c in classes) or "(keine)"
+    props_s   = ", ".join(_short(p) for p in props) or "(keine)"
 
     return textwrap.dedent(f"""
     Du bist ein strenger SPARQL-Generator (Apache Jena Fuseki).
@@ -179,10 +192,47 @@ def _extract_sparql_from_text(txt: str) -> Optional[str]:
         return body
     return None
 
+_CODEBLOCK_OPEN_RE = re.compile(r"```sparql", re.IGNORECASE)
+class _SparqlBlockScanner:
+    """Inkrementelles Gegenstück zu _extract_sparql_from_text für gestreamte Deltas."""
+
+    def __init__(self) -> None:
+        self.text = ""
+        self._start: Optional[int] = None
+        self._end: Optional[int] = None
+
+    @property
+    def closed(self) -> bool:
+        return self._end is not None
+
+    def feed(self, chunk: str) -> bool:
+        """Hängt ein Delta an; True, sobald der ```sparql```-Block geschlossen ist."""
+        if self.closed:
+            return True
+        scan_from = max(0, len(self.text) - 2)
+        self.text += chunk or ""
+        if self._start is None:
+            m = _CODEBLOCK_OPEN_RE.search(self.text, max(0, scan_from - 7))
+            if not m:
+                return False
+            self._start = scan_from = m.end()
+        i = self.text.find("```", max(self._start, scan_from))
+        if i >= 0:
+            self._end = i
+        return self.closed
+
+    @property
+    def sparql(self) -> Optional[str]:
+        if self.closed:
+            return self.text[self._start:self._end].strip()
+        return _extract_sparql_from_text(self.text)
+
 def _contains_disallowed(q: str) -> Optional[str]:
-    U = (q or "").upper()
+    a = analyze(q or "")
+    # nur echte Schlüsselwörter (nicht in Literalen/IRIs); bei unlesbarem Text konservativ per Substring
+    words = a.keywords if a.ok else (q or "").upper()
     for bad in DISALLOWED:
-        if bad in U:
+        if bad in words:
             return bad
     return None
 
@@ -194,57 +244,270 @@ def _make_feedback(v: Dict) -> str:
         msgs.append(f"Warnung: {w}")
     return "\n".join(msgs) if msgs else "Keine Fehler/Warnungen, nur Ontologie-konform bleiben."
 
-def generate_sparql_with_guardrails(user_text: str, intent_hint: Optional[str]=None, retry_if_invalid: bool=True) -> Dict:
-    s = get_settings()
-    classes, props = _fetch_terms()
-    graph = s.changes_graph
-
-    anon_text, _ph = anonymize_text(user_text)
-    sys_prompt = _system_prompt(classes, props, graph)
-
-    messages = [{"role": "system", "content": sys_prompt}]
+def _build_prefix(snap: ontology.OntologySnapshot, anon_text: str) -> List[Dict[str, str]]:
+    """System-Prompt + Few-Shots; im Batch einmal für alle Texte gebaut."""
+    classes, props = _select_terms(snap, anon_text)
+    graph = get_settings().changes_graph
+    messages = [{"role": "system", "content": _system_prompt(classes, props, graph)}]
     for nl, sp in _fewshots(graph):
         messages.append({"role": "user", "content": nl})
         messages.append({"role": "assistant", "content": sp})
+    return messages
 
+def _build_messages(anon_text: str, intent_hint: Optional[str], snap: ontology.OntologySnapshot,
+                    prefix: Optional[List[Dict[str, str]]] = None) -> List[Dict[str, str]]:
+    messages = list(prefix) if prefix else _build_prefix(snap, anon_text)
     user_msg = f"[Intent={intent_hint}] {anon_text}" if intent_hint else anon_text
     messages.append({"role": "user", "content": user_msg})
-
-    client = _client()
-    resp = client.responses.create(
-        model=s.llm_model,
-        temperature=s.llm_temperature,
-        max_output_tokens=s.llm_max_output_tokens,
-        input=messages,
-    )
-    draft = getattr(resp, "output_text", None) or \
-        (resp.output[0].content[0].text if getattr(resp, "output", None) else "") or ""
-
-    sparql_text = _extract_sparql_from_text(draft) or ""
-
+    return messages
+
+async def _acomplete(messages: List[Dict[str, str]], usage: Dict[str, int], temperature: Optional[float] = None) -> str:
+    """Ein LLM-Aufruf über das konfigurierte Backend; Tokens werden in `usage` aufsummiert."""
+    backend = get_backend()
+    t0 = time.perf_counter()
+    c = await backend.complete(messages, temperature)
+    usage["prompt_tokens"] = usage.get("prompt_tokens", 0) + c.prompt_tokens
+    usage["output_tokens"] = usage.get("output_tokens", 0) + c.output_tokens
+    _perf("llm", op="complete", backend=backend.name, model=get_settings().llm_model,
+          dur_ms=round((time.perf_counter() - t0) * 1000.0, 1),
+          prompt_tokens=c.prompt_tokens, output_tokens=c.output_tokens)
+    return c.text
+
+async def _astream(messages: List[Dict[str, str]], usage: Dict[str, int]) -> AsyncIterator[str]:
+    """
+    Text-Deltas des Backends; Abbruch durch den Aufrufer (aclose) schließt den Stream. Tokens
+    werden wie bei `_acomplete` in `usage` aufsummiert – meldet das Backend keine (Stream vor
+    dem Ende verlassen), geschätzt mit 4 Zeichen je Token.
+    """
+    backend = get_backend()
+    t0 = time.perf_counter()
+    reported: Dict[str, int] = {}
+    chars = 0
+    try:
+        async with contextlib.aclosing(backend.stream(messages, reported)) as stream:
+            async for delta in stream:
+                chars += len(delta)
+                yield delta
+    finally:
+        estimated = "output_tokens" not in reported
+        prompt_tokens = reported.get("prompt_tokens", sum(len(m.get("content", "")) for m in messages) // 4)
+        output_tokens = reported.get("output_tokens", chars // 4)
+        usage["prompt_tokens"] = usage.get("prompt_tokens", 0) + prompt_tokens
+        usage["output_tokens"] = usage.get("output_tokens", 0) + output_tokens
+        _perf("llm", op="stream", backend=backend.name, model=get_settings().llm_model,
+              dur_ms=round((time.perf_counter() - t0) * 1000.0, 1),
+              prompt_tokens=prompt_tokens, output_tokens=output_tokens, estimated=estimated)
+
+def _prepare(user_text: str, intent_hint: Optional[str], use_cache: bool, snap: Optional[ontology.OntologySnapshot] = None):
+    """(snap, anon_text, placeholders, key, hit); key None = weder Cache noch Singleflight (Ontologie lädt noch)."""
+    s = get_settings()
+    snap = snap or ontology.current()
+    anon_text, ph = anonymize_text(user_text)
+    key = _cache_key(anon_text, intent_hint, s.llm_model, snap.fingerprint) if snap.ready else None
+    hit = None
+    if use_cache and key is not None and _GEN_CACHE.enabled:
+        hit = _GEN_CACHE.get(key)
+        record_generation_cache("hit" if hit else "miss")
+    return snap, anon_text, ph, key, hit
+
+def _remember(key, out: Dict, use_cache: bool) -> None:
+    if use_cache and key is not None and out.get("ok"):
+        _GEN_CACHE.put(key, {k: out[k] for k in ("sparql", "validation", "attempts", "repair") if k in out})
+
+async def agenerate_sparql_with_guardrails(user_text: str, intent_hint: Optional[str]=None, retry_if_invalid: bool=True, use_cache: bool=True,
+                                          snap: Optional[ontology.OntologySnapshot]=None, prefix: Optional[List[Dict[str, str]]]=None,
+                                          candidates: Optional[int]=None) -> Dict:
+    snap, anon_text, _ph, key, hit = _prepare(user_text, intent_hint, use_cache, snap)
+    if hit:
+        return {**hit, "ok": True, "placeholders": _ph, "cached": True}
+
+    async def run() -> Dict:
+        out = await _agenerate(anon_text, intent_hint, retry_if_invalid, snap, prefix, candidates=candidates)
+        _remember(key, out, use_cache)
+        return out
+
+    if not use_cache or key is None:
+        return {**await run(), "placeholders": _ph, "cached": False}
+    # Kandidatenzahl gehört zum Schlüssel: n=1 und n>1 unterscheiden sich in Latenz und Korrekturverhalten
+    out, shared = await _INFLIGHT.do((key, retry_if_invalid, _candidate_count(candidates)), run)
+    if shared:
+        record_generation_cache("coalesced")
+    return {**out, "placeholders": _ph, "cached": False, "coalesced": shared}
+
+async def agenerate_batch(items: List[Tuple[str, Optional[str]]], concurrency: int,
+                          snap: Optional[ontology.OntologySnapshot] = None) -> AsyncIterator[Tuple[int, Dict]]:
+    """
+    Mehrere Generierungen mit gemeinsamem Ontologie-Snapshot und Prompt-Präfix (Terme
+    über alle Texte gewählt); höchstens `concurrency` LLM-Aufrufe gleichzeitig.
+    Liefert (index, Ergebnis) in Fertigstellungsreihenfolge.
+    """
+    snap = snap or ontology.current()
+    prefix = _build_prefix(snap, "\n".join(anonymize_text(t)[0] for t, _ in items))
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(i: int, text: str, intent: Optional[str]) -> Tuple[int, Dict]:
+        async with sem:
+            try:
+                return i, await agenerate_sparql_with_guardrails(text, intent, snap=snap, prefix=prefix)
+            except Exception as ex:
+                return i, {"ok": False, "reason": f"LLM-Aufruf fehlgeschlagen: {ex}"}
+
+    tasks = [asyncio.create_task(one(i, t, intent)) for i, (t, intent) in enumerate(items)]
+    try:
+        for fut in asyncio.as_completed(tasks):
+            yield await fut
+    finally:
+        for t in tasks:
+            t.cancel()
+
+async def astream_sparql_with_guardrails(user_text: str, intent_hint: Optional[str]=None, retry_if_invalid: bool=True, use_cache: bool=True,
+                                         snap: Optional[ontology.OntologySnapshot]=None) -> AsyncIterator[Tuple[str, Dict]]:
+    """
+    Streaming-Variante: liefert ("token", {"text": ...}) während der Generierung und
+    zum Schluss ("result", <wie agenerate_sparql_with_guardrails>). Der LLM-Stream wird
+    verlassen, sobald der ```sparql```-Block geschlossen ist.
+    """
+    snap, anon_text, _ph, key, hit = _prepare(user_text, intent_hint, use_cache, snap)
+    if hit:
+        yield "result", {**hit, "ok": True, "placeholders": _ph, "cached": True}
+        return
+
+    messages = _build_messages(anon_text, intent_hint, snap)
+    usage = _prompt_usage(messages)
+    scanner = _SparqlBlockScanner()
+    async with contextlib.aclosing(_astream(messages, usage)) as stream:
+        async for delta in stream:
+            yield "token", {"text": delta}
+            if scanner.feed(delta):
+                break
+
+    out = await _afinish(messages, scanner.sparql or "", retry_if_invalid, usage, snap)
+    _remember(key, out, use_cache)
+    yield "result", {**out, "placeholders": _ph, "cached": False}
+
+def generate_sparql_with_guardrails(user_text: str, intent_hint: Optional[str]=None, retry_if_invalid: bool=True, use_cache: bool=True,
+                                    candidates: Optional[int]=None) -> Dict:
+    """Synchrone Variante für Skripte/Tests (ohne laufenden Event-Loop)."""
+    return asyncio.run(agenerate_sparql_with_guardrails(user_text, intent_hint, retry_if_invalid, use_cache, candidates=candidates))
+
+def _candidate_count(candidates: Optional[int]) -> int:
+    s = get_settings()
+    return max(1, min(candidates or s.gen_candidates, s.gen_candidates_max))
+
+async def _agenerate(anon_text: str, intent_hint: Optional[str], retry_if_invalid: bool, snap: ontology.OntologySnapshot,
+                     prefix: Optional[List[Dict[str, str]]] = None, candidates: Optional[int] = None) -> Dict:
+    messages = _build_messages(anon_text, intent_hint, snap, prefix)
+    usage = _prompt_usage(messages)
+    n = _candidate_count(candidates)
+    if n > 1:
+        out, draft_sparql = await _aspeculate(messages, n, usage, snap)
+        if out:
+            out["usage"] = usage
+            return out
+        return await _afinish(messages, draft_sparql, retry_if_invalid, usage, snap)
+    draft = await _acomplete(messages, usage)
+    return await _afinish(messages, _extract_sparql_from_text(draft) or "", retry_if_invalid, usage, snap)
+
+async def _aspeculate(messages: List[Dict[str, str]], n: int, usage: Dict[str, int],
+                      snap: ontology.OntologySnapshot) -> Tuple[Optional[Dict], str]:
+    """
+    N Entwürfe parallel anfragen (Kandidat 1 mit LLM_TEMPERATURE, die übrigen mit
+    GEN_CANDIDATE_TEMPERATURE), in Ankunftsreihenfolge prüfen und lokal reparieren; der
+    erste valide gewinnt, die restlichen Aufrufe werden abgebrochen. Ist keiner valide,
+    kommt (None, erster Entwurf) zurück und der normale Korrekturpfad übernimmt.
+    """
+    s = get_settings()
+    t0 = time.perf_counter()
+    temps = [None] + [max(s.llm_temperature, s.gen_candidate_temperature)] * (n - 1)
+    cand_usage: List[Dict[str, int]] = [{} for _ in range(n)]
+    tasks = {asyncio.create_task(_acomplete(messages, cand_usage[i], temps[i])): i for i in range(n)}
+    pending = set(tasks)
+    outcomes = {"accepted": 0, "rejected": 0, "cancelled": 0, "failed": 0}
+    winner: Optional[Dict] = None
+    winner_idx, first_draft, first_error = -1, None, None
+    try:
+        while pending and winner is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for t in sorted(done, key=tasks.__getitem__):
+                if t.exception() is not None:
+                    outcomes["failed"] += 1
+                    first_error = first_error or t.exception()
+                    continue
+                sparql_text = _extract_sparql_from_text(t.result()) or ""
+                if first_draft is None:
+                    first_draft = sparql_text
+                if winner is None and not _contains_disallowed(sparql_text):
+                    fixed, v, fixes = _local_repair(sparql_text, validate_sparql(sparql_text, snap), snap)
+                    if not _needs_retry(v, snap):
+                        winner_idx = tasks[t]
+                        winner = {"ok": True, "sparql": fixed, "validation": v, "attempts": 1,
+                                  "repair": {"path": "local" if fixes else "none", "fixes": fixes}}
+                        outcomes["accepted"] += 1
+                        continue
+                outcomes["rejected"] += 1
+    finally:
+        for t in pending:
+            t.cancel()
+        outcomes["cancelled"] = len(pending)
+
+    wasted = 0
+    for i, u in enumerate(cand_usage):
+        usage["prompt_tokens"] = usage.get("prompt_tokens", 0) + u.get("prompt_tokens", 0)
+        usage["output_tokens"] = usage.get("output_tokens", 0) + u.get("output_tokens", 0)
+        if i != winner_idx:
+            wasted += u.get("prompt_tokens", 0) + u.get("output_tokens", 0)
+    usage["candidates"] = n
+    usage["wasted_tokens"] = wasted
+    record_llm_candidates(outcomes, wasted)
+    _perf("llm", op="speculate", n=n, winner=winner_idx, wasted_tokens=wasted,
+          dur_ms=round((time.perf_counter() - t0) * 1000.0, 1), **outcomes)
+
+    if first_draft is None and first_error is not None:
+        raise first_error
+    return winner, first_draft or ""
+
+def _prompt_usage(messages: List[Dict[str, str]]) -> Dict[str, int]:
+    return {"prompt_chars": len(messages[0]["content"]), "prompt_tokens": 0, "output_tokens": 0}
+
+async def _afinish(messages: List[Dict[str, str]], sparql_text: str, retry_if_invalid: bool, usage: Dict[str, int],
+                   snap: ontology.OntologySnapshot) -> Dict:
+    out = await _acheck_and_retry(messages, sparql_text, retry_if_invalid, usage, snap)
+    out["usage"] = usage
+    return out
+
+def _needs_retry(v: Dict, snap: ontology.OntologySnapshot) -> bool:
+    return (not v.get("ok")) or bool(v.get("errors")) or bool(unknown_terms(v, snap))
+
+def _local_repair(sparql_text: str, v: Dict, snap: ontology.OntologySnapshot) -> Tuple[str, Dict, List[str]]:
+    fixed, fixes = repair_sparql(sparql_text, v, snap, _CANONICAL_PREFIXES)
+    if not fixes:
+        return sparql_text, v, []
+    return fixed, validate_sparql(fixed, snap), fixes
+
+async def _acheck_and_retry(messages: List[Dict[str, str]], sparql_text: str, retry_if_invalid: bool, usage: Dict[str, int],
+                            snap: ontology.OntologySnapshot) -> Dict:
+    """Prüfung, lokale Reparatur und ggf. LLM-Korrekturrunde – alles gegen denselben Snapshot wie der Prompt."""
     bad = _contains_disallowed(sparql_text)
     if bad:
         return {"ok": False, "reason": f"Disallowed keyword: {bad}", "sparql": sparql_text}
 
-    v = validate_sparql(sparql_text)
-    if (not v.get("ok")) or v.get("errors"):
+    # Erst lokal reparieren (Prefixes, Schreibweise unbekannter Terme); LLM-Runde nur, wenn das nicht reicht.
+    sparql_text, v, fixes = _local_repair(sparql_text, validate_sparql(sparql_text, snap), snap)
+    if _needs_retry(v, snap):
         if retry_if_invalid:
             feedback = _make_feedback(v)
             messages.append({"role": "assistant", "content": f"Vorheriger Vorschlag:\n```sparql\n{sparql_text}\n```"})
             messages.append({"role": "user", "content": f"Korrigiere gemäß Feedback:\n{feedback}\nNur gültigen ```sparql``` Codeblock ausgeben."})
-            resp2 = client.responses.create(
-                model=s.llm_model,
-                temperature=s.llm_temperature,
-                max_output_tokens=s.llm_max_output_tokens,
-                input=messages,
-            )
-            draft2 = resp2.output_text or ""
+            draft2 = await _acomplete(messages, usage)
             sparql_text2 = _extract_sparql_from_text(draft2) or ""
             bad2 = _contains_disallowed(sparql_text2)
             if bad2:
                 return {"ok": False, "reason": f"Disallowed keyword: {bad2}", "sparql": sparql_text2}
-            v2 = validate_sparql(sparql_text2)
-            return {"ok": v2.get("ok", False), "sparql": sparql_text2, "validation": v2, "attempts": 2, "placeholders": _ph}
-        return {"ok": False, "sparql": sparql_text, "validation": v, "attempts": 1, "placeholders": _ph}
-
-    return {"ok": True, "sparql": sparql_text, "validation": v, "attempts": 1, "placeholders": _ph}
+            sparql_text2, v2, fixes2 = _local_repair(sparql_text2, validate_sparql(sparql_text2, snap), snap)
+            return {"ok": v2.get("ok", False), "sparql": sparql_text2, "validation": v2, "attempts": 2,
+                    "repair": {"path": "llm", "fixes": fixes + fixes2}}
+        return {"ok": v.get("ok", False), "sparql": sparql_text, "validation": v, "attempts": 1,
+                "repair": {"path": "local" if fixes else "none", "fixes": fixes}}
+
+    return {"ok": True, "sparql": sparql_text, "validation": v, "attempts": 1,
+            "repair": {"path": "local" if fixes else "none", "fixes": fixes}}
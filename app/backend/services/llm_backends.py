@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import asyncio
+import re
+from abc import ABC, abstractmethod
+import weakref
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional
+
+from openai import AsyncOpenAI
+
+from app.backend.config import get_settings
+
+Messages = List[Dict[str, str]]
+
+
+@dataclass
+class Completion:
+    text: str
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+
+
+# ---------- Intent-Heuristik (auch von /draft genutzt) ----------
+_INTENT_RE = re.compile(r"\[Intent=(\w+)\]", re.IGNORECASE)
+_INTENT_KEYWORDS = (
+    ("insert", ("füge", "hinzufügen", "insert", "neu")),
+    ("update", ("ändere", "update", "ersetze", "korrigiere")),
+    ("delete", ("lösche", "delete", "entferne")),
+)
+
+
+def classify_intent(text: str) -> str:
+    m = _INTENT_RE.search(text or "")
+    if m:
+        return m.group(1).lower()
+    t = (text or "").lower()
+    for intent, words in _INTENT_KEYWORDS:
+        if any(k in t for k in words):
+            return intent
+    return "select"
+
+
+def _report(usage: Optional[Dict[str, int]], prompt_tokens: int, output_tokens: int) -> None:
+    if usage is not None:
+        usage["prompt_tokens"] = prompt_tokens or 0
+        usage["output_tokens"] = output_tokens or 0
+
+
+# ---------- Backends ----------
+class LLMBackend(ABC):
+    """
+    Schnittstelle für Chat-artige LLM-Aufrufe (Nachrichten im Responses-/Chat-Format);
+    ohne `complete` und `stream` lässt sich ein Backend nicht instanziieren.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def complete(self, messages: Messages, temperature: Optional[float] = None) -> Completion:
+        ...
+
+    @abstractmethod
+    async def stream(self, messages: Messages, usage: Optional[Dict[str, int]] = None) -> AsyncIterator[str]:
+        """
+        Text-Deltas. Meldet der Server Token-Zahlen, landen sie in `usage` (`prompt_tokens`/
+        `output_tokens`). Ohne echtes Streaming per `super().stream(...)`: ein einziges Delta
+        mit der vollständigen Antwort.
+        """
+        c = await self.complete(messages)
+        _report(usage, c.prompt_tokens, c.output_tokens)
+        yield c.text
+
+    async def aclose(self) -> None:
+        return None
+
+
+class _PerLoopClient:
+    """Ein langlebiger AsyncOpenAI-Client je Event-Loop (Connection-Pool wird wiederverwendet)."""
+
+    def __init__(self) -> None:
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = weakref.WeakKeyDictionary()
+
+    def get(self, base_url: Optional[str]) -> AsyncOpenAI:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = AsyncOpenAI(api_key=get_settings().openai_api_key, base_url=base_url or None)
+            self._clients[loop] = client
+        return client
+
+    async def aclose(self) -> None:
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+
+
+class OpenAIBackend(LLMBackend):
+    """OpenAI Responses API."""
+
+    name = "openai"
+
+    def __init__(self) -> None:
+        self._client = _PerLoopClient()
+
+    def _create(self, messages: Messages, temperature: Optional[float] = None, **kw):
+        s = get_settings()
+        return self._client.get(s.llm_base_url).responses.create(
+            model=s.llm_model,
+            temperature=s.llm_temperature if temperature is None else temperature,
+            max_output_tokens=s.llm_max_output_tokens,
+            input=messages,
+            **kw,
+        )
+
+    async def complete(self, messages: Messages, temperature: Optional[float] = None) -> Completion:
+        resp = await self._create(messages, temperature)
+        u = getattr(resp, "usage", None)
+        text = getattr(resp, "output_text", None) or \
+            (resp.output[0].content[0].text if getattr(resp, "output", None) else "") or ""
+        return Completion(text, getattr(u, "input_tokens", 0) or 0, getattr(u, "output_tokens", 0) or 0)
+
+    async def stream(self, messages: Messages, usage: Optional[Dict[str, int]] = None) -> AsyncIterator[str]:
+        stream = await self._create(messages, stream=True)
+        async with stream:
+            async for event in stream:
+                kind = getattr(event, "type", "")
+                if kind == "response.output_text.delta":
+                    yield event.delta
+                elif kind == "response.completed":
+                    u = getattr(getattr(event, "response", None), "usage", None)
+                    if u is not None:
+                        _report(usage, getattr(u, "input_tokens", 0), getattr(u, "output_tokens", 0))
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+class OpenAICompatibleBackend(OpenAIBackend):
+    """OpenAI-kompatibler HTTP-Server (vLLM, llama.cpp, Ollama …) über /v1/chat/completions."""
+
+    name = "openai_compat"
+
+    def _create(self, messages: Messages, temperature: Optional[float] = None, **kw):
+        s = get_settings()
+        return self._client.get(s.llm_base_url).chat.completions.create(
+            model=s.llm_model,
+            temperature=s.llm_temperature if temperature is None else temperature,
+            max_tokens=s.llm_max_output_tokens,
+            messages=messages,
+            **kw,
+        )
+
+    async def complete(self, messages: Messages, temperature: Optional[float] = None) -> Completion:
+        resp = await self._create(messages, temperature)
+        u = getattr(resp, "usage", None)
+        text = resp.choices[0].message.content if resp.choices else ""
+        return Completion(text or "", getattr(u, "prompt_tokens", 0) or 0, getattr(u, "completion_tokens", 0) or 0)
+
+    async def stream(self, messages: Messages, usage: Optional[Dict[str, int]] = None) -> AsyncIterator[str]:
+        stream = await self._create(messages, stream=True, stream_options={"include_usage": True})
+        async with stream:
+            async for chunk in stream:
+                u = getattr(chunk, "usage", None)
+                if u is not None:  # letzter Chunk, ohne choices
+                    _report(usage, getattr(u, "prompt_tokens", 0), getattr(u, "completion_tokens", 0))
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield delta
+
+
+class TemplateBackend(LLMBackend):
+    """
+    Deterministisches Offline-Backend: wählt anhand des Intents die passende
+    Few-Shot-Antwort aus den Prompt-Nachrichten und wartet LLM_TEMPLATE_LATENCY_MS.
+    Für Last-/Latenztests der Guardrail-Pipeline ohne Netz und ohne Kosten.
+    """
+
+    name = "template"
+    _ORDER = ("insert", "update", "delete", "select")
+
+    def _answer(self, messages: Messages) -> str:
+        # Few-Shot-Antworten sind reine Codeblöcke; die Nutzeranfrage folgt auf die letzte davon
+        # (bei Korrektur-Runden kommen danach noch Feedback-Nachrichten).
+        idx = [i for i, m in enumerate(messages) if m["role"] == "assistant" and m["content"].lstrip().startswith("```")]
+        if not idx:
+            return ""
+        shots = [messages[i]["content"] for i in idx]
+        request = messages[idx[-1] + 1]["content"] if idx[-1] + 1 < len(messages) else ""
+        intent = classify_intent(request)
+        i = self._ORDER.index(intent) if intent in self._ORDER else len(self._ORDER) - 1
+        return shots[min(i, len(shots) - 1)]
+
+    async def complete(self, messages: Messages, temperature: Optional[float] = None) -> Completion:
+        await asyncio.sleep(get_settings().llm_template_latency_ms / 1000.0)
+        text = self._answer(messages)
+        prompt_chars = sum(len(m.get("content", "")) for m in messages)
+        return Completion(text, prompt_chars // 4, len(text) // 4)
+
+    async def stream(self, messages: Messages, usage: Optional[Dict[str, int]] = None) -> AsyncIterator[str]:
+        text = self._answer(messages)
+        _report(usage, sum(len(m.get("content", "")) for m in messages) // 4, len(text) // 4)
+        chunks = [text[i:i + 16] for i in range(0, len(text), 16)] or [""]
+        delay = get_settings().llm_template_latency_ms / 1000.0 / len(chunks)
+        for c in chunks:
+            await asyncio.sleep(delay)
+            yield c
+
+
+_BACKENDS = {b.name: b for b in (OpenAIBackend, OpenAICompatibleBackend, TemplateBackend)}
+_INSTANCES: Dict[str, LLMBackend] = {}
+
+
+def get_backend() -> LLMBackend:
+    name = (get_settings().llm_backend or "openai").strip().lower()
+    if name not in _BACKENDS:
+        raise ValueError(f"Unbekanntes LLM_BACKEND: {name} (erlaubt: {', '.join(_BACKENDS)})")
+    inst = _INSTANCES.get(name)
+    if inst is None:
+        inst = _INSTANCES[name] = _BACKENDS[name]()
+    return inst
+
+
+async def aclose_backends() -> None:
+    for inst in list(_INSTANCES.values()):
+        await inst.aclose()
+
+
+__all__ = [
+    "Completion",
+    "LLMBackend",
+    "OpenAIBackend",
+    "OpenAICompatibleBackend",
+    "TemplateBackend",
+    "classify_intent",
+    "get_backend",
+    "aclose_backends",
+]
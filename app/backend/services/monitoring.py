@@ -1,17 +1,29 @@
 from __future__ import annotations
 
-import re
-from prometheus_client import CollectorRegistry, Histogram, generate_latest
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest
 
 from app.backend.config import get_settings
+from app.backend.services.perfstats import normalize_path
 
 _prometheus_registry: CollectorRegistry
 _http_histogram: Histogram
 _fuseki_histogram: Histogram
+_generation_cache_counter: Counter
+_llm_candidates_counter: Counter
+_llm_wasted_tokens_counter: Counter
+_select_cache_counter: Counter
+_breaker_state_gauge: Gauge
+_breaker_transitions_counter: Counter
+_fuseki_retries_counter: Counter
+_fuseki_hedged_counter: Counter
+_perf_dropped_counter: Counter
 
 
 def _init_registry() -> None:
-    global _prometheus_registry, _http_histogram, _fuseki_histogram
+    global _prometheus_registry, _http_histogram, _fuseki_histogram, _generation_cache_counter
+    global _llm_candidates_counter, _llm_wasted_tokens_counter, _select_cache_counter
+    global _breaker_state_gauge, _breaker_transitions_counter, _fuseki_retries_counter, _fuseki_hedged_counter
+    global _perf_dropped_counter
     _prometheus_registry = CollectorRegistry()
     _http_histogram = Histogram(
         "nl2sparql_http_request_duration_seconds",
@@ -25,12 +37,62 @@ def _init_registry() -> None:
         labelnames=("operation", "status"),
         registry=_prometheus_registry,
     )
+    _generation_cache_counter = Counter(
+        "nl2sparql_generation_cache",
+        "NL->SPARQL generation cache lookups (hit, miss, coalesced)",
+        labelnames=("result",),
+        registry=_prometheus_registry,
+    )
+    _llm_candidates_counter = Counter(
+        "nl2sparql_llm_candidates",
+        "Speculative LLM candidates by outcome (accepted, rejected, cancelled, failed)",
+        labelnames=("outcome",),
+        registry=_prometheus_registry,
+    )
+    _llm_wasted_tokens_counter = Counter(
+        "nl2sparql_llm_wasted_tokens",
+        "Prompt+output tokens of completed but unused speculative candidates",
+        registry=_prometheus_registry,
+    )
+    _select_cache_counter = Counter(
+        "nl2sparql_select_cache",
+        "SELECT result cache events (hit, miss, stale, evicted, too_large)",
+        labelnames=("result",),
+        registry=_prometheus_registry,
+    )
+    _breaker_state_gauge = Gauge(
+        "nl2sparql_fuseki_breaker_state",
+        "Fuseki circuit breaker state (0 closed, 1 half_open, 2 open)",
+        registry=_prometheus_registry,
+    )
+    _breaker_transitions_counter = Counter(
+        "nl2sparql_fuseki_breaker_transitions",
+        "Fuseki circuit breaker transitions by target state",
+        labelnames=("state",),
+        registry=_prometheus_registry,
+    )
+    _fuseki_retries_counter = Counter(
+        "nl2sparql_fuseki_retries",
+        "Retried Fuseki read attempts",
+        labelnames=("operation",),
+        registry=_prometheus_registry,
+    )
+    _fuseki_hedged_counter = Counter(
+        "nl2sparql_fuseki_hedged",
+        "Hedged SELECTs by winning request (primary, hedge)",
+        labelnames=("winner",),
+        registry=_prometheus_registry,
+    )
+    _perf_dropped_counter = Counter(
+        "nl2sparql_perf_events_dropped",
+        "Perf log events not written (queue_full, write_error)",
+        labelnames=("reason",),
+        registry=_prometheus_registry,
+    )
 
 
 _init_registry()
 
-_path_cleanup_re = re.compile(r"/([0-9a-fA-F-]{6,}|[0-9]{2,})")
-
 
 def _metrics_enabled() -> bool:
     try:
@@ -42,7 +104,7 @@ def _metrics_enabled() -> bool:
 def record_http_request(method: str, path: str, status: int, duration_s: float) -> None:
     if not _metrics_enabled():
         return
-    normalised_path = _path_cleanup_re.sub("/:id", path)
+    normalised_path = normalize_path(path)
     _http_histogram.labels(method=method, path=normalised_path, status=str(status)).observe(duration_s)
 
 
@@ -52,6 +114,53 @@ def record_fuseki_request(operation: str, status: int, duration_s: float) -> Non
     _fuseki_histogram.labels(operation=operation, status=str(status)).observe(duration_s)
 
 
+def record_generation_cache(result: str) -> None:
+    if not _metrics_enabled():
+        return
+    _generation_cache_counter.labels(result=result).inc()
+
+
+def record_select_cache(result: str, n: int = 1) -> None:
+    if not _metrics_enabled():
+        return
+    _select_cache_counter.labels(result=result).inc(n)
+
+
+def record_breaker_state(state: str, value: int) -> None:
+    if not _metrics_enabled():
+        return
+    _breaker_state_gauge.set(value)
+    _breaker_transitions_counter.labels(state=state).inc()
+
+
+def record_fuseki_retry(operation: str) -> None:
+    if not _metrics_enabled():
+        return
+    _fuseki_retries_counter.labels(operation=operation).inc()
+
+
+def record_fuseki_hedge(winner: str) -> None:
+    if not _metrics_enabled():
+        return
+    _fuseki_hedged_counter.labels(winner=winner).inc()
+
+
+def record_perf_dropped(reason: str, n: int = 1) -> None:
+    if not _metrics_enabled():
+        return
+    _perf_dropped_counter.labels(reason=reason).inc(n)
+
+
+def record_llm_candidates(outcomes: dict, wasted_tokens: int) -> None:
+    if not _metrics_enabled():
+        return
+    for outcome, n in outcomes.items():
+        if n:
+            _llm_candidates_counter.labels(outcome=outcome).inc(n)
+    if wasted_tokens:
+        _llm_wasted_tokens_counter.inc(wasted_tokens)
+
+
 def prometheus_latest() -> bytes:
     return generate_latest(_prometheus_registry)
 
@@ -63,6 +172,13 @@ def reset_metrics_for_tests() -> None:  # pragma: no cover - used in tests
 __all__ = [
     "record_http_request",
     "record_fuseki_request",
+    "record_generation_cache",
+    "record_llm_candidates",
+    "record_select_cache",
+    "record_breaker_state",
+    "record_fuseki_retry",
+    "record_fuseki_hedge",
+    "record_perf_dropped",
     "prometheus_latest",
     "reset_metrics_for_tests",
 ]
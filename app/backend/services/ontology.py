@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from app.backend.config import get_settings
+from app.backend.services import sparql
+
+# ---------- Abfragen ----------
+_QUERY_CLASSES = """
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX owl:  <http://www.w3.org/2002/07/owl#>
+SELECT DISTINCT ?c ?label WHERE {
+  { ?c a rdfs:Class } UNION { ?c a owl:Class }
+  OPTIONAL { ?c rdfs:label ?label }
+} ORDER BY ?c
+"""
+
+_QUERY_PROPERTIES = """
+PREFIX rdf:  <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX owl:  <http://www.w3.org/2002/07/owl#>
+SELECT DISTINCT ?p ?label WHERE {
+  { ?p a rdf:Property } UNION { ?p a owl:ObjectProperty } UNION { ?p a owl:DatatypeProperty }
+  OPTIONAL { ?p rdfs:label ?label }
+} ORDER BY ?p
+"""
+
+# Schema-Axiome für die Tripel-Prüfung im Validator (Domain/Range, Property-Typ, Klassenhierarchie)
+_QUERY_SCHEMA = """
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX owl:  <http://www.w3.org/2002/07/owl#>
+SELECT DISTINCT ?s ?rel ?o WHERE {
+  { ?s rdfs:domain ?o BIND("domain" AS ?rel) }
+  UNION { ?s rdfs:range ?o BIND("range" AS ?rel) }
+  UNION { ?s rdfs:subClassOf ?o BIND("subClassOf" AS ?rel) }
+  UNION {
+    VALUES ?o { owl:ObjectProperty owl:DatatypeProperty owl:FunctionalProperty }
+    ?s a ?o BIND("type" AS ?rel)
+  }
+  FILTER(isIRI(?s) && isIRI(?o))
+}
+"""
+
+# Billige Änderungserkennung: Anzahl Schema-Terme + Labels + Schema-Axiome
+_QUERY_PROBE = """
+PREFIX rdf:  <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX owl:  <http://www.w3.org/2002/07/owl#>
+SELECT ?terms ?labels ?axioms WHERE {
+  {
+    SELECT (COUNT(?x) AS ?terms) (COUNT(?label) AS ?labels) WHERE {
+      VALUES ?t { rdfs:Class owl:Class rdf:Property owl:ObjectProperty owl:DatatypeProperty }
+      ?x a ?t .
+      OPTIONAL { ?x rdfs:label ?label }
+    }
+  }
+  {
+    SELECT (COUNT(*) AS ?axioms) WHERE {
+      { VALUES ?r { rdfs:domain rdfs:range rdfs:subClassOf } ?s ?r ?o }
+      UNION { ?s a owl:FunctionalProperty }
+    }
+  }
+}
+"""
+
+
+# ---------- Snapshot ----------
+@dataclass(frozen=True)
+class OntologySnapshot:
+    """Unveränderlicher Stand des Vokabulars (Klassen, Properties, Labels, Schema-Axiome)."""
+
+    classes: Tuple[str, ...]
+    properties: Tuple[str, ...]
+    labels: Mapping[str, Tuple[str, ...]]
+    fingerprint: str
+    schema: Tuple[Tuple[str, str, str], ...] = ()  # (Subjekt, domain|range|subClassOf|type, Objekt), sortiert
+    version: int = 1  # 0 = Platzhalter EMPTY, noch nichts geladen
+    probe: Optional[str] = None
+    loaded_at: float = field(default_factory=time.time)
+    class_set: frozenset = field(init=False, repr=False)
+    property_set: frozenset = field(init=False, repr=False)
+    _derived: Dict[str, Any] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "class_set", frozenset(self.classes))
+        object.__setattr__(self, "property_set", frozenset(self.properties))
+        object.__setattr__(self, "_derived", {})
+
+    @classmethod
+    def from_terms(
+        cls,
+        classes: Iterable[str],
+        properties: Iterable[str],
+        labels: Optional[Mapping[str, Iterable[str]]] = None,
+        version: int = 1,
+        probe: Optional[str] = None,
+        schema: Optional[Iterable[Tuple[str, str, str]]] = None,
+    ) -> "OntologySnapshot":
+        cls_t = tuple(sorted(set(classes)))
+        props_t = tuple(sorted(set(properties)))
+        lbls = {u: tuple(ls) for u, ls in (labels or {}).items() if ls}
+        axioms = tuple(sorted(set(schema or ())))
+        return cls(
+            classes=cls_t,
+            properties=props_t,
+            labels=lbls,
+            fingerprint=_fingerprint(cls_t, props_t, lbls, axioms),
+            schema=axioms,
+            version=version,
+            probe=probe,
+        )
+
+    @property
+    def ready(self) -> bool:
+        """False nur für den Platzhalter, solange der erste Ladevorgang läuft."""
+        return self.version > 0
+
+    def label(self, uri: str) -> Optional[str]:
+        ls = self.labels.get(uri)
+        return ls[0] if ls else None
+
+    def derived(self, name: str, build: Callable[[], Any]) -> Any:
+        """Abgeleitete Strukturen (Indizes o. ä.) einmal je Snapshot bauen und mitführen."""
+        try:
+            return self._derived[name]
+        except KeyError:
+            return self._derived.setdefault(name, build())
+
+
+def _fingerprint(
+    classes: Tuple[str, ...],
+    props: Tuple[str, ...],
+    labels: Mapping[str, Tuple[str, ...]],
+    schema: Tuple[Tuple[str, str, str], ...] = (),
+) -> str:
+    h = hashlib.sha256()
+    for part in (classes, props):
+        for u in part:
+            h.update(u.encode("utf-8"))
+            h.update(b"\n")
+        h.update(b"\x00")
+    for u in sorted(labels):
+        h.update(u.encode("utf-8"))
+        for lbl in labels[u]:
+            h.update(b"\t" + lbl.encode("utf-8"))
+        h.update(b"\n")
+    for axiom in schema:
+        h.update("\t".join(axiom).encode("utf-8") + b"\n")
+    return h.hexdigest()[:16]
+
+
+def _rows(res: dict, var: str) -> Tuple[List[str], Dict[str, List[str]]]:
+    terms: List[str] = []
+    labels: Dict[str, List[str]] = {}
+    seen = set()
+    for b in res["results"]["bindings"]:
+        uri = b[var]["value"]
+        if uri not in seen:
+            seen.add(uri)
+            terms.append(uri)
+        lbl = b.get("label", {}).get("value")
+        if lbl is not None and lbl not in labels.setdefault(uri, []):
+            labels[uri].append(lbl)
+    return terms, labels
+
+
+def _axioms(res: dict) -> List[Tuple[str, str, str]]:
+    out = []
+    for b in res["results"]["bindings"]:
+        if "s" in b and "rel" in b and "o" in b:
+            out.append((b["s"]["value"], b["rel"]["value"], b["o"]["value"]))
+    return out
+
+
+def _probe() -> str:
+    b = sparql.query_select(_QUERY_PROBE)["results"]["bindings"]
+    row = b[0] if b else {}
+    return "/".join(row.get(k, {}).get("value", "0") for k in ("terms", "labels", "axioms"))
+
+
+def _load(version: int, probe: Optional[str]) -> OntologySnapshot:
+    # unabhängige Abfragen parallel: Ladezeit = langsamste statt Summe
+    res_cls, res_props, res_schema = sparql.select_many(_QUERY_CLASSES, _QUERY_PROPERTIES, _QUERY_SCHEMA)
+    classes, cls_labels = _rows(res_cls, "c")
+    props, prop_labels = _rows(res_props, "p")
+    schema = _axioms(res_schema)
+    return OntologySnapshot.from_terms(
+        classes, props, {**cls_labels, **prop_labels}, version=version, probe=probe, schema=schema
+    )
+
+
+# ---------- Registry ----------
+# Platzhalter, solange der erste Ladevorgang im Hintergrund läuft (Requests warten nicht darauf);
+# `ready` ist False – Endpoints antworten dann mit 503, der Validator prüft keine Terme
+EMPTY = OntologySnapshot.from_terms((), (), version=0, probe=None)
+
+
+class OntologyNotReady(RuntimeError):
+    """Die Ontologie wird noch geladen; Aufrufer sollen nach `retry_after` Sekunden erneut versuchen."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"Ontologie wird noch geladen, erneuter Versuch in {retry_after:.0f} s")
+        self.retry_after = retry_after
+
+
+class OntologyRegistry:
+    """
+    Prozessweiter Ontologie-Stand für LLM-Prompt, Validator und /ontology/terms.
+    Leser bekommen immer einen fertigen Snapshot; ein Hintergrund-Thread lädt den
+    ersten Stand, prüft danach periodisch per Probe-Query auf Änderungen und lädt
+    nur dann (bzw. spätestens nach ONTOLOGY_REFRESH_SECONDS) neu. Der neue Snapshot
+    ersetzt den alten mit einer einzigen Zuweisung; Leser nehmen keine Locks.
+    """
+
+    def __init__(self) -> None:
+        self._snapshot: Optional[OntologySnapshot] = None
+        self._init_lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last: Dict[str, Any] = {}  # letzte Prüfung (Probe, ggf. Neuladen)
+        self._last_reload: Optional[Dict[str, Any]] = None
+        self._refreshing = False
+
+    def snapshot(self) -> OntologySnapshot:
+        snap = self._snapshot
+        if snap is not None:
+            return snap
+        if self._thread is not None and self._thread.is_alive():
+            return EMPTY  # erster Ladevorgang läuft noch im Hintergrund
+        with self._init_lock:
+            if self._snapshot is None:
+                self.refresh(force=True)
+        return self._snapshot  # type: ignore[return-value]
+
+    def swap(self, snap: Optional[OntologySnapshot]) -> None:
+        self._snapshot = snap
+
+    def refresh(self, force: bool = False) -> bool:
+        """Lädt neu, wenn erzwungen oder die Probe eine Änderung meldet. True = Inhalt geändert."""
+        with self._load_lock:
+            self._refreshing = True
+            t0 = time.perf_counter()
+            try:
+                changed, reloaded = self._refresh(force)
+            except Exception as ex:
+                self._finish(t0, error=str(ex))
+                raise
+            finally:
+                self._refreshing = False
+            snap = self._snapshot
+            dur_ms = self._finish(t0, changed=changed, reloaded=reloaded)
+            if reloaded:
+                sparql._perf(
+                    "ontology",
+                    op="refresh",
+                    version=snap.version,
+                    fingerprint=snap.fingerprint,
+                    changed=changed,
+                    dur_ms=dur_ms,
+                )
+            return changed
+
+    def _refresh(self, force: bool) -> Tuple[bool, bool]:
+        current = self._snapshot
+        probe = _probe()
+        if not force and current is not None and current.probe == probe:
+            return False, False
+        version = (current.version + 1) if current else 1
+        snap = _load(version, probe)
+        changed = current is None or snap.fingerprint != current.fingerprint
+        if not changed:
+            # Inhalt unverändert -> Version und abgeleitete Indizes behalten
+            snap = replace(current, probe=probe, loaded_at=snap.loaded_at)
+            object.__setattr__(snap, "_derived", current._derived)
+        self._snapshot = snap
+        return changed, True
+
+    def _finish(self, t0: float, **info: Any) -> float:
+        dur_ms = round((time.perf_counter() - t0) * 1000.0, 1)
+        self._last = {"at": time.time(), "dur_ms": dur_ms, "changed": False, "reloaded": False, "error": None, **info}
+        if info.get("reloaded"):
+            self._last_reload = dict(self._last)
+        return dur_ms
+
+    def status(self) -> Dict[str, Any]:
+        snap = self._snapshot
+        return {
+            "ready": snap is not None,
+            "version": snap.version if snap else 0,
+            "fingerprint": snap.fingerprint if snap else None,
+            "loaded_at": snap.loaded_at if snap else None,
+            "classes": len(snap.classes) if snap else 0,
+            "properties": len(snap.properties) if snap else 0,
+            "schema_axioms": len(snap.schema) if snap else 0,
+            "refreshing": self._refreshing,
+            "background": self._thread is not None and self._thread.is_alive(),
+            "last_check": self._last or None,
+            "last_reload": self._last_reload,
+        }
+
+    # ---- Hintergrund-Aktualisierung ----
+    def start(self) -> None:
+        """Startet den Hintergrund-Thread; blockiert nicht (auch nicht, wenn Fuseki nicht erreichbar ist)."""
+        s = get_settings()
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(s.ontology_check_seconds, s.ontology_refresh_seconds, s.ontology_retry_seconds),
+            name="ontology-refresh",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def _run(self, check_s: int, full_s: int, retry_s: int) -> None:
+        last_full = time.monotonic()
+        delay: float = 0
+        while not self._stop.wait(delay):
+            initial = self._snapshot is None
+            force = initial or (full_s > 0 and time.monotonic() - last_full >= full_s)
+            try:
+                self.refresh(force=force)
+                if force:
+                    last_full = time.monotonic()
+            except Exception as ex:
+                sparql._perf("ontology", op="refresh", error=str(ex))
+            if self._snapshot is None:
+                delay = max(1, retry_s)
+            elif check_s > 0:
+                delay = check_s
+            else:
+                return  # nur Erstladung, keine periodische Prüfung
+
+
+registry = OntologyRegistry()
+
+
+def current() -> OntologySnapshot:
+    return registry.snapshot()
+
+
+def ready_snapshot() -> OntologySnapshot:
+    """Wie `current()`, aber OntologyNotReady statt des leeren Platzhalters."""
+    snap = registry.snapshot()
+    if not snap.ready:
+        raise OntologyNotReady(max(1, get_settings().ontology_retry_seconds))
+    return snap
+
+
+__all__ = ["OntologySnapshot", "OntologyRegistry", "OntologyNotReady", "registry", "current", "ready_snapshot", "EMPTY"]
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import atexit
+import os
+import queue
+import threading
+import time
+from typing import List, Optional
+
+from app.backend.config import get_settings
+from app.backend.services import perfstats
+from app.backend.services.monitoring import record_perf_dropped
+from app.backend.services.segments import SegmentedLog
+
+# ---------- Gemeinsame Senke für Perf-Events (HTTP, Fuseki, LLM, Ontologie) ----------
+# emit() legt das Event nur in eine begrenzte Queue; ein Hintergrund-Thread schreibt
+# gesammelt (je Batch ein open/write) in Zeitsegmente (services/segments.py) – der Request
+# wartet nie auf das Dateisystem.
+# Die Latenz-Statistik (services/perfstats.py) bekommt jedes Event direkt, auch verworfene.
+
+PERF_LOG = os.getenv("PERF_LOG_FILE", "app/backend/logs/perf.jsonl")
+_STOP = object()
+
+
+class PerfSink:
+    """
+    Batches nach PERF_LOG_BATCH_SIZE Events bzw. spätestens PERF_LOG_FLUSH_MS nach dem
+    ersten Event; volle Queue -> Event verwerfen und zählen. Segmente älter als
+    PERF_LOG_RETENTION_DAYS werden gelöscht. Der Thread startet beim ersten Event, auch nach close().
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.log = SegmentedLog(path, retention_days=lambda: get_settings().perf_log_retention_days)
+        self.dropped = 0
+        self.written = 0
+        self._lock = threading.Lock()
+        self._queue: Optional[queue.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def emit(self, row: dict) -> None:
+        q = self._queue
+        if q is None or self._thread is None or not self._thread.is_alive():
+            q = self._start()
+        try:
+            q.put_nowait(row)
+        except queue.Full:
+            self._drop(1, "queue_full")
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wartet, bis alle bisher eingereihten Events geschrieben sind (Tests, Shutdown)."""
+        q, t = self._queue, self._thread
+        if q is None or t is None or not t.is_alive():
+            return True
+        done = threading.Event()
+        q.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            q, t = self._queue, self._thread
+            self._queue = self._thread = None
+        if t is not None and t.is_alive():
+            q.put(_STOP)
+            t.join(timeout)
+        self.log.close()
+
+    def _start(self) -> queue.Queue:
+        with self._lock:
+            if self._queue is None or self._thread is None or not self._thread.is_alive():
+                s = get_settings()
+                self._queue = queue.Queue(maxsize=max(1, s.perf_log_queue_size))
+                self._thread = threading.Thread(
+                    target=self._run, args=(self._queue, max(1, s.perf_log_batch_size), s.perf_log_flush_ms / 1000.0),
+                    name="perf-log", daemon=True,
+                )
+                self._thread.start()
+            return self._queue
+
+    def _drop(self, n: int, reason: str) -> None:
+        with self._lock:
+            self.dropped += n
+        record_perf_dropped(reason, n)
+
+    def _run(self, q: queue.Queue, batch_size: int, flush_s: float) -> None:
+        batch: List[dict] = []
+        deadline: Optional[float] = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = q.get(timeout=timeout)
+            except queue.Empty:
+                item = None  # Flush-Zeitpunkt erreicht
+            if item is _STOP or isinstance(item, threading.Event):
+                self._write(batch)
+                batch, deadline = [], None
+                if item is _STOP:
+                    return
+                item.set()
+                continue
+            if item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + flush_s
+            if batch and (len(batch) >= batch_size or time.monotonic() >= deadline):
+                self._write(batch)
+                batch, deadline = [], None
+
+    def _write(self, batch: List[dict]) -> None:
+        if not batch:
+            return
+        try:
+            self.log.append(batch)
+        except OSError:
+            self._drop(len(batch), "write_error")
+            return
+        self.written += len(batch)
+
+
+sink = PerfSink(PERF_LOG)
+atexit.register(sink.close)
+
+
+def emit(row: dict) -> None:
+    perfstats.observe(row)
+    sink.emit(row)
+
+
+def event(kind: str, **kw) -> None:
+    """Perf-Event mit Zeitstempel (UTC, Sekunden) und Art; weitere Felder frei."""
+    row = {"ts": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "kind": kind}
+    row.update(kw)
+    emit(row)
+
+
+def flush(timeout: float = 5.0) -> bool:
+    return sink.flush(timeout)
+
+
+def close() -> None:
+    sink.close()
+
+
+__all__ = ["PERF_LOG", "PerfSink", "close", "emit", "event", "flush", "sink"]
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import math
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# ---------- Rollierende Latenz-Statistik im Speicher (Quelle für /metrics/perf) ----------
+# Je Minute und Schlüssel (kind, path|op) ein logarithmisches Histogramm (DDSketch-Prinzip):
+# feste relative Genauigkeit, verlustfrei zusammenführbar; eine Abfrage über N Minuten
+# kostet O(Minuten × Schlüssel) statt eines Durchlaufs über das Perf-Log.
+
+RETENTION_MINUTES = 1440
+_ACCURACY = 0.01  # relative Abweichung der Quantile
+_GAMMA = (1 + _ACCURACY) / (1 - _ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+_MIN_MS = 0.01  # kleinere Werte landen im Null-Bucket
+_ID_SEGMENT = re.compile(r"/([0-9a-fA-F-]{6,}|[0-9]{2,})")
+
+Key = Tuple[str, str]
+
+
+class Sketch:
+    """Histogramm über logarithmische Buckets; Quantile mit ±1 % relativem Fehler, `max` exakt."""
+
+    __slots__ = ("bins", "zero", "n", "max")
+
+    def __init__(self) -> None:
+        self.bins: Dict[int, int] = {}
+        self.zero = 0
+        self.n = 0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        self.n += 1
+        if value > self.max:
+            self.max = value
+        if value <= _MIN_MS:
+            self.zero += 1
+            return
+        i = math.ceil(math.log(value) / _LOG_GAMMA)
+        self.bins[i] = self.bins.get(i, 0) + 1
+
+    def merge(self, other: "Sketch") -> None:
+        self.n += other.n
+        self.zero += other.zero
+        self.max = max(self.max, other.max)
+        for i, c in other.bins.items():
+            self.bins[i] = self.bins.get(i, 0) + c
+
+    def quantile(self, q: float) -> float:
+        if self.n == 0:
+            return 0.0
+        rank = q * (self.n - 1)
+        seen = self.zero
+        if rank < seen:
+            return 0.0
+        for i in sorted(self.bins):
+            seen += self.bins[i]
+            if rank < seen:
+                return min(2 * _GAMMA ** i / (_GAMMA + 1), self.max)
+        return self.max
+
+
+def normalize_path(path: str) -> str:
+    """IDs in Pfaden zusammenfassen (wie bei den Prometheus-Labels), damit die Schlüsselmenge klein bleibt."""
+    return _ID_SEGMENT.sub("/:id", path)
+
+
+def event_key(row: dict) -> Optional[Key]:
+    kind = row.get("kind")
+    if kind == "http":
+        return ("http", normalize_path(str(row.get("path") or "")))
+    if kind and row.get("op"):
+        return (str(kind), str(row["op"]))
+    return None
+
+
+class RollingAggregator:
+    """Minuten-Buckets der letzten `retention` Minuten; ältere werden beim Schreiben verworfen."""
+
+    def __init__(self, retention: int = RETENTION_MINUTES) -> None:
+        self.retention = retention
+        self._minutes: Dict[int, Dict[Key, Sketch]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, row: dict, now: Optional[float] = None) -> None:
+        dur = row.get("dur_ms")
+        if not isinstance(dur, (int, float)) or isinstance(dur, bool):
+            return
+        key = event_key(row)
+        if key is None:
+            return
+        minute = int((time.time() if now is None else now) // 60)
+        with self._lock:
+            bucket = self._minutes.get(minute)
+            if bucket is None:
+                bucket = self._minutes[minute] = {}
+                for old in [m for m in self._minutes if m <= minute - self.retention]:
+                    del self._minutes[old]
+            sketch = bucket.get(key)
+            if sketch is None:
+                sketch = bucket[key] = Sketch()
+            sketch.add(float(dur))
+
+    def window(self, minutes: int, now: Optional[float] = None) -> Dict[Key, Sketch]:
+        """Zusammengeführte Sketches je Schlüssel über die letzten `minutes` Minuten (inkl. der laufenden)."""
+        current = int((time.time() if now is None else now) // 60)
+        out: Dict[Key, Sketch] = {}
+        with self._lock:
+            for minute in range(current - minutes + 1, current + 1):
+                for key, sketch in self._minutes.get(minute, {}).items():
+                    merged = out.get(key)
+                    if merged is None:
+                        merged = out[key] = Sketch()
+                    merged.merge(sketch)
+        return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._minutes.clear()
+
+
+def merge(sketches: Iterable[Sketch]) -> Sketch:
+    out = Sketch()
+    for s in sketches:
+        out.merge(s)
+    return out
+
+
+def stats(sketch: Sketch, quantiles: List[float]) -> dict:
+    out = {"n": sketch.n}
+    for q in quantiles:
+        out[f"p{quantile_label(q)}_ms"] = round(sketch.quantile(q), 1)
+    out["max_ms"] = round(sketch.max, 1)
+    return out
+
+
+def quantile_label(q: float) -> str:
+    """0.5 -> "50", 0.99 -> "99", 0.999 -> "999"."""
+    return f"{q * 100:g}".replace(".", "")
+
+
+aggregator = RollingAggregator()
+
+
+def observe(row: dict) -> None:
+    aggregator.observe(row)
+
+
+__all__ = [
+    "RollingAggregator", "Sketch", "aggregator", "event_key", "merge", "normalize_path", "observe",
+    "quantile_label", "stats",
+]
@@ -2,6 +2,8 @@ from __future__ import annotations
 import os, re, hmac, hashlib, base64
 from typing import Iterable
 
+from app.backend.services.sparql_analysis import analyze
+
 # ENV-Konfiguration (mit Defaults)
 _PSEUDO_ON = os.getenv("PSEUDONYMIZE_LOGS", "1").strip() not in ("0", "false", "False", "")
 _SALT = os.getenv("LOG_PSEUDO_SALT", "change-me-in-prod")
@@ -15,10 +17,6 @@ _FIELDS = [
 ]
 
 _URI_PAT = re.compile(r'<([^>]+(?:person|pfarrer|gemeinde|ort)[^>]*)>', re.IGNORECASE)
-_PLAIN_LITERAL_PAT = {
-    field: re.compile(rf'(\b{re.escape(field)}\s+)(?!["\'?])(\w[\w\-]*)', re.IGNORECASE)
-    for field in _FIELDS
-}
 
 
 def _pseudo_uri(uri: str) -> str:
@@ -43,28 +41,36 @@ def mask_sparql_for_log(sparql_text: str, fields: Iterable[str] | None = None) -
     """
     if not enabled():
         return sparql_text
-    fields = list(fields or _FIELDS)
-    out = sparql_text
+    props = {f.casefold() for f in (fields or _FIELDS)}
+    toks = analyze(sparql_text or "").tokens
+    edits: list[tuple[int, int, str]] = []
 
-    # Beispiel-Pattern:  voc:vorname   "Max"
-    # Greift NICHT auf URIs oder BlankNodes, nur Literale in "..."
-    for prop in fields:
-        # \bprop\s*"VALUE"
-        pat = re.compile(rf'(\b{re.escape(prop)}\s*["\'])([^"\']+)(["\'])')
-        out = pat.sub(lambda m: m.group(1) + pseudonym(m.group(2)) + m.group(3), out)
-        plain_pat = _PLAIN_LITERAL_PAT.get(prop)
-        if plain_pat:
-            out = plain_pat.sub(
-                lambda m: m.group(1) + pseudonym(m.group(2))
-                if not m.group(2).startswith("?")
-                else m.group(0),
-                out,
-            )
+    # Beispiel:  voc:vorname "Max", "Maximilian"  bzw. unquotiert  voc:geburtsname Anna
+    # Greift NICHT auf Variablen, URIs oder BlankNodes hinter dem Property.
+    for i, t in enumerate(toks):
+        if t.kind == "IRI":
+            m = _URI_PAT.fullmatch(t.text)
+            if m:
+                edits.append((t.start, t.end, _pseudo_uri(m.group(1))))
+            continue
+        if t.kind != "PNAME" or t.text.casefold() not in props:
+            continue
+        j = i + 1
+        while j < len(toks) and toks[j].kind in ("STRING", "NAME"):
+            o = toks[j]
+            q = 3 if o.kind == "STRING" and o.text[:3] in ('"""', "'''") else (1 if o.kind == "STRING" else 0)
+            if o.end - o.start > 2 * q:
+                edits.append((o.start + q, o.end - q, pseudonym(o.text[q:len(o.text) - q])))
+            j += 1
+            while j < len(toks) and toks[j].kind == "LANGTAG":
+                j += 1
+            if not (j < len(toks) and toks[j].kind == "PUNCT" and toks[j].text == ","):
+                break
+            j += 1
 
-    def _mask_uri(match: re.Match[str]) -> str:
-        return _pseudo_uri(match.group(1))
-
-    out = _URI_PAT.sub(_mask_uri, out)
+    out = sparql_text
+    for start, end, repl in sorted(edits, reverse=True):
+        out = out[:start] + repl + out[end:]
     return out
 
 def mask_log_record(rec: dict) -> dict:
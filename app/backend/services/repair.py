@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from typing import Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+from app.backend.services.ontology import OntologySnapshot
+from app.backend.services.suggest import TrigramIndex, local_key, namespace
+from app.backend.services.validator import validate
+
+# ---------- Lokale Reparatur häufiger LLM-Fehler (vor einer zweiten LLM-Runde) ----------
+_RE_PREFIX_DECL = re.compile(r"PREFIX\s+([A-Za-z][\w\-]*)\s*:\s*<([^>]*)>[ \t]*\n?", re.IGNORECASE)
+_RE_OWN_LINE = re.compile(r"^[ \t]*PREFIX\s+[A-Za-z][\w\-]*\s*:\s*<[^>]*>[ \t]*$", re.IGNORECASE | re.MULTILINE)
+# "voc:#vorname" (Artefakt aus der Kurzschreibweise im Prompt)
+_RE_HASH_CURIE = re.compile(r"(?<![\w\-<])([A-Za-z][\w\-]*):#(?=[A-Za-z_])")
+
+
+def _distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein-Distanz mit Abbruch, sobald `limit` überschritten ist."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        cur = [i]
+        for j, cb in enumerate(b, start=1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        if min(cur) > limit:
+            return limit + 1
+        prev = cur
+    return prev[-1]
+
+
+class _Vocab:
+    """Schlüssel -> URIs je Namespace, getrennt nach Klassen/Properties."""
+
+    def __init__(self, snap: OntologySnapshot) -> None:
+        self.namespaces: FrozenSet[str] = frozenset(namespace(u) for u in snap.classes + snap.properties)
+        self.by_kind: Dict[str, Dict[str, Dict[str, List[str]]]] = {}
+        for kind, terms in (("class", snap.classes), ("property", snap.properties)):
+            idx: Dict[str, Dict[str, List[str]]] = defaultdict(lambda: defaultdict(list))
+            for u in terms:
+                ns = namespace(u)
+                idx[ns][local_key(u)].append(u)
+            self.by_kind[kind] = idx
+
+    def closest(self, uri: str, kind: str, index: TrigramIndex) -> Optional[str]:
+        ns = namespace(uri)
+        keys = self.by_kind[kind].get(ns)
+        if not keys:
+            return None
+        k = local_key(uri)
+        if len(keys.get(k, ())) == 1:
+            return keys[k][0]
+        limit = max(1, len(k) // 5)
+        # Kandidaten aus dem Trigramm-Index statt Vollscan über das Vokabular
+        cands = {local_key(u) for u, _ in index.lookup(k, limit=10, min_score=0.2) if namespace(u) == ns}
+        best, best_d, tie = None, limit + 1, False
+        for cand in sorted(cands):
+            uris = keys.get(cand, [])
+            d = _distance(k, cand, limit)
+            if d < best_d:
+                best, best_d, tie = uris, d, len(uris) > 1
+            elif d == best_d and d <= limit:
+                tie = True
+        return best[0] if best and not tie else None
+
+
+def _vocab(snap: OntologySnapshot) -> _Vocab:
+    return snap.derived("repair_vocab", lambda: _Vocab(snap))
+
+
+def unknown_terms(validation: Mapping, snap: OntologySnapshot) -> List[Tuple[str, str]]:
+    """Unbekannte Terme aus Ontologie-Namespaces als (kind, uri); fremde Vokabulare (rdfs:label …) zählen nicht."""
+    if not snap.ready:
+        return []
+    used = validation.get("used_uris") or {}
+    ns = _vocab(snap).namespaces
+    out = [("class", u) for u in used.get("classes", ()) if u not in snap.class_set and namespace(u) in ns]
+    out += [("property", u) for u in used.get("properties", ()) if u not in snap.property_set and namespace(u) in ns]
+    return out
+
+
+def normalize_prefixes(query: str, canonical: Mapping[str, str]) -> Tuple[str, List[str]]:
+    """
+    Vereinheitlicht den Prolog: bekannte Prefixes bekommen die kanonische IRI, benutzte
+    aber fehlende werden ergänzt, jede Deklaration steht auf einer eigenen Zeile.
+    Entfernt außerdem `voc:#`-Artefakte.
+    """
+    fixes: List[str] = []
+    decls = [(m.group(1), m.group(2)) for m in _RE_PREFIX_DECL.finditer(query)]
+    declared = dict(decls)
+
+    def unhash(m: re.Match[str]) -> str:
+        pfx = m.group(1)
+        base = declared.get(pfx) or canonical.get(pfx) or ""
+        return f"{pfx}:" if base.endswith("#") else m.group(0)
+
+    unhashed = _RE_HASH_CURIE.sub(unhash, query)
+    if unhashed != query:
+        fixes.append("`:#`-Artefakte entfernt")
+        query = unhashed
+
+    body = _RE_PREFIX_DECL.sub("", query)
+    wrong = [p for p, iri in decls if p in canonical and iri != canonical[p]]
+    missing = [p for p in canonical if p not in declared and re.search(rf"(?<![\w\-<]){re.escape(p)}:(?=[A-Za-z_])", body)]
+    split = len(_RE_OWN_LINE.findall(query)) != len(decls)
+    if not (wrong or missing or split):
+        return query, fixes
+
+    lines, seen = [], set()
+    for p, iri in decls + [(p, canonical[p]) for p in missing]:
+        if p not in seen:
+            seen.add(p)
+            lines.append(f"PREFIX {p}:<{canonical.get(p, iri)}>")
+    fixes += [f"PREFIX {p}: auf <{canonical[p]}> korrigiert" for p in wrong]
+    fixes += [f"PREFIX {p}: ergänzt" for p in missing]
+    if split and not (wrong or missing):
+        fixes.append("PREFIX-Deklarationen auf eigene Zeilen gesetzt")
+    return "\n".join(lines) + "\n\n" + body.strip() + "\n", fixes
+
+
+def _replace_term(query: str, old: str, new: str, pmap: Mapping[str, str]) -> str:
+    query = query.replace(f"<{old}>", f"<{new}>")
+    for pfx, base in pmap.items():
+        if not old.startswith(base):
+            continue
+        repl = f"{pfx}:{new[len(base):]}" if new.startswith(base) else f"<{new}>"
+        pattern = rf"(?<![\w\-:<]){re.escape(pfx)}:{re.escape(old[len(base):])}(?![\w\-])"
+        query = re.sub(pattern, lambda _m: repl, query)
+    return query
+
+
+def repair_sparql(query: str, validation: Mapping, snap: OntologySnapshot,
+                  canonical: Mapping[str, str]) -> Tuple[str, List[str]]:
+    """
+    Deterministische Reparatur ohne LLM: Prefixes normalisieren, unbekannte Terme auf
+    den eindeutig nächsten Ontologie-Term abbilden (Schreibweise, Bindestriche, kleine
+    Tippfehler). Liefert (Query, Liste der Korrekturen); leere Liste = nichts geändert.
+    """
+    query, fixes = normalize_prefixes(query or "", canonical)
+    if fixes:
+        # Prefix-Korrekturen ändern die expandierten IRIs -> neu extrahieren
+        validation = validate(query, snap)
+
+    pmap = {m.group(1): m.group(2) for m in _RE_PREFIX_DECL.finditer(query)}
+    vocab = _vocab(snap)
+    for kind, uri in unknown_terms(validation, snap):
+        new = vocab.closest(uri, kind, TrigramIndex.for_snapshot(snap, kind))
+        if new and new != uri:
+            query = _replace_term(query, uri, new, pmap)
+            fixes.append(f"<{uri}> -> <{new}>")
+    return query, fixes
+
+
+__all__ = ["repair_sparql", "normalize_prefixes", "unknown_terms", "namespace"]
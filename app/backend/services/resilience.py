@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Optional, Tuple
+
+import httpx
+
+from app.backend.config import get_settings
+
+# ---------- Circuit Breaker, Backoff und Latenzfenster für Fuseki-Aufrufe ----------
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+_RETRY_STATUS = (502, 503, 504)
+
+
+class CircuitOpenError(RuntimeError):
+    """Fuseki gilt als gestört; Aufrufe werden ohne Netzwerkzugriff abgelehnt."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"Fuseki nicht verfügbar (Circuit Breaker offen, erneuter Versuch in {retry_after:.0f} s)")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    closed -> open nach FUSEKI_BREAKER_FAILURES aufeinanderfolgenden Fehlern bzw. zu
+    langsamen Aufrufen; nach FUSEKI_BREAKER_OPEN_SECONDS lässt half_open genau einen
+    Probe-Aufruf durch, dessen Ergebnis über closed/open entscheidet. Thread-sicher.
+    """
+
+    def __init__(self, on_transition: Optional[Callable[[str, str, str], None]] = None) -> None:
+        self._lock = threading.Lock()
+        self._on_transition = on_transition
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_inflight = False
+
+    def before(self) -> None:
+        """Vor jedem Aufruf; wirft CircuitOpenError, solange der Breaker offen ist."""
+        open_s = get_settings().fuseki_breaker_open_seconds
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            if self.state == OPEN:
+                waited = time.monotonic() - self._opened_at
+                if waited < open_s:
+                    raise CircuitOpenError(open_s - waited)
+                self._transition(HALF_OPEN, "probe")
+            if self._probe_inflight:
+                raise CircuitOpenError(1.0)
+            self._probe_inflight = True
+
+    def record(self, ok: bool, duration_s: float = 0.0) -> None:
+        s = get_settings()
+        slow = s.fuseki_breaker_slow_ms > 0 and duration_s * 1000.0 > s.fuseki_breaker_slow_ms
+        with self._lock:
+            self._probe_inflight = False
+            if ok and not slow:
+                self.failures = 0
+                if self.state != CLOSED:
+                    self._transition(CLOSED, "probe ok")
+                return
+            self.failures += 1
+            reason = "slow" if ok else "error"
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= max(1, s.fuseki_breaker_failures)):
+                self._opened_at = time.monotonic()
+                self._transition(OPEN, reason)
+
+    def release(self) -> None:
+        """Aufruf ohne Ergebnis (abgebrochen): gibt nur den Probe-Platz wieder frei."""
+        with self._lock:
+            self._probe_inflight = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self.failures, self._probe_inflight = 0, False
+            if self.state != CLOSED:
+                self._transition(CLOSED, "reset")
+
+    def _transition(self, state: str, reason: str) -> None:
+        prev, self.state = self.state, state
+        if self._on_transition:
+            self._on_transition(prev, state, reason)
+
+
+class LatencyWindow:
+    """Letzte N erfolgreichen Latenzen (Sekunden) für die Hedging-Verzögerung."""
+
+    def __init__(self, size: int = 256) -> None:
+        self._values: Deque[float] = deque(maxlen=size)
+
+    def add(self, seconds: float) -> None:
+        self._values.append(seconds)
+
+    def quantile(self, q: float, min_samples: int = 20) -> Optional[float]:
+        if len(self._values) < min_samples:
+            return None
+        ordered = sorted(self._values)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def clear(self) -> None:
+        self._values.clear()
+
+
+def classify(ex: BaseException) -> Tuple[bool, bool]:
+    """(zählt als Störung für den Breaker, darf bei Lesezugriffen wiederholt werden)."""
+    if isinstance(ex, httpx.HTTPStatusError):
+        status = ex.response.status_code
+        return status >= 500, status in _RETRY_STATUS
+    if isinstance(ex, httpx.TimeoutException):
+        # Timeouts nicht wiederholen: ein hängender Fuseki würde sonst mehrfach belastet
+        return True, isinstance(ex, httpx.ConnectTimeout)
+    if isinstance(ex, httpx.TransportError):
+        return True, True
+    return False, False
+
+
+def backoff(attempt: int) -> float:
+    """Exponentielles Backoff mit vollem Jitter (Sekunden)."""
+    base = get_settings().fuseki_retry_backoff_ms / 1000.0
+    return random.uniform(0, base * (2 ** attempt))
+
+
+__all__ = [
+    "CircuitBreaker", "CircuitOpenError", "LatencyWindow", "classify", "backoff",
+    "CLOSED", "HALF_OPEN", "OPEN", "STATE_VALUES",
+]
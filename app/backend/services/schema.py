@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple
+
+from app.backend.services.ontology import OntologySnapshot
+from app.backend.services.sparql_analysis import RDF_LANGSTRING, RDF_TYPE, XSD, SparqlAnalysis, Term, Triple
+
+# ---------- Schema-Index (Domain/Range, Property-Typ, Klassenhierarchie) je Ontologie-Version ----------
+OWL = "http://www.w3.org/2002/07/owl#"
+RDFS_LITERAL = "http://www.w3.org/2000/01/rdf-schema#Literal"
+_LITERAL_TYPES = frozenset({
+    RDFS_LITERAL,
+    RDF_LANGSTRING,
+    "http://www.w3.org/1999/02/22-rdf-syntax-ns#PlainLiteral",
+    "http://www.w3.org/1999/02/22-rdf-syntax-ns#XMLLiteral",
+    "http://www.w3.org/1999/02/22-rdf-syntax-ns#HTML",
+})
+# Datentypen, die ein Literal ohne expliziten Typ trotzdem erfüllt
+_ACCEPTS = {
+    XSD + "decimal": {XSD + "integer"},
+    XSD + "double": {XSD + "integer", XSD + "decimal"},
+    XSD + "float": {XSD + "integer", XSD + "decimal", XSD + "double"},
+    XSD + "string": {RDF_LANGSTRING},
+    **{XSD + t: {XSD + "integer"} for t in (
+        "int", "long", "short", "byte", "nonNegativeInteger", "positiveInteger",
+        "nonPositiveInteger", "negativeInteger", "unsignedInt", "unsignedLong",
+    )},
+}
+# Objekt-Positionen in diesen Blöcken werden geprüft
+_CHECKED_BLOCKS = ("INSERT DATA", "DELETE DATA", "INSERT", "DELETE", "DELETE WHERE")
+_INSERT_BLOCKS = ("INSERT DATA", "INSERT")
+
+
+def is_datatype(uri: str) -> bool:
+    return uri.startswith(XSD) or uri in _LITERAL_TYPES
+
+
+class PropertyInfo(NamedTuple):
+    domains: FrozenSet[str]
+    ranges: FrozenSet[str]
+    kind: Optional[str]  # object | datatype | None (unbekannt)
+    functional: bool
+
+
+class SchemaIndex:
+    """Kompakter Index über die Schema-Axiome eines Snapshots; Abfragen ohne Fuseki."""
+
+    def __init__(self, axioms: Tuple[Tuple[str, str, str], ...]) -> None:
+        rel: Dict[str, Dict[str, Set[str]]] = defaultdict(lambda: defaultdict(set))
+        for s, r, o in axioms:
+            rel[r][s].add(o)
+        self._parents: Dict[str, FrozenSet[str]] = {c: frozenset(ps) for c, ps in rel["subClassOf"].items()}
+        self._closure: Dict[str, FrozenSet[str]] = {}
+        self.properties: Dict[str, PropertyInfo] = {}
+        for p in set(rel["domain"]) | set(rel["range"]) | set(rel["type"]):
+            ranges = frozenset(rel["range"].get(p, ()))
+            types = rel["type"].get(p, set())
+            if OWL + "ObjectProperty" in types:
+                kind: Optional[str] = "object"
+            elif OWL + "DatatypeProperty" in types:
+                kind = "datatype"
+            elif ranges:
+                kind = "datatype" if all(is_datatype(r) for r in ranges) else "object"
+            else:
+                kind = None
+            self.properties[p] = PropertyInfo(
+                frozenset(rel["domain"].get(p, ())), ranges, kind, OWL + "FunctionalProperty" in types
+            )
+
+    @classmethod
+    def for_snapshot(cls, snap: OntologySnapshot) -> "SchemaIndex":
+        return snap.derived("schema_index", lambda: cls(snap.schema))
+
+    def superclasses(self, c: str) -> FrozenSet[str]:
+        """Klasse selbst und alle (transitiven) Oberklassen; je Klasse einmal berechnet."""
+        hit = self._closure.get(c)
+        if hit is None:
+            seen, todo = {c}, [c]
+            while todo:
+                for parent in self._parents.get(todo.pop(), ()):
+                    if parent not in seen:
+                        seen.add(parent)
+                        todo.append(parent)
+            hit = self._closure[c] = frozenset(seen)
+        return hit
+
+    def conforms(self, types: Set[str], required: FrozenSet[str]) -> bool:
+        return any(required & self.superclasses(t) for t in types)
+
+
+def _accepts(ranges: FrozenSet[str], datatype: Optional[str]) -> bool:
+    if not datatype:
+        return True
+    for r in ranges:
+        if r == RDFS_LITERAL or r == datatype or datatype in _ACCEPTS.get(r, ()) or not is_datatype(r):
+            return True
+    return False
+
+
+def _show(t: Term) -> str:
+    if t.kind == "iri":
+        return f"<{t.value}>"
+    if t.kind == "literal":
+        v = t.value if len(t.value) <= 40 else t.value[:37] + "..."
+        return f'"{v}"'
+    return t.value
+
+
+def _names(uris) -> str:
+    return ", ".join(f"<{u}>" for u in sorted(uris))
+
+
+def check_triples(a: SparqlAnalysis, snap: OntologySnapshot) -> Tuple[List[str], List[str]]:
+    """
+    Prüft Tripel in INSERT/DELETE-Blöcken gegen Domain/Range und Property-Typ.
+    Literal statt Ressource (bzw. umgekehrt) ist ein Fehler, Klassen-/Datentyp-Abweichungen
+    und mehrfach belegte funktionale Properties sind Warnungen. Ein Durchlauf über die Tripel.
+    """
+    index = SchemaIndex.for_snapshot(snap)
+    if not index.properties:
+        return [], []
+
+    checked: List[Tuple[str, Triple]] = []
+    for op in a.operations:
+        for b in op.blocks:
+            if b.keyword in _CHECKED_BLOCKS:
+                checked += [(b.keyword, t) for t in a.triples_in(b)]
+    if not checked:
+        return [], []
+
+    # Typen aus `?x a voc:Klasse` (auch aus WHERE), damit Variablen geprüft werden können
+    types: Dict[Term, Set[str]] = defaultdict(set)
+    for t in a.triples:
+        if t.predicate == RDF_TYPE and t.object.kind == "iri":
+            types[t.subject].add(t.object.value)
+
+    errors: List[str] = []
+    warnings: List[str] = []
+    values: Dict[Tuple[Term, str], Set[Term]] = defaultdict(set)
+    for keyword, t in checked:
+        info = index.properties.get(t.predicate)
+        if info is None:
+            continue
+        s, p, o = t.subject, t.predicate, t.object
+        if info.domains and types.get(s) and not index.conforms(types[s], info.domains):
+            warnings.append(
+                f"{_show(s)} ({_names(types[s])}) passt nicht zur Domain von <{p}>: {_names(info.domains)}"
+            )
+        if o.kind == "literal":
+            if info.kind == "object":
+                errors.append(f"<{p}> erwartet eine Ressource, nicht das Literal {_show(o)}")
+            elif info.ranges and not _accepts(info.ranges, o.datatype):
+                warnings.append(f"Literal {_show(o)} hat Datentyp <{o.datatype}>, <{p}> erwartet {_names(info.ranges)}")
+        else:
+            if info.kind == "datatype" and o.kind != "var":
+                errors.append(f"<{p}> erwartet ein Literal, nicht {_show(o)}")
+            elif info.ranges and types.get(o) and not index.conforms(types[o], info.ranges):
+                warnings.append(
+                    f"{_show(o)} ({_names(types[o])}) passt nicht zur Range von <{p}>: {_names(info.ranges)}"
+                )
+        if info.functional and keyword in _INSERT_BLOCKS:
+            values[(s, p)].add(o)
+
+    for (s, p), objs in values.items():
+        if len(objs) > 1:
+            warnings.append(f"<{p}> ist funktional, {_show(s)} bekommt aber {len(objs)} Werte")
+    return errors, warnings
+
+
+__all__ = ["SchemaIndex", "PropertyInfo", "check_triples", "is_datatype"]
@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import calendar
+import datetime
+import gzip
+import json
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from app.backend.config import get_settings
+
+# ---------- Zeitlich partitionierte JSON-Lines-Logs ----------
+# `logs/perf.jsonl` wird zu `logs/perf/20261018T1400Z.jsonl` (+ `.idx.json`, optional `.gz`):
+# je LOG_SEGMENT_MINUTES ein Segment. Der Index hält erste/letzte Zeit, Zeilenzahl und je
+# Minute den Byte-Offset der ersten Zeile – Leser öffnen nur Segmente, die ihr Zeitfenster
+# überlappen, und springen darin an die passende Minute.
+
+_NAME_FMT = "%Y%m%dT%H%MZ"
+_INDEX_SUFFIX = ".idx.json"
+_SLACK = 60.0  # Zeilen dürfen knapp vor bzw. nach ihrem Segment liegen (Batches, Nachzügler)
+_UNSET = object()
+
+
+def parse_ts(ts) -> Optional[float]:
+    """`2026-10-18T14:03:11Z` bzw. ISO mit Mikrosekunden -> Epoch-Sekunden (None bei Fehlern)."""
+    if not isinstance(ts, str):
+        return None
+    try:
+        dt = datetime.datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return dt.timestamp()
+
+
+def index_path(segment: Path) -> Path:
+    name = segment.name
+    for suffix in (".gz", ".jsonl"):
+        if name.endswith(suffix):
+            name = name[: -len(suffix)]
+    return segment.with_name(name + _INDEX_SUFFIX)
+
+
+def read_index(segment: Path) -> Optional[dict]:
+    try:
+        with open(index_path(segment), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+@dataclass
+class Segment:
+    path: Path
+    start: float  # laut Dateiname
+    _index: object = field(default=_UNSET, repr=False)
+
+    @property
+    def index(self) -> Optional[dict]:
+        """Erst beim ersten Zugriff gelesen; None: ohne Index (Altbestand, abgebrochener Schreiber)."""
+        if self._index is _UNSET:
+            self._index = read_index(self.path)
+        return self._index  # type: ignore[return-value]
+
+    @property
+    def compressed(self) -> bool:
+        return self.path.suffix == ".gz"
+
+    def overlaps(self, since: Optional[float], until: Optional[float], span: float) -> bool:
+        if self.index and self.index.get("first") is not None:
+            first, last = self.index["first"], self.index["last"]
+        else:
+            first, last = self.start, self.start + span + _SLACK
+        return (since is None or last >= since) and (until is None or first <= until)
+
+    def open(self):
+        return gzip.open(self.path, "rb") if self.compressed else open(self.path, "rb")
+
+    def offset_for(self, since: Optional[float]) -> int:
+        """Byte-Offset (unkomprimiert) der ersten Zeile der Minute vor `since` (eine Minute Luft für Nachzügler)."""
+        if since is None or not self.index:
+            return 0
+        best = 0
+        for minute, offset in self.index.get("minutes", []):
+            if minute > since - 60:
+                break
+            best = offset
+        return best
+
+    def end_offset_for(self, until: Optional[float]) -> Optional[int]:
+        """Byte-Offset, ab dem nur noch Zeilen nach `until` folgen (eine Minute Luft); None = bis zum Ende."""
+        if until is None or not self.index:
+            return None
+        for minute, offset in self.index.get("minutes", []):
+            if minute > until + 60:
+                return offset
+        return None
+
+
+def _segment_start(path: Path) -> Optional[float]:
+    if not (path.name.endswith(".jsonl") or path.name.endswith(".jsonl.gz")):
+        return None
+    try:
+        return float(calendar.timegm(time.strptime(path.name.split(".", 1)[0], _NAME_FMT)))
+    except ValueError:
+        return None
+
+
+class SegmentedLog:
+    """
+    Schreiben über `append` (thread-sicher, ein open/write je Aufruf; ein schreibender Prozess
+    je Log), Lesen über `segments` und `read`. `retention_days` liefert die Aufbewahrung
+    geschlossener Segmente in Tagen (0 = unbegrenzt), `span_minutes`/`compress` Segmentlänge und
+    Komprimierung (Default: LOG_SEGMENT_MINUTES/LOG_SEGMENT_GZIP), `clock` die Uhr.
+    """
+
+    def __init__(
+        self,
+        base: str,
+        retention_days: Callable[[], int] = lambda: 0,
+        span_minutes: Callable[[], int] = lambda: get_settings().log_segment_minutes,
+        compress: Callable[[], bool] = lambda: get_settings().log_segment_gzip,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        base_path = Path(base)
+        self.legacy = base_path  # einzelne Datei aus der Zeit vor den Segmenten
+        self.dir = base_path.with_suffix("")
+        self._retention_days = retention_days
+        self._span_minutes = span_minutes
+        self._compress_closed = compress
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._current: Optional[Path] = None
+        self._index: Dict[str, object] = {}
+
+    # ---- Schreiben ----------------------------------------------------------
+
+    def append(self, rows: List[dict]) -> None:
+        if not rows:
+            return
+        now = self._clock()
+        span = self.span()
+        start = now - now % span
+        encoded = [(json.dumps(row, ensure_ascii=False) + "\n").encode("utf-8") for row in rows]
+        with self._lock:
+            path = self.dir / (time.strftime(_NAME_FMT, time.gmtime(start)) + ".jsonl")
+            if path != self._current:
+                self._roll(path)
+            minutes: list = self._index["minutes"]  # type: ignore[assignment]
+            with open(path, "ab") as f:
+                offset = f.tell()
+                for row, data in zip(rows, encoded):
+                    t = parse_ts(row.get("ts"))
+                    if t is None:
+                        t = now
+                    minute = t - t % 60
+                    if not minutes or minutes[-1][0] < minute:
+                        minutes.append([minute, offset])
+                    if self._index["first"] is None or t < self._index["first"]:
+                        self._index["first"] = t
+                    if self._index["last"] is None or t > self._index["last"]:
+                        self._index["last"] = t
+                    offset += len(data)
+                f.write(b"".join(encoded))
+            self._index["lines"] = int(self._index["lines"]) + len(rows)  # type: ignore[arg-type]
+            self._index["bytes"] = offset
+            self._write_index(path, self._index)
+
+    def close(self) -> None:
+        with self._lock:
+            self._current, self._index = None, {}
+
+    def span(self) -> float:
+        return max(1, self._span_minutes()) * 60.0
+
+    def _roll(self, path: Path) -> None:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        closed = self._current
+        self._current = path
+        self._index = read_index(path) or {"first": None, "last": None, "lines": 0, "bytes": 0, "minutes": []}
+        self._finish_closed(path, closed)
+
+    def _finish_closed(self, current: Path, closed: Optional[Path]) -> None:
+        """Beim Segmentwechsel: Aufbewahrungsfrist und Komprimierung – nur nach Dateinamen, ohne Indizes."""
+        keep_days = self._retention_days()
+        if keep_days > 0:
+            cutoff = self._clock() - keep_days * 86400 - self.span() - _SLACK
+            for p in list(self.dir.iterdir()):
+                start = _segment_start(p)
+                if start is not None and p != current and start < cutoff:
+                    p.unlink(missing_ok=True)
+                    index_path(p).unlink(missing_ok=True)
+        if not self._compress_closed():
+            return
+        if closed is None:  # nach einem Neustart: das jüngste ältere, noch unkomprimierte Segment
+            older = [(start, p) for p in self.dir.glob("*.jsonl")
+                     if p != current and (start := _segment_start(p)) is not None]
+            closed = max(older)[1] if older else None
+        if closed is not None and closed.exists():
+            self._compress(closed)
+
+    @staticmethod
+    def _compress(path: Path) -> None:
+        target = path.with_name(path.name + ".gz")
+        with open(path, "rb") as src, gzip.open(target, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        path.unlink()  # Index gilt weiter (Offsets beziehen sich auf den entpackten Inhalt)
+
+    # ---- Index --------------------------------------------------------------
+
+    @staticmethod
+    def _write_index(segment: Path, index: dict) -> None:
+        target = index_path(segment)
+        tmp = target.with_name(target.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp, target)
+
+    # ---- Lesen --------------------------------------------------------------
+
+    def segments(self, since: Optional[float] = None, until: Optional[float] = None) -> List[Segment]:
+        """
+        Segmente (alt -> neu), die [since, until] überlappen; Altbestand-Datei zuerst. Vorauswahl
+        nach Dateinamen, Indizes werden nur für die Kandidaten gelesen.
+        """
+        out: List[Segment] = []
+        if self.legacy.is_file():
+            out.append(Segment(self.legacy, 0.0, None))
+        if not self.dir.is_dir():
+            return out
+        span = self.span()
+        found = []
+        for p in self.dir.iterdir():
+            start = _segment_start(p)
+            if start is None:
+                continue
+            if (since is not None and start + span + _SLACK < since) or (until is not None and start - _SLACK > until):
+                continue
+            found.append(Segment(p, start))
+        found.sort(key=lambda seg: seg.start)
+        if since is not None or until is not None:
+            found = [seg for seg in found if seg.overlaps(since, until, span)]
+        out.extend(found)
+        return out
+
+    def read(self, since: Optional[float] = None, until: Optional[float] = None) -> Iterator[dict]:
+        """Zeilen im Zeitfenster (alt -> neu); kaputte Zeilen werden übersprungen."""
+        for seg in self.segments(since, until):
+            yield from self.read_segment(seg, since, until)
+
+    @staticmethod
+    def read_segment(seg: Segment, since: Optional[float] = None, until: Optional[float] = None) -> Iterator[dict]:
+        with seg.open() as f:
+            f.seek(seg.offset_for(since))
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue
+                if since is not None or until is not None:
+                    t = parse_ts(row.get("ts"))
+                    if t is None or (since is not None and t < since) or (until is not None and t > until):
+                        continue
+                yield row
+
+
+__all__ = ["Segment", "SegmentedLog", "index_path", "parse_ts", "read_index"]
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+
+from app.backend.services.sparql_analysis import analyze
+
+# ---------- Schutz für frei formulierte SELECTs (LIMIT einfügen/begrenzen) ----------
+_LIMITED_FORMS = ("SELECT", "CONSTRUCT", "DESCRIBE")
+
+
+@dataclass(frozen=True)
+class GuardedSelect:
+    query: str
+    limit: Optional[int]  # wirksames LIMIT der äußeren Query (None = keins/unbekannt)
+    action: str  # kept | injected | clamped | none
+
+
+def guard_select(query: str, default_limit: int, max_limit: int) -> GuardedSelect:
+    """
+    Ergänzt ein fehlendes LIMIT der äußeren Query (`default_limit`, 0 = nicht ergänzen)
+    und senkt ein größeres auf `max_limit` (0 = nicht begrenzen). Subqueries bleiben unberührt;
+    ein abschließender VALUES-Block bleibt hinter dem LIMIT.
+    """
+    a = analyze(query or "")
+    if not a.ok or a.operation not in _LIMITED_FORMS:
+        return GuardedSelect(query, None, "none")
+
+    toks = a.tokens
+    depth, closed = 0, False
+    limit_idx: Optional[int] = None
+    values_pos: Optional[int] = None
+    for i, t in enumerate(toks):
+        if t.kind == "PUNCT" and t.text == "{":
+            depth += 1
+        elif t.kind == "PUNCT" and t.text == "}":
+            depth -= 1
+            closed = closed or depth == 0
+        elif depth == 0 and closed and t.kind == "NAME":
+            u = t.text.upper()
+            if u == "LIMIT" and i + 1 < len(toks) and toks[i + 1].kind == "NUMBER":
+                limit_idx = i + 1
+            elif u == "VALUES" and values_pos is None:
+                values_pos = t.start
+
+    if limit_idx is not None:
+        num = toks[limit_idx]
+        try:
+            value = int(num.text)
+        except ValueError:
+            return GuardedSelect(query, None, "none")
+        if max_limit > 0 and value > max_limit:
+            return GuardedSelect(query[:num.start] + str(max_limit) + query[num.end:], max_limit, "clamped")
+        return GuardedSelect(query, value, "kept")
+
+    if not closed or default_limit <= 0:
+        return GuardedSelect(query, None, "none")
+    limit = min(default_limit, max_limit) if max_limit > 0 else default_limit
+    if values_pos is not None:
+        return GuardedSelect(f"{query[:values_pos]}LIMIT {limit}\n{query[values_pos:]}", limit, "injected")
+    # Zeilenumbruch davor beendet einen evtl. abschließenden Kommentar
+    return GuardedSelect(f"{query.rstrip()}\nLIMIT {limit}\n", limit, "injected")
+
+
+__all__ = ["GuardedSelect", "guard_select"]
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """
+    Bündelt gleichzeitige Aufrufe mit gleichem Schlüssel zu einer einzigen Ausführung.
+    Die Arbeit läuft als eigener Task: bricht ein Aufrufer ab (Client-Disconnect),
+    erhalten die übrigen trotzdem ihr Ergebnis; geht der letzte, wird die Arbeit
+    abgebrochen. Nur innerhalb eines Event-Loops.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self._waiters: Dict["asyncio.Task[Any]", int] = {}
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Liefert (Ergebnis, shared); shared=True, wenn an einen laufenden Aufruf angehängt."""
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(key)
+        shared = task is not None and not task.done() and task.get_loop() is loop
+        if shared:
+            self.coalesced += 1
+        else:
+            task = loop.create_task(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task), shared
+        finally:
+            left = self._waiters.get(task, 1) - 1
+            if left > 0:
+                self._waiters[task] = left
+            else:
+                self._waiters.pop(task, None)
+                if not task.done():
+                    task.cancel()  # niemand wartet mehr: LLM-Aufruf nicht weiterlaufen lassen
+
+    def _forget(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # als abgerufen markieren, falls alle Aufrufer weg sind
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+
+__all__ = ["SingleFlight"]
@@ -1,62 +1,663 @@
 # app/backend/services/sparql.py
+import asyncio
+import codecs
 import httpx
-import time, json, os, threading
-from pathlib import Path
+import re
+import time, json, threading, weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
 
 from app.backend.config import get_settings
-from app.backend.services.monitoring import record_fuseki_request
-
-_client = httpx.Client(timeout=60.0)
+from app.backend.services import perflog
+from app.backend.services.cache import TTLCache
+from app.backend.services.monitoring import (
+    record_breaker_state, record_fuseki_hedge, record_fuseki_request, record_fuseki_retry, record_select_cache,
+)
+from app.backend.services.resilience import STATE_VALUES, CircuitBreaker, LatencyWindow, backoff, classify
+from app.backend.services.sparql_analysis import analyze
 
 def _ds() -> str:
     s = get_settings()
     return f"{s.fuseki_base_url}/{s.fuseki_dataset}"
 
-# ---- Performance-Logging -----------------------------------------------------
+# ---- Clients (gepoolt, Keep-Alive, Timeouts je Operation) ---------------------
+
+def _limits() -> httpx.Limits:
+    s = get_settings()
+    return httpx.Limits(
+        max_connections=s.fuseki_pool_size,
+        max_keepalive_connections=min(s.fuseki_keepalive, s.fuseki_pool_size),
+        keepalive_expiry=s.fuseki_keepalive_expiry,
+    )
+
+def _timeout(op: str) -> httpx.Timeout:
+    s = get_settings()
+    total = s.fuseki_update_timeout if op == "update" else s.fuseki_select_timeout
+    return httpx.Timeout(total, connect=min(s.fuseki_connect_timeout, total))
+
+def _client_options() -> dict:
+    if get_settings().fuseki_backend == "embedded":
+        # rdflib nur laden, wenn der eingebettete Store tatsächlich genutzt wird
+        from app.backend.services.embedded_store import EmbeddedTransport
+        return {"transport": EmbeddedTransport()}
+    return {"limits": _limits()}
 
-_perf_lock = threading.Lock()
-PERF_LOG = os.getenv("PERF_LOG_FILE", "app/backend/logs/perf.jsonl")
-Path(os.path.dirname(PERF_LOG) or ".").mkdir(parents=True, exist_ok=True)
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+# ein AsyncClient je Event-Loop (Tests/Tools starten eigene Loops)
+_aclients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+def _sync_client() -> httpx.Client:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = httpx.Client(timeout=_timeout("select"), **_client_options())
+    return _client
+
+def _async_client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    client = _aclients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(timeout=_timeout("select"), **_client_options())
+        _aclients[loop] = client
+    return client
+
+async def aclose() -> None:
+    client = _aclients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+# ---- Performance-Logging -----------------------------------------------------
 
 def _perf(kind: str, **kw):
-    row = {
-        "ts": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-        "kind": kind,
-    }
-    row.update(kw)
-    with _perf_lock, open(PERF_LOG, "a", encoding="utf-8") as f:
-        f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    # nur einreihen; geschrieben wird gesammelt im Hintergrund (services/perflog.py)
+    perflog.event(kind, **kw)
+
+def _finish(op: str, r: httpx.Response, t0: float, nbytes: int, **extra) -> None:
+    dt_s = time.perf_counter() - t0
+    status = r.status_code
+    try:
+        r.raise_for_status()
+    finally:
+        _perf("fuseki", op=op, status=status, dur_ms=round(dt_s * 1000.0, 1), bytes=nbytes, **extra)
+        record_fuseki_request(op, status, dt_s)
+
+_SELECT_HEADERS = {"Accept": "application/sparql-results+json"}
+
+# ---- Authentifizierung -------------------------------------------------------
+
+class _AuthModes:
+    """
+    Merkt sich je Endpoint, ob Fuseki Credentials verlangt (FUSEKI_AUTH_MODE=auto),
+    und schickt sie dann gleich mit – statt jedes Mal 401 abzuwarten und die Query
+    ein zweites Mal zu senden. `preemptive`: immer mitsenden, `none`: nie.
+    """
+
+    def __init__(self) -> None:
+        self._needs: Dict[str, bool] = {}
+        self.saved_round_trips = 0
+
+    def credentials(self) -> Tuple[str, str]:
+        s = get_settings()
+        return (s.fuseki_user, s.fuseki_password)
+
+    def initial(self, url: str) -> Optional[Tuple[str, str]]:
+        mode = get_settings().fuseki_auth_mode
+        if mode == "preemptive" or (mode == "auto" and self._needs.get(url)):
+            return self.credentials()
+        return None
+
+    def retry(self, r: httpx.Response, sent: bool) -> bool:
+        return not sent and r.status_code in (401, 403) and get_settings().fuseki_auth_mode != "none"
+
+    def learn(self, url: str, r: httpx.Response, sent: bool, retried: bool) -> Dict[str, object]:
+        if retried and r.status_code not in (401, 403):
+            self._needs[url] = True
+        elif not sent and r.is_success:
+            self._needs[url] = False
+        if sent and not retried:
+            self.saved_round_trips += 1
+            return {"auth": "preemptive", "saved_round_trips": 1}
+        return {"auth": "retry" if retried else "none"}
+
+    def reset(self) -> None:
+        self._needs.clear()
+        self.saved_round_trips = 0
+
+_auth = _AuthModes()
+
+# ---- SELECT-Ergebnis-Cache -----------------------------------------------------
+# Einträge tragen die Daten-Generation; jedes Update erhöht sie (vor und nach dem
+# Schreiben), womit alle älteren Ergebnisse ungültig sind.
+
+_SELECT_CACHE = TTLCache()
+_generation = 0
+_generation_lock = threading.Lock()
+
+def refresh_select_cache() -> None:
+    s = get_settings()
+    _SELECT_CACHE.configure(s.select_cache_max_entries, s.select_cache_ttl_seconds)
+    _SELECT_CACHE.clear()
+
+def _bump_generation() -> None:
+    global _generation
+    with _generation_lock:
+        _generation += 1
+
+def normalize_query(query: str) -> Tuple[Tuple[Tuple[str, str], ...], str]:
+    """Cache-Schlüssel: ohne Whitespace/Kommentare, Schlüsselwörter in Großschrift, Prefixes sortiert."""
+    a = analyze(query or "")
+    if not a.ok:
+        return (), " ".join((query or "").split())
+    toks, out, i = a.tokens, [], 0
+    while i < len(toks):
+        t = toks[i]
+        if t.kind == "NAME" and t.text.upper() == "PREFIX" and i + 2 < len(toks) and toks[i + 2].kind == "IRI":
+            i += 3
+            continue
+        if t.kind == "NAME" and t.text.upper() == "BASE" and i + 1 < len(toks) and toks[i + 1].kind == "IRI":
+            out.append(f"BASE {toks[i + 1].text}")
+            i += 2
+            continue
+        out.append(t.text.upper() if t.kind == "NAME" and t.text != "a" else t.text)
+        i += 1
+    return tuple(sorted(a.prefixes.items())), " ".join(out)
+
+def _cache_lookup(key):
+    if not _SELECT_CACHE.enabled:
+        return None
+    hit = _SELECT_CACHE.get(key)
+    if hit is not None and hit[0] == _generation:
+        record_select_cache("hit")
+        return hit[1]
+    record_select_cache("stale" if hit is not None else "miss")
+    return None
+
+def _cache_store(key, generation: int, nbytes: int, value) -> None:
+    if not _SELECT_CACHE.enabled:
+        return
+    if nbytes > get_settings().select_cache_max_entry_bytes:
+        record_select_cache("too_large")
+        return
+    evictions = _SELECT_CACHE.evictions
+    _SELECT_CACHE.put(key, (generation, value))
+    if _SELECT_CACHE.evictions > evictions:
+        record_select_cache("evicted", _SELECT_CACHE.evictions - evictions)
+
+# ---- Resilienz: Circuit Breaker, Retries für Lesezugriffe, Hedging ------------
+# Solange der Breaker offen ist, scheitern Aufrufe sofort mit CircuitOpenError (-> 503),
+# statt bis zum Timeout auf einen hängenden Fuseki zu warten.
+
+def _on_breaker(prev: str, state: str, reason: str) -> None:
+    _perf("fuseki", op="breaker", prev=prev, state=state, reason=reason)
+    record_breaker_state(state, STATE_VALUES[state])
+
+breaker = CircuitBreaker(on_transition=_on_breaker)
+_select_latency = LatencyWindow()
+
+def _failed(op: str, ex: Exception, t0: float, attempt: int, retry: bool) -> bool:
+    """Bucht den Fehlschlag beim Breaker; True, wenn der Zugriff wiederholt werden soll."""
+    failure, retryable = classify(ex)
+    breaker.record(not failure, time.perf_counter() - t0)
+    if not (retry and retryable) or attempt >= get_settings().fuseki_retries:
+        return False
+    record_fuseki_retry(op)
+    _perf("fuseki", op="retry", of=op, attempt=attempt + 1, error=type(ex).__name__)
+    return True
+
+def _call(op: str, attempt, retry: bool = True):
+    """Synchroner Aufruf hinter dem Breaker; `retry` nur für idempotente Lesezugriffe."""
+    n = 0
+    while True:
+        breaker.before()
+        t0 = time.perf_counter()
+        try:
+            result = attempt()
+        except Exception as ex:
+            if not _failed(op, ex, t0, n, retry):
+                raise
+            time.sleep(backoff(n))
+            n += 1
+            continue
+        except BaseException:
+            breaker.release()
+            raise
+        breaker.record(True, time.perf_counter() - t0)
+        return result
+
+async def _acall(op: str, attempt, retry: bool = True, hedge: bool = False):
+    """Wie `_call` für Koroutinen; `hedge` schickt langsame SELECTs ein zweites Mal."""
+    n = 0
+    while True:
+        breaker.before()
+        t0 = time.perf_counter()
+        try:
+            result = await (_hedged(attempt) if hedge and get_settings().fuseki_hedge else attempt())
+        except Exception as ex:
+            if not _failed(op, ex, t0, n, retry):
+                raise
+            await asyncio.sleep(backoff(n))
+            n += 1
+            continue
+        except BaseException:
+            breaker.release()
+            raise
+        dt_s = time.perf_counter() - t0
+        breaker.record(True, dt_s)
+        if hedge:
+            _select_latency.add(dt_s)
+        return result
+
+async def _hedged(attempt):
+    """
+    Startet nach max(p95, FUSEKI_HEDGE_MIN_MS) eine zweite, identische Anfrage; die erste
+    erfolgreiche Antwort gewinnt, die andere wird abgebrochen. Ohne genügend Messwerte kein Hedging.
+    """
+    p95 = _select_latency.quantile(0.95)
+    first = asyncio.ensure_future(attempt())
+    tasks = [first]
+    try:
+        if p95 is None:
+            return await first
+        delay = max(p95, get_settings().fuseki_hedge_min_ms / 1000.0)
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done:
+            return first.result()
+        tasks.append(asyncio.ensure_future(attempt()))
+        pending, error = set(tasks), None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for t in done:
+                if t.exception() is None:
+                    winner = "primary" if t is first else "hedge"
+                    record_fuseki_hedge(winner)
+                    _perf("fuseki", op="hedge", winner=winner, delay_ms=round(delay * 1000.0, 1))
+                    return t.result()
+                error = t.exception()
+        raise error
+    finally:
+        for t in tasks:
+            if not t.done():
+                t.cancel()
 
 # ---- SELECT ------------------------------------------------------------------
 
 def query_select(query: str) -> dict:
-    s = get_settings()
+    return _call("select", lambda: _select_once(query))
+
+def _select_once(query: str) -> dict:
     url = f"{_ds()}/sparql"
+    client, timeout = _sync_client(), _timeout("select")
+    auth = _auth.initial(url)
     t0 = time.perf_counter()
 
-    r = _client.post(
-        url,
-        data={"query": query},
-        headers={"Accept": "application/sparql-results+json"},
+    r = client.post(url, data={"query": query}, headers=_SELECT_HEADERS, auth=auth, timeout=timeout)
+    retried = _auth.retry(r, auth is not None)
+    if retried:
+        r = client.post(url, data={"query": query}, headers=_SELECT_HEADERS, auth=_auth.credentials(), timeout=timeout)
+
+    _finish("select", r, t0, len(query), **_auth.learn(url, r, auth is not None, retried))
+    return r.json()
+
+async def aquery_select(query: str, cache: bool = False) -> dict:
+    """
+    SELECT über den gepoolten AsyncClient. `cache=True` für lesende Endpoints: identische
+    (normalisierte) Queries werden bis zum nächsten Update bzw. TTL aus dem Speicher
+    beantwortet; das Ergebnis ist dann ein geteiltes Objekt und darf nicht verändert werden.
+    """
+    url = f"{_ds()}/sparql"
+    key, generation = None, _generation
+    if cache:
+        key = (url, normalize_query(query))
+        hit = _cache_lookup(key)
+        if hit is not None:
+            return hit
+    data, nbytes = await _acall("select", lambda: _aselect_once(url, query), hedge=True)
+    if key is not None:
+        _cache_store(key, generation, nbytes, data)
+    return data
+
+async def _aselect_once(url: str, query: str) -> Tuple[dict, int]:
+    client, timeout = _async_client(), _timeout("select")
+    auth = _auth.initial(url)
+    t0 = time.perf_counter()
+
+    r = await client.post(url, data={"query": query}, headers=_SELECT_HEADERS, auth=auth, timeout=timeout)
+    retried = _auth.retry(r, auth is not None)
+    if retried:
+        r = await client.post(url, data={"query": query}, headers=_SELECT_HEADERS, auth=_auth.credentials(),
+                              timeout=timeout)
+
+    _finish("select", r, t0, len(query), **_auth.learn(url, r, auth is not None, retried))
+    return r.json(), len(r.content)
+
+# ---- SELECT als Stream (Antwort wird durchgereicht, nicht materialisiert) ---------
+
+STREAM_FORMATS = {
+    "json": "application/sparql-results+json",
+    "csv": "text/csv",
+    "tsv": "text/tab-separated-values",
+    "ndjson": "application/x-ndjson",  # eine Binding-Zeile je Zeile, aus dem JSON-Stream erzeugt
+}
+_ACCEPT_ALIASES = {"application/json": "json", "text/tab-separated-values": "tsv", "text/csv": "csv",
+                   "application/sparql-results+json": "json", "application/x-ndjson": "ndjson",
+                   "application/ndjson": "ndjson", "application/jsonl": "ndjson"}
+
+def negotiate_format(accept: Optional[str]) -> str:
+    """Erstes unterstütztes Format aus dem Accept-Header (nach q-Wert), sonst JSON."""
+    ranked = []
+    for i, part in enumerate((accept or "").split(",")):
+        media, _, params = part.strip().partition(";")
+        q = 1.0
+        for p in params.split(";"):
+            k, _, v = p.strip().partition("=")
+            if k == "q":
+                try:
+                    q = float(v)
+                except ValueError:
+                    q = 0.0
+        ranked.append((-q, i, media.strip().lower()))
+    for _, _, media in sorted(ranked):
+        if media in _ACCEPT_ALIASES:
+            return _ACCEPT_ALIASES[media]
+    return "json"
+
+class _BindingSplitter:
+    """Zerlegt einen SPARQL-JSON-Ergebnisstrom inkrementell in einzelne Binding-Objekte."""
+
+    _START = re.compile(r'"bindings"\s*:\s*\[')
+    _HEAD = re.compile(r'"head"\s*:\s*')
+    _SEPARATOR = re.compile(r"[\s,]*")
+    _DECODER = json.JSONDecoder()
+
+    def __init__(self) -> None:
+        self.buf = ""
+        self.head: dict = {}
+        self.started = self.done = False
+
+    def feed(self, text: str) -> List[dict]:
+        out: List[dict] = []
+        if self.done:
+            return out
+        self.buf += text
+        if not self.started:
+            m = self._START.search(self.buf)
+            if not m:
+                return out  # Kopf (bzw. ASK-Antwort) bleibt vollständig im Puffer
+            h = self._HEAD.search(self.buf, 0, m.start())
+            if h:
+                try:
+                    self.head = self._DECODER.raw_decode(self.buf, h.end())[0]
+                except ValueError:
+                    pass
+            self.buf, self.started = self.buf[m.end():], True
+        buf, pos = self.buf, 0
+        while True:
+            pos = self._SEPARATOR.match(buf, pos).end()
+            if pos >= len(buf):
+                break
+            if buf[pos] == "]":
+                self.done = True
+                break
+            try:
+                row, pos_end = self._DECODER.raw_decode(buf, pos)
+            except ValueError:
+                break  # Zeile endet erst in einem späteren Chunk
+            out.append(row)
+            pos = pos_end
+        # nur die angefangene Zeile im Puffer behalten -> Speicher O(Zeile)
+        self.buf = buf[pos:]
+        return out
+
+async def _open_select_stream(url: str, query: str, media: str, server_timeout: float = 0) \
+        -> Tuple[httpx.Response, Dict[str, object]]:
+    client, timeout = _async_client(), _timeout("select")
+    headers = {"Accept": media}
+    form = {"query": query}
+    if server_timeout > 0:
+        # Fuseki bricht die Ausführung selbst ab; der Client wartet nur etwas länger
+        form["timeout"] = str(server_timeout)
+        timeout = httpx.Timeout(server_timeout + 5.0, connect=timeout.connect)
+    auth = _auth.initial(url)
+    r = await client.send(
+        client.build_request("POST", url, data=form, headers=headers, timeout=timeout),
+        auth=auth, stream=True,
     )
-    if r.status_code in (401, 403):
-        r = _client.post(
-            url,
-            data={"query": query},
-            headers={"Accept": "application/sparql-results+json"},
-            auth=(s.fuseki_user, s.fuseki_password),
+    retried = _auth.retry(r, auth is not None)
+    if retried:
+        await r.aclose()
+        r = await client.send(
+            client.build_request("POST", url, data=form, headers=headers, timeout=timeout),
+            auth=_auth.credentials(), stream=True,
         )
+    return r, _auth.learn(url, r, auth is not None, retried)
 
-    dt_s = time.perf_counter() - t0
-    dt = dt_s * 1000.0
-    status = r.status_code
+class _Passthrough:
+    """Chunks unverändert (ohne Obergrenzen)."""
+
+    def feed(self, chunk: bytes) -> List[Tuple[bytes, bool]]:
+        return [(chunk, False)]
+
+    def close(self, truncated: Optional[str]) -> List[Tuple[bytes, bool]]:
+        return []
+
+
+class _NdjsonUnits:
+    """SPARQL-JSON -> eine Binding-Zeile je Zeile."""
+
+    def __init__(self) -> None:
+        self.splitter = _BindingSplitter()
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+
+    def rows(self, chunk: bytes) -> List[dict]:
+        return self.splitter.feed(self.decoder.decode(chunk))
+
+    def feed(self, chunk: bytes) -> List[Tuple[bytes, bool]]:
+        return [((json.dumps(row, ensure_ascii=False) + "\n").encode("utf-8"), True) for row in self.rows(chunk)]
+
+    def close(self, truncated: Optional[str]) -> List[Tuple[bytes, bool]]:
+        return []
+
+
+class _JsonUnits(_NdjsonUnits):
+    """SPARQL-JSON, je Binding neu serialisiert – ein gekapptes Ergebnis endet gültig, mit `"truncated"`."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.opened = False
+
+    def feed(self, chunk: bytes) -> List[Tuple[bytes, bool]]:
+        out: List[Tuple[bytes, bool]] = []
+        for row in self.rows(chunk):
+            prefix = ", "
+            if not self.opened:
+                self.opened = True
+                prefix = '{"head": ' + json.dumps(self.splitter.head, ensure_ascii=False) + ', "results": {"bindings": ['
+            out.append(((prefix + json.dumps(row, ensure_ascii=False)).encode("utf-8"), True))
+        return out
+
+    def close(self, truncated: Optional[str]) -> List[Tuple[bytes, bool]]:
+        if not self.splitter.started:
+            return [(self.splitter.buf.encode("utf-8"), False)] if self.splitter.buf else []  # ASK u. Ä.
+        head = "" if self.opened else '{"head": ' + json.dumps(self.splitter.head, ensure_ascii=False) + ', "results": {"bindings": ['
+        tail = "]}" + (f', "truncated": "{truncated}"' if truncated else "") + "}"
+        return [((head + tail).encode("utf-8"), False)]
+
+
+class _LineUnits:
+    """CSV/TSV zeilenweise; erste Zeile ist der Kopf. In CSV zählen Umbrüche in Anführungszeichen nicht."""
+
+    def __init__(self, quoted: bool) -> None:
+        self.quoted = quoted
+        self.buf = b""
+        self.scan = 0  # bis hier ist der Puffer schon auf Zeilenenden/Anführungszeichen geprüft
+        self.in_quotes = False
+        self.header = True
+
+    def _unit(self, record: bytes) -> Tuple[bytes, bool]:
+        is_row, self.header = not self.header, False
+        return record, is_row
+
+    def feed(self, chunk: bytes) -> List[Tuple[bytes, bool]]:
+        self.buf += chunk
+        out: List[Tuple[bytes, bool]] = []
+        start, pos = 0, self.scan
+        while True:
+            nl = self.buf.find(b"\n", pos)
+            if nl < 0:
+                break
+            if self.quoted and self.buf.count(b'"', pos, nl) % 2:
+                self.in_quotes = not self.in_quotes
+            pos = nl + 1
+            if not self.in_quotes:
+                out.append(self._unit(self.buf[start:pos]))
+                start = pos
+        self.buf, self.scan = self.buf[start:], pos - start
+        return out
+
+    def close(self, truncated: Optional[str]) -> List[Tuple[bytes, bool]]:
+        return [self._unit(self.buf)] if self.buf and not truncated else []
+
+
+def _stream_units(fmt: str, capped: bool):
+    if fmt == "ndjson":
+        return _NdjsonUnits()
+    if not capped:
+        return _Passthrough()
+    if fmt in ("csv", "tsv"):
+        return _LineUnits(quoted=fmt == "csv")
+    return _JsonUnits()
+
+
+async def astream_select(query: str, fmt: str = "json", caps: Optional["SelectCaps"] = None) \
+        -> Tuple[str, AsyncIterator[bytes]]:
+    """
+    SELECT, dessen Antwort stückweise durchgereicht wird (Speicher O(Chunk)).
+    Liefert (Content-Type, Byte-Iterator); Fehlerstatus von Fuseki wird vor dem ersten
+    Byte als Exception gemeldet. `fmt`: json | csv | tsv | ndjson.
+    Mit `caps` endet der Strom an einer Zeilengrenze, sobald die nächste Zeile `max_rows`
+    bzw. `max_bytes` überschritte (JSON trägt dann `"truncated": "rows" | "bytes"`), und
+    Fuseki bekommt `server_timeout` mit.
+    """
+    url = f"{_ds()}/sparql"
+    ndjson = fmt == "ndjson"
+    media = STREAM_FORMATS["json"] if ndjson else STREAM_FORMATS.get(fmt, STREAM_FORMATS["json"])
+    max_rows, max_bytes, server_timeout = caps if caps else (0, 0, 0)
+    t0 = time.perf_counter()
+
+    async def open_stream() -> Tuple[httpx.Response, Dict[str, object]]:
+        r, auth_info = await _open_select_stream(url, query, media, server_timeout)
+        if r.is_error:
+            await r.aread()
+            await r.aclose()
+            _finish("select_stream", r, t0, len(query), **auth_info)
+        return r, auth_info
+
+    # wiederholt wird nur das Öffnen; bereits gesendete Bytes lassen sich nicht zurückholen
+    r, auth_info = await _acall("select_stream", open_stream)
+
+    async def body() -> AsyncIterator[bytes]:
+        sent, rows, truncated = 0, 0, None
+        units = _stream_units(fmt if fmt in STREAM_FORMATS else "json", caps is not None)
+
+        def take(batch: List[Tuple[bytes, bool]]) -> bytes:
+            nonlocal sent, rows, truncated
+            out = []
+            for data, is_row in batch:
+                if is_row:
+                    if max_rows and rows >= max_rows:
+                        truncated = "rows"
+                    elif max_bytes and sent + len(data) > max_bytes:
+                        truncated = "bytes"
+                    if truncated:
+                        break
+                    rows += 1
+                sent += len(data)
+                out.append(data)
+            return b"".join(out)
+
+        try:
+            async for chunk in r.aiter_bytes():
+                out = take(units.feed(chunk))
+                if out:
+                    yield out
+                if truncated:
+                    break  # Rest nicht mehr lesen, die Verbindung wird geschlossen
+            out = take(units.close(truncated))
+            if out:
+                yield out
+        finally:
+            await r.aclose()
+            dt_s = time.perf_counter() - t0
+            counted = ndjson or caps is not None
+            _perf("fuseki", op="select_stream", status=r.status_code, dur_ms=round(dt_s * 1000.0, 1),
+                  bytes=len(query), sent_bytes=sent, format=fmt, **({"rows": rows} if counted else {}),
+                  **({"truncated": truncated} if truncated else {}), **auth_info)
+            record_fuseki_request("select_stream", r.status_code, dt_s)
+
+    content_type = STREAM_FORMATS["ndjson"] if ndjson else r.headers.get("content-type", media)
+    return content_type, body()
+
+# ---- SELECT mit Obergrenzen (Zeilen, Bytes, Server-Timeout) -------------------
+
+class SelectCaps(NamedTuple):
+    max_rows: int  # 0 = unbegrenzt
+    max_bytes: int  # 0 = unbegrenzt
+    server_timeout: float  # Sekunden, als `timeout` an Fuseki; 0 = keiner
+
+async def aquery_select_capped(query: str, caps: SelectCaps, cache: bool = False) -> Tuple[dict, Optional[str]]:
+    """
+    SELECT, dessen Antwort nur bis `caps.max_rows` Zeilen bzw. `caps.max_bytes` gelesen
+    wird; danach wird die Verbindung geschlossen. Liefert (SPARQL-JSON, Abbruchgrund)
+    mit Abbruchgrund None | "rows" | "bytes".
+    """
+    url = f"{_ds()}/sparql"
+    key, generation = None, _generation
+    if cache:
+        key = (url, normalize_query(query), caps)
+        hit = _cache_lookup(key)
+        if hit is not None:
+            return hit
+    data, truncated, received = await _acall("select", lambda: _aselect_capped_once(url, query, caps))
+    if key is not None:
+        _cache_store(key, generation, received, (data, truncated))
+    return data, truncated
+
+async def _aselect_capped_once(url: str, query: str, caps: SelectCaps) -> Tuple[dict, Optional[str], int]:
+    t0 = time.perf_counter()
+    r, auth_info = await _open_select_stream(url, query, STREAM_FORMATS["json"], caps.server_timeout)
+    if r.is_error:
+        await r.aread()
+        await r.aclose()
+        _finish("select", r, t0, len(query), **auth_info)
+
+    splitter, decoder = _BindingSplitter(), codecs.getincrementaldecoder("utf-8")()
+    rows: List[dict] = []
+    received, truncated = 0, None
     try:
-        r.raise_for_status()
+        async for chunk in r.aiter_bytes():
+            received += len(chunk)
+            rows += splitter.feed(decoder.decode(chunk))
+            if caps.max_rows and len(rows) > caps.max_rows:
+                del rows[caps.max_rows:]
+                truncated = "rows"
+            elif caps.max_bytes and received > caps.max_bytes and not splitter.done:
+                truncated = "bytes"
+            if truncated or splitter.done:
+                break
     finally:
-        _perf("fuseki", op="select", status=status, dur_ms=round(dt, 1), bytes=len(query))
-        record_fuseki_request("select", status, dt_s)
+        await r.aclose()
+        dt_s = time.perf_counter() - t0
+        _perf("fuseki", op="select", status=r.status_code, dur_ms=round(dt_s * 1000.0, 1), bytes=len(query),
+              received_bytes=received, rows=len(rows), truncated=truncated, **auth_info)
+        record_fuseki_request("select", r.status_code, dt_s)
 
-    return r.json()
+    if not splitter.started:
+        data = json.loads(splitter.buf or "{}") if truncated is None else {"head": {}, "results": {"bindings": []}}
+    else:
+        data = {"head": splitter.head, "results": {"bindings": rows}}
+    return data, truncated, received
 
 # ---- UPDATE ------------------------------------------------------------------
 
@@ -65,13 +666,42 @@ def query_update(update: str) -> None:
     url = f"{_ds()}/update"
     t0 = time.perf_counter()
 
-    r = _client.post(url, data={"update": update}, auth=(s.fuseki_user, s.fuseki_password))
+    def attempt() -> None:
+        r = _sync_client().post(url, data={"update": update}, auth=(s.fuseki_user, s.fuseki_password),
+                                timeout=_timeout("update"))
+        _finish("update", r, t0, len(update))
 
-    dt_s = time.perf_counter() - t0
-    dt = dt_s * 1000.0
-    status = r.status_code
+    # Updates sind nicht idempotent (Changelog) -> kein Retry, nur Breaker
+    _bump_generation()
     try:
-        r.raise_for_status()
+        _call("update", attempt, retry=False)
     finally:
-        _perf("fuseki", op="update", status=status, dur_ms=round(dt, 1), bytes=len(update))
-        record_fuseki_request("update", status, dt_s)
+        _bump_generation()
+
+async def aquery_update(update: str) -> None:
+    s = get_settings()
+    url = f"{_ds()}/update"
+    t0 = time.perf_counter()
+
+    async def attempt() -> None:
+        r = await _async_client().post(url, data={"update": update}, auth=(s.fuseki_user, s.fuseki_password),
+                                       timeout=_timeout("update"))
+        _finish("update", r, t0, len(update))
+
+    _bump_generation()
+    try:
+        await _acall("update", attempt, retry=False)
+    finally:
+        _bump_generation()
+
+# ---- Unabhängige Abfragen parallel (Dauer = max statt Summe) -------------------
+
+async def aselect_many(*queries: str, cache: bool = False) -> List[dict]:
+    return list(await asyncio.gather(*(aquery_select(q, cache=cache) for q in queries)))
+
+def select_many(*queries: str) -> List[dict]:
+    """Synchrone Variante für Threads (Ontologie-Registry): parallel über den gemeinsamen Pool."""
+    if len(queries) <= 1:
+        return [query_select(q) for q in queries]
+    with ThreadPoolExecutor(max_workers=len(queries), thread_name_prefix="fuseki") as ex:
+        return list(ex.map(query_select, queries))
@@ -0,0 +1,413 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, FrozenSet, List, Mapping, NamedTuple, Optional, Set, Tuple
+
+RDF_TYPE = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
+RDF_LANGSTRING = "http://www.w3.org/1999/02/22-rdf-syntax-ns#langString"
+XSD = "http://www.w3.org/2001/XMLSchema#"
+
+# ---------- Tokenizer (SPARQL-1.1-Terminale, ohne Grammatik-Parser) ----------
+_LONG_STRING = r'"""(?:[^"\\]|\\.|"(?!""))*"""' + "|" + r"'''(?:[^'\\]|\\.|'(?!''))*'''"
+_SHORT_STRING = r'"(?:[^"\\\n]|\\.)*"' + "|" + r"'(?:[^'\\\n]|\\.)*'"
+_TOKEN_SPEC = [
+    ("WS", r"\s+"),
+    ("COMMENT", r"#[^\n]*"),
+    ("IRI", r"<[^<>\"{}|^`\\\x00-\x20]*>"),
+    ("STRING", _LONG_STRING + "|" + _SHORT_STRING),
+    ("LANGTAG", r"@[A-Za-z]+(?:-[A-Za-z0-9]+)*"),
+    ("VAR", r"[?$]\w+"),
+    ("BNODE", r"_:\w(?:[\w\-.]*[\w\-])?"),
+    ("PNAME", r"(?:[^\W\d_][\w\-]*(?:\.[\w\-]+)*)?:(?:[\w%\-:]+(?:\.[\w%\-:]+)*)?"),
+    ("NUMBER", r"[0-9]+(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?|\.[0-9]+(?:[eE][+-]?[0-9]+)?"),
+    ("NAME", r"[^\W\d]\w*(?:-\w+)*"),
+    ("PUNCT", r"\^\^|&&|\|\||!=|<=|>=|[{}()\[\];,.*=!<>+\-/^|?]"),
+    ("ERROR", r"."),
+]
+_TOKEN_RE = re.compile("|".join(f"(?P<{k}>{p})" for k, p in _TOKEN_SPEC), re.DOTALL)
+
+
+class Token(NamedTuple):
+    kind: str
+    text: str
+    start: int
+    end: int
+
+
+def tokenize(text: str) -> List[Token]:
+    """Signifikante Tokens (ohne Whitespace/Kommentare) mit Zeichenpositionen."""
+    return [
+        Token(m.lastgroup, m.group(), m.start(), m.end())
+        for m in _TOKEN_RE.finditer(text or "")
+        if m.lastgroup not in ("WS", "COMMENT")
+    ]
+
+
+class Term(NamedTuple):
+    kind: str  # iri | var | literal | bnode
+    value: str
+    datatype: Optional[str] = None  # nur Literale (Zahlen/Booleans/Strings ohne ^^ mit implizitem Typ)
+
+
+class Triple(NamedTuple):
+    subject: Term
+    predicate: str
+    object: Term
+    pos: int  # Zeichenposition des Objekts (zur Zuordnung zu Blöcken)
+
+
+# ---------- Analyse ----------
+_QUERY_FORMS = ("SELECT", "ASK", "CONSTRUCT", "DESCRIBE")
+_MANAGEMENT = ("LOAD", "CLEAR", "DROP", "CREATE", "ADD", "MOVE", "COPY")
+UPDATE_KINDS = ("INSERT DATA", "DELETE DATA", "DELETE WHERE", "DELETE/INSERT/WHERE", "INSERT WHERE") + _MANAGEMENT
+_TERMS = ("IRI", "PNAME", "VAR", "STRING", "NUMBER", "BNODE")
+_GRAPH_KEYWORDS = ("GRAPH", "WITH", "INTO", "USING", "FROM")
+
+
+@dataclass(frozen=True)
+class Block:
+    """Ein `{ ... }`-Block eines Updates; open/close sind die Zeichenpositionen der Klammern."""
+    keyword: str  # INSERT DATA | DELETE DATA | DELETE WHERE | INSERT | DELETE | WHERE
+    open: int
+    close: int
+    has_graph: bool
+
+
+@dataclass(frozen=True)
+class Operation:
+    kind: str  # SELECT …, INSERT DATA, DELETE DATA, DELETE WHERE, DELETE/INSERT/WHERE, INSERT WHERE, LOAD …
+    start: int  # Zeichenposition des ersten Tokens (nach dem Prolog)
+    blocks: Tuple[Block, ...]
+    with_graph: Optional[str]
+
+
+@dataclass(frozen=True)
+class SparqlAnalysis:
+    """Unveränderliches Ergebnis eines Analyse-Durchlaufs über eine Query/ein Update."""
+    text: str
+    tokens: Tuple[Token, ...]
+    ok: bool  # Tokenizer fehlerfrei und Klammern balanciert
+    prefixes: Mapping[str, str]
+    prefix_decls: Tuple[str, ...]  # Quelltext der PREFIX-Deklarationen
+    keywords: FrozenSet[str]
+    operations: Tuple[Operation, ...]
+    operation: str
+    is_update: bool
+    iris: FrozenSet[str]
+    classes: FrozenSet[str]
+    predicates: FrozenSet[str]
+    graphs: FrozenSet[str]
+    triples: Tuple[Triple, ...] = ()  # nur Tripel mit IRI-Prädikat
+
+    def block_text(self, block: Block) -> str:
+        return self.text[block.open + 1:block.close]
+
+    def triples_in(self, block: Block) -> Tuple[Triple, ...]:
+        return tuple(t for t in self.triples if block.open < t.pos < block.close)
+
+
+def _match_brackets(tokens: List[Token]) -> Tuple[Dict[int, int], bool]:
+    pairs: Dict[int, int] = {}
+    stack: List[Tuple[str, int]] = []
+    closing = {"}": "{", ")": "(", "]": "["}
+    ok = True
+    for i, t in enumerate(tokens):
+        if t.kind != "PUNCT":
+            continue
+        if t.text in ("{", "(", "["):
+            stack.append((t.text, i))
+        elif t.text in closing:
+            if stack and stack[-1][0] == closing[t.text]:
+                pairs[stack.pop()[1]] = i
+            else:
+                ok = False
+    return pairs, ok and not stack
+
+
+def _op_kind(keywords: List[str]) -> str:
+    for k in ("INSERT DATA", "DELETE DATA", "DELETE WHERE"):
+        if k in keywords:
+            return k
+    if "DELETE" in keywords and "INSERT" in keywords:
+        return "DELETE/INSERT/WHERE"
+    if "DELETE" in keywords:
+        return "DELETE WHERE"
+    if "INSERT" in keywords:
+        return "INSERT WHERE"
+    return "UNKNOWN"
+
+
+class _Analyzer:
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.tokens = tokenize(text)
+        self.pairs, balanced = _match_brackets(self.tokens)
+        self.ok = balanced and not any(t.kind == "ERROR" for t in self.tokens)
+        self.prefixes: Dict[str, str] = {}
+        self.decls: List[str] = []
+        self.prologue: Set[int] = set()
+
+    def expand(self, t: Token) -> Optional[str]:
+        if t.kind == "IRI":
+            return t.text[1:-1]
+        if t.kind == "PNAME":
+            pfx, local = t.text.split(":", 1)
+            base = self.prefixes.get(pfx)
+            return base + local if base is not None else None
+        if t.kind == "NAME" and t.text == "a":
+            return RDF_TYPE
+        return None
+
+    def term_at(self, i: int) -> Tuple[Term, int]:
+        """RDF-Term ab Token i; liefert (Term, Index des letzten verbrauchten Tokens)."""
+        t, toks = self.tokens[i], self.tokens
+        if t.kind in ("IRI", "PNAME"):
+            return Term("iri", self.expand(t) or t.text), i
+        if t.kind == "VAR":
+            return Term("var", t.text), i
+        if t.kind == "BNODE":
+            return Term("bnode", t.text), i
+        if t.kind == "NUMBER":
+            dt = "double" if "e" in t.text.lower() else "decimal" if "." in t.text else "integer"
+            return Term("literal", t.text, XSD + dt), i
+        if t.kind == "NAME":  # true/false
+            return Term("literal", t.text.lower(), XSD + "boolean"), i
+        value = t.text[3:-3] if t.text[:3] in ('"""', "'''") else t.text[1:-1]
+        if i + 1 < len(toks) and toks[i + 1].kind == "LANGTAG":
+            return Term("literal", value, RDF_LANGSTRING), i + 1
+        if self._is(i + 1, "^^") and i + 2 < len(toks):
+            dt = toks[i + 2]
+            return Term("literal", value, self.expand(dt) or dt.text), i + 2
+        return Term("literal", value, XSD + "string"), i
+
+    def _upper(self, i: int) -> str:
+        return self.tokens[i].text.upper() if i < len(self.tokens) and self.tokens[i].kind == "NAME" else ""
+
+    def _is(self, i: int, punct: str) -> bool:
+        return i < len(self.tokens) and self.tokens[i].kind == "PUNCT" and self.tokens[i].text == punct
+
+    # --- Prolog ---
+    def scan_prologue(self) -> None:
+        toks = self.tokens
+        for i, t in enumerate(toks):
+            u = self._upper(i)
+            if u == "PREFIX" and i + 2 < len(toks) and toks[i + 1].kind == "PNAME" \
+                    and toks[i + 1].text.endswith(":") and toks[i + 2].kind == "IRI":
+                self.prefixes[toks[i + 1].text[:-1]] = toks[i + 2].text[1:-1]
+                self.decls.append(self.text[t.start:toks[i + 2].end])
+                self.prologue.update((i, i + 1, i + 2))
+            elif u == "BASE" and i + 1 < len(toks) and toks[i + 1].kind == "IRI":
+                self.prologue.update((i, i + 1))
+
+    # --- Operationen auf oberster Ebene ---
+    def scan_operations(self) -> List[Operation]:
+        toks, ops = self.tokens, []
+        cur: Optional[dict] = None
+        pending: Optional[str] = None
+        i = 0
+
+        def close() -> None:
+            nonlocal cur
+            if cur is not None:
+                kind = cur["kind"] or _op_kind([b.keyword for b in cur["blocks"]])
+                ops.append(Operation(kind, cur["start"], tuple(cur["blocks"]), cur["with"]))
+            cur = None
+
+        def begin(i: int, kind: Optional[str] = None) -> None:
+            nonlocal cur
+            if cur is None:
+                cur = {"kind": kind, "start": toks[i].start, "blocks": [], "with": None}
+
+        while i < len(toks):
+            t = toks[i]
+            if i in self.prologue:
+                i += 1
+                continue
+            if t.kind == "PUNCT" and t.text == "{":
+                j = self.pairs.get(i, len(toks))
+                if cur is not None:
+                    has_graph = any(toks[k].kind == "NAME" and toks[k].text.upper() == "GRAPH" for k in range(i + 1, j))
+                    end = toks[j].start if j < len(toks) else len(self.text)
+                    cur["blocks"].append(Block(pending or "WHERE", t.start, end, has_graph))
+                pending = None
+                i = j + 1
+                continue
+            if t.kind == "PUNCT" and t.text == ";":
+                close()
+            elif t.kind == "NAME":
+                u = t.text.upper()
+                if u in _QUERY_FORMS and cur is None:
+                    begin(i, u)
+                elif u == "WITH":
+                    begin(i)
+                    cur["with"] = self.expand(toks[i + 1]) if i + 1 < len(toks) else None
+                    i += 2
+                    continue
+                elif u in ("INSERT", "DELETE"):
+                    begin(i)
+                    nxt = self._upper(i + 1)
+                    if nxt == "DATA" or (u == "DELETE" and nxt == "WHERE"):
+                        pending = f"{u} {nxt}"
+                        i += 2
+                        continue
+                    pending = u
+                elif u == "WHERE":
+                    pending = "WHERE"
+                elif u in _MANAGEMENT and cur is None:
+                    begin(i, u)
+            i += 1
+        close()
+        return ops
+
+    # --- Tripelmuster: Prädikate, Klassen und Tripel ---
+    def scan_triples(self) -> Tuple[Set[str], Set[str], List[Triple]]:
+        toks = self.tokens
+        preds: Set[str] = set()
+        classes: Set[str] = set()
+        triples: List[Triple] = []
+        stack: List[Tuple[str, Optional[str], Optional[Term]]] = []
+        # X: außerhalb eines Gruppenmusters, S/P/O: Subjekt/Prädikat/Objekt erwartet
+        state, pred, subj = "X", None, None
+        skip_group = expr_next = False
+        i = 0
+
+        def term(t: Optional[Token], value: Optional[Term], pos: int) -> None:
+            nonlocal state, pred, subj
+            if state == "S":
+                subj = value
+                state = "P"
+            elif state == "P":
+                pred = self.expand(t) if t else None
+                if pred and pred != RDF_TYPE:
+                    preds.add(pred)
+                state = "O"
+            elif state == "O":
+                iri = self.expand(t) if t else None
+                if pred == RDF_TYPE and iri:
+                    classes.add(iri)
+                if pred and subj and value:
+                    triples.append(Triple(subj, pred, value, pos))
+                state = "D"
+            elif state == "D":
+                subj = value
+                state = "P"
+
+        while i < len(toks):
+            t = toks[i]
+            if i in self.prologue:
+                i += 1
+                continue
+            if t.kind == "PUNCT":
+                if t.text == "{":
+                    stack.append((state, pred, subj))
+                    state, pred, subj = ("V" if skip_group else "S"), None, None
+                    skip_group = False
+                elif t.text == "}":
+                    state, pred, subj = stack.pop() if stack else ("X", None, None)
+                    if state not in ("X", "V"):
+                        state = "S"
+                elif state in ("X", "V"):
+                    pass
+                elif t.text == "[":
+                    node = Term("bnode", f"[]@{t.start}")
+                    stack.append((state, pred, subj))
+                    # `[ … ]` als Subjekt: die folgenden Prädikate gehören ebenfalls zum Knoten
+                    state, pred, subj = "P", None, node
+                elif t.text == "]":
+                    node = subj
+                    state, pred, subj = stack.pop() if stack else ("S", None, None)
+                    term(None, node, t.start)
+                elif t.text == "(":
+                    i = self.pairs.get(i, i)
+                    if not expr_next:
+                        term(None, None, t.start)
+                    expr_next = False
+                elif t.text == ";":
+                    state = "P"
+                elif t.text == ",":
+                    state = "O"
+                elif t.text == ".":
+                    state = "S"
+                i += 1
+                continue
+            if state in ("X", "V"):
+                if state == "X" and t.kind == "NAME" and t.text.upper() == "VALUES":
+                    skip_group = True
+                i += 1
+                continue
+            if t.kind == "NAME":
+                u = t.text.upper()
+                if state == "P" and t.text == "a":
+                    term(t, None, t.start)
+                elif state in ("O", "D") and u in ("TRUE", "FALSE"):
+                    term(t, self.term_at(i)[0], t.start)
+                else:
+                    state, pred, subj = "S", None, None
+                    if u in ("GRAPH", "SERVICE") and i + 1 < len(toks):
+                        i += 1  # Graph-/Service-Name ist kein Subjekt
+                    elif u == "VALUES":
+                        skip_group = True
+                    expr_next = self._is(i + 1, "(")
+                i += 1
+                continue
+            if t.kind in _TERMS:
+                value, last = self.term_at(i)
+                term(t, value, t.start)
+                i = last
+            i += 1
+        return preds, classes, triples
+
+    def scan_graphs(self) -> Set[str]:
+        out: Set[str] = set()
+        for i, t in enumerate(self.tokens[:-1]):
+            if t.kind == "NAME" and t.text.upper() in _GRAPH_KEYWORDS:
+                j = i + 2 if self._upper(i + 1) == "NAMED" else i + 1
+                iri = self.expand(self.tokens[j]) if j < len(self.tokens) else None
+                if iri:
+                    out.add(iri)
+        return out
+
+    def result(self) -> SparqlAnalysis:
+        self.scan_prologue()
+        ops = self.scan_operations()
+        preds, classes, triples = self.scan_triples()
+        iris = {
+            iri for i, t in enumerate(self.tokens)
+            if t.kind in ("IRI", "PNAME") and i not in self.prologue and (iri := self.expand(t))
+        }
+        kinds = {op.kind for op in ops}
+        if len(kinds) == 1:
+            operation = next(iter(kinds))
+        else:
+            operation = "UPDATE" if kinds else "UNKNOWN"
+        return SparqlAnalysis(
+            text=self.text,
+            tokens=tuple(self.tokens),
+            ok=self.ok,
+            prefixes=MappingProxyType(dict(self.prefixes)),
+            prefix_decls=tuple(self.decls),
+            keywords=frozenset(t.text.upper() for t in self.tokens if t.kind == "NAME"),
+            operations=tuple(ops),
+            operation=operation,
+            is_update=any(k in UPDATE_KINDS for k in kinds),
+            iris=frozenset(iris),
+            classes=frozenset(classes),
+            predicates=frozenset(preds),
+            graphs=frozenset(self.scan_graphs()),
+            triples=tuple(triples),
+        )
+
+
+@lru_cache(maxsize=512)
+def analyze(text: str) -> SparqlAnalysis:
+    """Einmal tokenisieren/analysieren; Ergebnis je Query-Text gecacht und unveränderlich."""
+    return _Analyzer(text or "").result()
+
+
+__all__ = [
+    "analyze", "tokenize", "SparqlAnalysis", "Operation", "Block", "Token", "Term", "Triple",
+    "RDF_TYPE", "RDF_LANGSTRING", "XSD", "UPDATE_KINDS",
+]
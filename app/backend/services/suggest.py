@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import re
+from collections import Counter, defaultdict
+from itertools import chain
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.backend.services.ontology import OntologySnapshot
+
+# ---------- "Meinten Sie …?" über Zeichen-Trigramme ----------
+MAX_SUGGESTIONS = 3
+MIN_SCORE = 0.35
+# sehr häufige Trigramme (z. B. "ung") tragen kaum Information und kosten bei großen Vokabularen Zeit
+_STOPGRAM_FRACTION = 0.05
+_STOPGRAM_MIN = 500
+
+
+# Eine Zerlegung für Prompt-Termauswahl, Reparatur und "Meinten Sie …?": lokaler Name ist
+# alles nach dem letzten `#`, `/` oder `:` (auch für URNs), Namespace der Rest davor.
+def local_name(uri: str) -> str:
+    return uri[max(uri.rfind("#"), uri.rfind("/"), uri.rfind(":")) + 1:]
+
+
+def namespace(uri: str) -> str:
+    return uri[: len(uri) - len(local_name(uri))]
+
+
+def local_key(uri: str) -> str:
+    """Lokaler Name normalisiert (ohne Groß-/Kleinschreibung, Bindestriche, Unterstriche)."""
+    return normalize(local_name(uri))
+
+
+def normalize(text: str) -> str:
+    return re.sub(r"[^0-9a-zäöüß]", "", (text or "").casefold())
+
+
+def trigrams(key: str) -> List[str]:
+    padded = f"^{key}$"
+    return [padded[i:i + 3] for i in range(len(padded) - 2)] if key else []
+
+
+class TrigramIndex:
+    """Trigramm-Index über lokale Namen und Labels einer Term-Liste (Dice-Koeffizient als Score)."""
+
+    def __init__(self, terms: Sequence[Tuple[str, Sequence[str]]]) -> None:
+        self.uris: List[str] = []
+        self._entry_term: List[int] = []
+        self._entry_len: List[int] = []
+        self._exact: Dict[str, List[int]] = defaultdict(list)
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for uri, labels in terms:
+            tid = len(self.uris)
+            self.uris.append(uri)
+            for key in dict.fromkeys([local_key(uri)] + [normalize(lbl) for lbl in labels]):
+                if not key:
+                    continue
+                eid = len(self._entry_term)
+                grams = set(trigrams(key))
+                self._entry_term.append(tid)
+                self._entry_len.append(len(grams))
+                self._exact[key].append(tid)
+                for g in grams:
+                    postings[g].append(eid)
+        self._postings = dict(postings)
+        self._stop = max(_STOPGRAM_MIN, int(_STOPGRAM_FRACTION * len(self._entry_term)))
+
+    @classmethod
+    def for_snapshot(cls, snap: OntologySnapshot, kind: str) -> "TrigramIndex":
+        terms = snap.classes if kind == "class" else snap.properties
+        return snap.derived(f"trigram_index:{kind}", lambda: cls([(u, snap.labels.get(u, ())) for u in terms]))
+
+    def exact(self, key: str) -> List[str]:
+        return [self.uris[t] for t in self._exact.get(key, ())]
+
+    def lookup(self, text: str, limit: int = MAX_SUGGESTIONS, min_score: float = MIN_SCORE) -> List[Tuple[str, float]]:
+        """Ähnlichste Terme zu einem (lokalen) Namen, absteigend nach Score."""
+        grams = set(trigrams(normalize(text)))
+        if not grams:
+            return []
+        lists = [self._postings[g] for g in grams if g in self._postings]
+        informative = [p for p in lists if len(p) <= self._stop] or lists
+        counts = Counter(chain.from_iterable(informative))
+        best: Dict[int, float] = {}
+        n = len(grams)
+        floor = min_score * n / 2.0  # Dice >= min_score ist mit weniger Treffern nicht erreichbar
+        for eid, common in counts.items():
+            if common < floor:
+                continue
+            score = 2.0 * common / (n + self._entry_len[eid])
+            tid = self._entry_term[eid]
+            if score >= min_score and score > best.get(tid, 0.0):
+                best[tid] = score
+        ranked = sorted(best.items(), key=lambda kv: (-kv[1], self.uris[kv[0]]))[:limit]
+        return [(self.uris[tid], round(score, 3)) for tid, score in ranked]
+
+
+def suggest(snap: OntologySnapshot, uri: str, kind: str, limit: int = MAX_SUGGESTIONS) -> List[Dict[str, Optional[str]]]:
+    """Vorschläge für einen unbekannten Term (`kind`: "class" | "property")."""
+    index = TrigramIndex.for_snapshot(snap, kind)
+    i = max(uri.rfind("#"), uri.rfind("/"), uri.rfind(":"))
+    out = []
+    for cand, score in index.lookup(uri[i + 1:], limit=limit):
+        out.append({"iri": cand, "score": score, "label": snap.label(cand)})
+    return out
+
+
+__all__ = ["TrigramIndex", "suggest", "normalize", "local_key", "local_name", "namespace", "trigrams"]
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import bisect
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set, Tuple
+
+from app.backend.services.ontology import OntologySnapshot
+from app.backend.services.suggest import local_name
+
+# ---------- Tokenisierung / leichtes deutsches Stemming ----------
+_CAMEL_RE = re.compile(r"(?<=[a-zäöüß])(?=[A-ZÄÖÜ])")
+_WORD_RE = re.compile(r"[A-Za-zÄÖÜäöüß]+")
+_PLACEHOLDER_RE = re.compile(r"\bPH(?:\d+|_YEAR)\b")
+# Ergänzungsstrich: "Vor- und Nachnamen" -> Vornamen
+_ELLIPSIS_RE = re.compile(r"([A-Za-zÄÖÜäöüß]+)-\s+(?:und|oder|bzw\.?)\s+([A-Za-zÄÖÜäöüß]+)")
+_SUFFIXES = ("innen", "ungen", "ung", "en", "er", "es", "in", "e", "n", "s")
+_STOP = {
+    "der", "die", "das", "den", "dem", "des", "ein", "eine", "einen", "einer", "und", "oder",
+    "mit", "von", "vom", "für", "auf", "aus", "bei", "zum", "zur", "ist", "hat", "sind", "alle",
+    "zeige", "liste", "gib", "füge", "hinzu", "neuen", "neue", "lösche", "ändere", "diese", "dieser",
+    "person", "intent", "has", "the", "and", "of",
+}
+_MIN_PREFIX = 4
+_MIN_INFIX = 5
+
+
+def _stem(word: str) -> str:
+    t = word.casefold().replace("ß", "ss")
+    for suf in _SUFFIXES:
+        if t.endswith(suf) and len(t) - len(suf) >= _MIN_PREFIX:
+            return t[: -len(suf)]
+    return t
+
+
+def _words(text: str) -> List[str]:
+    out = []
+    for w in _WORD_RE.findall(_CAMEL_RE.sub(" ", text or "")):
+        if len(w) >= 3 and w.casefold() not in _STOP:
+            out.append(_stem(w))
+    return out
+
+
+# ---------- Index ----------
+class TermIndex:
+    """Lexikalischer Index über lokale Namen und rdfs:labels (je Ontologie-Version einmal gebaut)."""
+
+    def __init__(self, terms: Iterable[Tuple[str, Iterable[str]]]) -> None:
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+        for uri, labels in terms:
+            for stem in _words(local_name(uri)):
+                self._postings[stem].add(uri)
+            for lbl in labels:
+                for stem in _words(lbl):
+                    self._postings[stem].add(uri)
+        self._stems = sorted(self._postings)
+
+    @classmethod
+    def for_snapshot(cls, snap: OntologySnapshot) -> "TermIndex":
+        return snap.derived(
+            "term_index",
+            lambda: cls((u, snap.labels.get(u, ())) for u in snap.classes + snap.properties),
+        )
+
+    def _matches(self, q: str) -> Dict[str, float]:
+        """Index-Stems, die zu einem Query-Stem passen, mit Gewicht."""
+        hits: Dict[str, float] = {}
+        if q in self._postings:
+            hits[q] = 1.0
+        if len(q) >= _MIN_PREFIX:
+            # Query-Stem ist Präfix eines Term-Stems (vor -> vorname)
+            i = bisect.bisect_left(self._stems, q)
+            while i < len(self._stems) and self._stems[i].startswith(q):
+                hits.setdefault(self._stems[i], 0.7)
+                i += 1
+            # Term-Stem ist Präfix des Query-Stems (pfarr -> pfarrerin)
+            for n in range(_MIN_PREFIX, len(q)):
+                if q[:n] in self._postings:
+                    hits.setdefault(q[:n], 0.7)
+        # Komposita: Term-Stem steckt im Query-Stem (stell -> pfarrstell)
+        for n in range(_MIN_INFIX, len(q)):
+            for i in range(1, len(q) - n + 1):
+                if q[i:i + n] in self._postings:
+                    hits.setdefault(q[i:i + n], 0.5)
+        return hits
+
+    def _ellipsis_matches(self, text: str) -> Dict[str, Dict[str, float]]:
+        """Ergänzt verkürzte Komposita; nur exakte Index-Treffer zählen."""
+        out: Dict[str, Dict[str, float]] = {}
+        for head, tail in _ELLIPSIS_RE.findall(text):
+            for k in range(2, len(tail) - 2):
+                stem = _stem(head + tail[k:])
+                if stem in self._postings:
+                    out[stem] = {stem: 1.0}
+                    break
+        return out
+
+    def score(self, text: str) -> Dict[str, float]:
+        scores: Dict[str, float] = defaultdict(float)
+        text = _PLACEHOLDER_RE.sub(" ", text or "")
+        queries = {q: self._matches(q) for q in set(_words(text))}
+        queries.update(self._ellipsis_matches(text))
+        for q, matches in queries.items():
+            best: Dict[str, float] = {}
+            for stem, w in matches.items():
+                for uri in self._postings[stem]:
+                    if w > best.get(uri, 0.0):
+                        best[uri] = w
+            for uri, w in best.items():
+                scores[uri] += w
+        return scores
+
+
+def estimate_tokens(text: str) -> int:
+    """Grobe Token-Schätzung (~4 Zeichen je Token)."""
+    return len(text) // 4 + 1
+
+
+def select_terms(
+    snap: OntologySnapshot,
+    text: str,
+    budget_tokens: int,
+    max_classes: int,
+    max_properties: int,
+    render=local_name,
+) -> Tuple[List[str], List[str]]:
+    """
+    Wählt die zum (anonymisierten) Text passendsten Klassen/Properties. Treffer
+    kommen zuerst (nach Score), der Rest des Token-Budgets wird in Ontologie-
+    Reihenfolge aufgefüllt.
+    """
+    scores = TermIndex.for_snapshot(snap).score(text)
+
+    def ranked(terms: Tuple[str, ...]) -> List[str]:
+        hit = sorted((u for u in terms if u in scores), key=lambda u: (-scores[u], u))
+        hit_set = set(hit)
+        return hit + [u for u in terms if u not in hit_set]
+
+    pools = {"c": ranked(snap.classes), "p": ranked(snap.properties)}
+    caps = {"c": max_classes, "p": max_properties}
+    chosen: Dict[str, List[str]] = {"c": [], "p": []}
+    used = 0
+    pos = {"c": 0, "p": 0}
+    # abwechselnd nach Score ziehen, damit keine Liste das Budget allein aufbraucht
+    while True:
+        progressed = False
+        for k in ("c", "p"):
+            if pos[k] >= len(pools[k]) or len(chosen[k]) >= caps[k]:
+                continue
+            uri = pools[k][pos[k]]
+            cost = estimate_tokens(render(uri)) + 1
+            if used + cost > budget_tokens:
+                continue
+            pos[k] += 1
+            chosen[k].append(uri)
+            used += cost
+            progressed = True
+        if not progressed:
+            break
+    return chosen["c"], chosen["p"]
+
+
+__all__ = ["TermIndex", "select_terms", "estimate_tokens", "local_name"]
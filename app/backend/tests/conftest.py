@@ -1,12 +1,16 @@
+import asyncio
 import os
 import pytest
 
 from app.backend.config import get_settings
-from app.backend.services.security import refresh_rate_limiter
+from app.backend.services import changelog, perflog
+from app.backend.services.security import refresh_rate_limiter, reset_rate_limiter_for_tests
+from app.backend.services.segments import SegmentedLog
+from app.backend.services.sparql import breaker
 
 
 @pytest.fixture(autouse=True)
-def _configure_env(monkeypatch):
+def _configure_env(monkeypatch, tmp_path):
     monkeypatch.setenv("FUSEKI_BASE_URL", "http://example.org")
     monkeypatch.setenv("FUSEKI_DATASET", "test")
     monkeypatch.setenv("FUSEKI_USER", "user")
@@ -19,5 +23,12 @@ def _configure_env(monkeypatch):
     monkeypatch.setenv("ENABLE_PROMETHEUS_METRICS", "1")
     get_settings.cache_clear()
     refresh_rate_limiter()
+    asyncio.run(reset_rate_limiter_for_tests())  # Budget je Test, unabhängig von der Reihenfolge
+    breaker.reset()
+    # Perf- und Change-Log nie ins Repo schreiben
+    sink = perflog.PerfSink(str(tmp_path / "logs" / "perf.jsonl"))
+    monkeypatch.setattr(perflog, "sink", sink)
+    monkeypatch.setattr(changelog, "log", SegmentedLog(str(tmp_path / "logs" / "changes.jsonl")))
     yield
+    sink.close()
     get_settings.cache_clear()
@@ -0,0 +1,124 @@
+import asyncio
+import gzip
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.backend.config import get_settings
+from app.backend.services import sparql
+from app.backend.services.embedded_store import EmbeddedStore, create_app, get_store, reset_store
+
+VOC = "http://meta-pfarrerbuch.evangelische-archive.de/vocabulary#"
+TYPE = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
+LABEL = "http://www.w3.org/2000/01/rdf-schema#label"
+
+
+@pytest.fixture
+def dumps(tmp_path):
+    (tmp_path / "pfarrerbuch-meta").mkdir()
+    with gzip.open(tmp_path / "pfarrerbuch-meta" / "vocabulary.nt.gz", "wb") as f:
+        f.write(f"<{VOC}Pfarrer-in> <{LABEL}> \"Pfarrer:in\"@de .\n".encode())
+    (tmp_path / "pfarrerbuch-meta" / "meta-combined.nq").write_text(
+        f"<urn:p:1> <{TYPE}> <{VOC}Pfarrer-in> <urn:graph:kps> .\n"
+        f"<urn:p:1> <{VOC}nachname> \"Müller\" <urn:graph:kps> .\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "README").write_text("kein RDF")
+    return tmp_path
+
+
+@pytest.fixture
+def embedded(monkeypatch, dumps):
+    monkeypatch.setenv("FUSEKI_BACKEND", "embedded")
+    monkeypatch.setenv("EMBEDDED_DATA", str(dumps))
+    get_settings.cache_clear()
+    monkeypatch.setattr(sparql, "_perf", lambda *a, **kw: None)
+    monkeypatch.setattr(sparql, "_client", None)
+    sparql.refresh_select_cache()
+    reset_store()
+    yield
+    reset_store()
+    sparql._client = None
+
+
+def _values(res: dict, var: str):
+    return sorted(b[var]["value"] for b in res["results"]["bindings"] if var in b)
+
+
+def test_selects_and_updates_go_through_the_embedded_store(embedded):
+    changes = get_settings().changes_graph
+
+    async def run():
+        try:
+            default = await sparql.aquery_select("SELECT DISTINCT ?s WHERE { ?s ?p ?o }")
+            graphs = await sparql.aquery_select("SELECT DISTINCT ?g WHERE { GRAPH ?g { ?s ?p ?o } }")
+            await sparql.aquery_update(f'INSERT DATA {{ GRAPH <{changes}> {{ <urn:p:2> <{VOC}nachname> "Neu" }} }}')
+            added = await sparql.aquery_select(f"SELECT ?n WHERE {{ GRAPH <{changes}> {{ ?s <{VOC}nachname> ?n }} }}")
+            capped, truncated = await sparql.aquery_select_capped(
+                f"SELECT ?s ?n WHERE {{ GRAPH ?g {{ ?s <{VOC}nachname> ?n }} }}", sparql.SelectCaps(1, 0, 5))
+            return default, graphs, added, capped, truncated
+        finally:
+            await sparql.aclose()
+
+    default, graphs, added, capped, truncated = asyncio.run(run())
+    assert _values(default, "s") == [f"{VOC}Pfarrer-in", "urn:p:1"]  # Union-Default wie TDB2
+    assert _values(graphs, "g") == ["urn:graph:kps"]
+    assert _values(added, "n") == ["Neu"]
+    assert capped["head"]["vars"] == ["s", "n"] and len(capped["results"]["bindings"]) == 1
+    assert truncated == "rows"
+    # synchroner Pfad (Ontologie-Registry) sieht denselben Store
+    res = sparql.query_select(f"SELECT ?l WHERE {{ <{VOC}Pfarrer-in> <{LABEL}> ?l }}")
+    assert res["results"]["bindings"][0]["l"] == {"type": "literal", "value": "Pfarrer:in", "xml:lang": "de"}
+
+
+def test_changes_graph_is_visible_in_the_union_default_graph(embedded):
+    changes = get_settings().changes_graph
+    sparql.query_update(f'INSERT DATA {{ GRAPH <{changes}> {{ <urn:p:2> <{VOC}nachname> "Neu" }} }}')
+    sparql.query_update(f'INSERT DATA {{ <urn:p:3> <{VOC}nachname> "Ohne Graph" }}')
+
+    res = sparql.query_select(f"SELECT ?n WHERE {{ ?s <{VOC}nachname> ?n }}")
+    assert _values(res, "n") == ["Müller", "Neu", "Ohne Graph"]
+    # INSERT ohne GRAPH landet im gespeicherten Default-Graphen, nicht in einem Named Graph
+    default = get_store().dump().body.decode("utf-8")
+    assert '"Ohne Graph"' in default and '"Neu"' not in default
+    graphs = sparql.query_select("SELECT DISTINCT ?g WHERE { GRAPH ?g { ?s ?p ?o } }")
+    assert _values(graphs, "g") == sorted(["urn:graph:kps", changes])
+
+
+def test_parse_errors_are_reported_as_400(embedded):
+    with pytest.raises(httpx.HTTPStatusError) as err:
+        sparql.query_select("SELECT WHERE {")
+    assert err.value.response.status_code == 400
+
+
+def test_http_server_speaks_fuseki_protocol(dumps):
+    store = EmbeddedStore()
+    assert store.load([str(dumps)]) == 3
+    c = TestClient(create_app(store, credentials=("admin", "pw")))
+
+    assert c.get("/$/ping").text == "ok"
+    r = c.post("/combined/data?graph=urn:graph:neu", content=b"<urn:a> <urn:b> \"x\\ty\" .\n",
+               headers={"content-type": "application/n-triples"})
+    assert r.status_code == 401
+    r = c.post("/combined/data?graph=urn:graph:neu", content=b"<urn:a> <urn:b> \"x\\ty\" .\n",
+               headers={"content-type": "application/n-triples"}, auth=("admin", "pw"))
+    assert r.status_code == 200
+
+    q = "SELECT ?o WHERE { GRAPH <urn:graph:neu> { ?s ?p ?o } }"
+    tsv = c.post("/combined/sparql", data={"query": q}, headers={"accept": "text/tab-separated-values"})
+    assert tsv.headers["content-type"].startswith("text/tab-separated-values")
+    assert tsv.text == '?o\n"x\\ty"\n'
+    csv = c.get("/combined/query", params={"query": q}, headers={"accept": "text/csv"})
+    assert csv.text.splitlines() == ["o", "x\ty"]
+
+    ok = c.post("/combined/update", content=b'INSERT DATA { <urn:b> <urn:p> "2" }',
+                headers={"content-type": "application/sparql-update"}, auth=("admin", "pw"))
+    assert ok.status_code == 204
+    res = c.post("/combined/sparql", data={"query": "SELECT ?o WHERE { <urn:b> ?p ?o }"}).json()
+    assert res["results"]["bindings"] == [{"o": {"type": "literal", "value": "2"}}]
+
+    bad = c.post("/combined/update", data={"update": "INSERT DATA {"}, auth=("admin", "pw"))
+    assert bad.status_code == 400
+    dump = c.get("/combined/data").text
+    assert "<urn:graph:kps> ." in dump and f'<{VOC}Pfarrer-in> <{LABEL}> "Pfarrer:in"@de .' in dump
@@ -1,35 +1,87 @@
 import os, time, uuid, requests, pytest
+from fastapi.testclient import TestClient
 
+from app.backend.config import get_settings
+from app.backend.main import app
+from app.backend.services import ontology, sparql
+from app.backend.services.embedded_store import reset_store
+
+# RUN_INTEGRATION_TESTS=1: gegen die laufende API unter API_BASE (mit echtem Fuseki);
+# sonst im Prozess gegen FUSEKI_BACKEND=embedded mit einem kleinen Vokabular.
+INTEGRATION = os.getenv("RUN_INTEGRATION_TESTS") == "1"
 API = os.getenv("API_BASE", "http://localhost:8000")
 API_KEY = os.getenv("API_AUTH_TOKEN")
 HEADERS = {"x-api-key": API_KEY} if API_KEY else {}
 
-pytestmark = pytest.mark.skipif(
-    os.getenv("RUN_INTEGRATION_TESTS") != "1",
-    reason="Integration tests disabled (set RUN_INTEGRATION_TESTS=1)",
-)
+VOC = "http://meta-pfarrerbuch.evangelische-archive.de/vocabulary#"
+VOCABULARY = f"""@prefix voc: <{VOC}> .
+@prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+voc:Pfarrer-in a rdfs:Class ; rdfs:label "Pfarrer:in"@de .
+voc:vorname a rdf:Property ; rdfs:label "Vorname"@de .
+voc:nachname a rdf:Property ; rdfs:label "Nachname"@de .
+"""
+
+
+class _Remote:
+    def post(self, path, json=None):
+        r = requests.post(API + path, json=json, timeout=20, headers=HEADERS)
+        r.raise_for_status()
+        return r.json()
+
+    def get(self, path):
+        r = requests.get(API + path, timeout=20, headers=HEADERS)
+        r.raise_for_status()
+        return r.json()
+
 
-def post(path, json=None):
-    r = requests.post(API + path, json=json, timeout=20, headers=HEADERS)
-    r.raise_for_status()
-    return r.json()
+class _InProcess:
+    def __init__(self):
+        self.client = TestClient(app)
+        self.headers = {"x-api-key": get_settings().api_auth_token}
 
-def get(path):
-    r = requests.get(API + path, timeout=20, headers=HEADERS)
-    r.raise_for_status()
-    return r.json()
+    def post(self, path, json=None):
+        r = self.client.post(path, json=json, headers=self.headers)
+        r.raise_for_status()
+        return r.json()
 
-def test_health():
-    data = get("/health")
+    def get(self, path):
+        r = self.client.get(path, headers=self.headers)
+        r.raise_for_status()
+        return r.json()
+
+
+@pytest.fixture
+def api(monkeypatch, tmp_path):
+    if INTEGRATION:
+        yield _Remote()
+        return
+    (tmp_path / "vocabulary.ttl").write_text(VOCABULARY, encoding="utf-8")
+    monkeypatch.setenv("FUSEKI_BACKEND", "embedded")
+    monkeypatch.setenv("EMBEDDED_DATA", str(tmp_path / "vocabulary.ttl"))
+    monkeypatch.setenv("CHANGES_GRAPH", "urn:nl2sparql:changes")
+    get_settings.cache_clear()
+    monkeypatch.setattr(sparql, "_perf", lambda *a, **kw: None)
+    monkeypatch.setattr(sparql, "_client", None)
+    sparql.refresh_select_cache()
+    reset_store()
+    ontology.registry.swap(None)  # lädt beim ersten Zugriff aus dem eingebetteten Store
+    yield _InProcess()
+    ontology.registry.swap(None)
+    reset_store()
+    sparql._client = None
+
+def test_health(api):
+    data = api.get("/health")
     assert data.get("ok") is True
 
-def test_select_minimal():
+def test_select_minimal(api):
     q = "SELECT (COUNT(*) AS ?n) WHERE { ?s ?p ?o }"
-    data = post("/nl2sparql/select", {"sparql": q})
+    data = api.post("/nl2sparql/select", {"sparql": q})
     assert data["ok"] is True
     assert "results" in data
 
-def test_preview_execute_undo_insert():
+def test_preview_execute_undo_insert(api):
     # eindeutige URI je Lauf
     new_uri = f"urn:example:test:{uuid.uuid4()}"
     insert_q = f'''PREFIX voc:<http://meta-pfarrerbuch.evangelische-archive.de/vocabulary#>
@@ -40,22 +92,26 @@ INSERT DATA {{ GRAPH <urn:nl2sparql:changes> {{
 }} }}'''
 
     # Preview
-    prev = post("/nl2sparql/preview", {"sparql": insert_q})
+    prev = api.post("/nl2sparql/preview", {"sparql": insert_q})
     assert prev["validation"]["ok"] is True
     token = prev["confirm_token"]
 
     # Execute
-    exe = post("/nl2sparql/execute", {"confirm_token": token})
+    exe = api.post("/nl2sparql/execute", {"confirm_token": token})
     assert exe["ok"] is True
     undo_q = exe.get("undo_sparql")
     assert undo_q and "DELETE DATA" in undo_q
 
     # Verifizieren via SELECT
     ask_q = f"ASK WHERE {{ GRAPH <urn:nl2sparql:changes> {{ <{new_uri}> ?p ?o }} }}"
-    sel = post("/nl2sparql/select", {"sparql": ask_q})
+    sel = api.post("/nl2sparql/select", {"sparql": ask_q})
     assert sel["ok"] is True
     # ASK kommt als boolean-like Result zurück; spare harte Prüfung je nach Wrapper
 
+    # Union-Default-Graph: die Änderung ist auch ohne GRAPH sichtbar
+    plain = api.post("/nl2sparql/select", {"sparql": f'SELECT ?n WHERE {{ <{new_uri}> <{VOC}nachname> ?n }}'})
+    assert [b["n"]["value"] for b in plain["results"]["results"]["bindings"]] == ["CI-Test"]
+
     # Undo
-    undo = post("/nl2sparql/undo", {"undo_sparql": undo_q})
+    undo = api.post("/nl2sparql/undo", {"undo_sparql": undo_q})
     assert undo["ok"] is True
@@ -0,0 +1,116 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.backend.config import get_settings
+from app.backend.services import ontology, sparql
+
+
+@pytest.fixture(autouse=True)
+def _fresh_auth_state():
+    sparql._auth.reset()
+    yield
+    sparql._auth.reset()
+
+
+def _results(var: str, value: str) -> dict:
+    return {"head": {"vars": [var]}, "results": {"bindings": [{var: {"type": "uri", "value": value}}]}}
+
+
+def test_async_select_and_update_use_pooled_client(monkeypatch):
+    seen = []
+    monkeypatch.setattr(sparql, "_perf", lambda *a, **kw: seen.append(kw))
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/update"):
+            return httpx.Response(204 if "authorization" in request.headers else 401)
+        if "authorization" not in request.headers:
+            return httpx.Response(401)
+        return httpx.Response(200, json=_results("s", "http://example.org/x"))
+
+    async def run():
+        sparql._aclients[asyncio.get_running_loop()] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            res = await sparql.aquery_select("SELECT * WHERE { ?s ?p ?o }")
+            await sparql.aquery_update("INSERT DATA { <urn:a> <urn:b> <urn:c> }")
+            return res
+        finally:
+            await sparql.aclose()
+
+    res = asyncio.run(run())
+    assert res["results"]["bindings"][0]["s"]["value"] == "http://example.org/x"
+    assert [(r["op"], r["status"]) for r in seen] == [("select", 200), ("update", 204)]
+
+
+def test_aselect_many_runs_concurrently(monkeypatch):
+    async def slow(query: str, cache: bool = False) -> dict:
+        await asyncio.sleep(0.2)
+        return {"q": query}
+
+    monkeypatch.setattr(sparql, "aquery_select", slow)
+    t0 = time.perf_counter()
+    out = asyncio.run(sparql.aselect_many("a", "b", "c"))
+    assert [r["q"] for r in out] == ["a", "b", "c"]
+    assert time.perf_counter() - t0 < 0.45
+
+
+def test_ontology_load_fans_out(monkeypatch):
+    def slow(query: str) -> dict:
+        time.sleep(0.2)
+        if "?rel" in query:
+            return {"results": {"bindings": []}}
+        var = "c" if "?c" in query else "p"
+        return {"results": {"bindings": [{var: {"value": f"http://example.org/{var}"}}]}}
+
+    monkeypatch.setattr(ontology.sparql, "query_select", slow)
+    t0 = time.perf_counter()
+    snap = ontology._load(1, None)
+    assert time.perf_counter() - t0 < 0.45
+    assert snap.classes == ("http://example.org/c",)
+    assert snap.properties == ("http://example.org/p",)
+
+
+def _run_selects(handler, n: int):
+    async def run():
+        sparql._aclients[asyncio.get_running_loop()] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            for _ in range(n):
+                await sparql.aquery_select("SELECT * WHERE { ?s ?p ?o }")
+        finally:
+            await sparql.aclose()
+    asyncio.run(run())
+
+
+def test_auth_is_learned_and_sent_preemptively(monkeypatch):
+    rows, hits = [], []
+    monkeypatch.setattr(sparql, "_perf", lambda *a, **kw: rows.append(kw))
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        hits.append("authorization" in request.headers)
+        if "authorization" not in request.headers:
+            return httpx.Response(401)
+        return httpx.Response(200, json=_results("s", "http://example.org/x"))
+
+    _run_selects(handler, 3)
+    assert hits == [False, True, True, True]  # nur der erste SELECT braucht zwei Round Trips
+    assert [r["auth"] for r in rows] == ["retry", "preemptive", "preemptive"]
+    assert sum(r.get("saved_round_trips", 0) for r in rows) == 2 == sparql._auth.saved_round_trips
+
+
+def test_auth_mode_none_never_sends_credentials(monkeypatch):
+    monkeypatch.setenv("FUSEKI_AUTH_MODE", "none")
+    get_settings.cache_clear()
+    monkeypatch.setattr(sparql, "_perf", lambda *a, **kw: None)
+    hits = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        hits.append("authorization" in request.headers)
+        return httpx.Response(200, json=_results("s", "http://example.org/x"))
+
+    try:
+        _run_selects(handler, 2)
+    finally:
+        get_settings.cache_clear()
+    assert hits == [False, False]
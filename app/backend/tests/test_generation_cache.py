@@ -0,0 +1,58 @@
+import pytest
+
+from app.backend.services import llm
+from app.backend.services.cache import TTLCache
+from app.backend.services.ontology import EMPTY, OntologySnapshot, registry
+
+
+@pytest.fixture(autouse=True)
+def _setup(monkeypatch):
+    registry.swap(OntologySnapshot.from_terms(["http://example.org/Class"], ["http://example.org/prop"]))
+    llm.refresh_generation_cache()
+    llm._GEN_CACHE.clear()
+    calls = []
+
+    async def fake_generate(anon_text, intent_hint, retry_if_invalid, snap, prefix=None, candidates=None):
+        calls.append(anon_text)
+        return {"ok": True, "sparql": 'INSERT DATA { <urn:x> <urn:p> "PH1" . }', "validation": {"ok": True}, "attempts": 1}
+
+    monkeypatch.setattr(llm, "_agenerate", fake_generate)
+    yield calls
+    registry.swap(None)
+
+
+def test_cache_hit_skips_llm_and_keeps_own_placeholders(_setup):
+    first = llm.generate_sparql_with_guardrails('Füge die Person "Anna" hinzu')
+    second = llm.generate_sparql_with_guardrails('Füge  die Person "Berta" hinzu')
+    assert len(_setup) == 1
+    assert first["cached"] is False and second["cached"] is True
+    assert first["placeholders"] == {"PH1": '"Anna"'}
+    assert second["placeholders"] == {"PH1": '"Berta"'}
+    assert second["sparql"] == first["sparql"]
+
+
+def test_cache_key_includes_intent_and_ontology_version(_setup):
+    llm.generate_sparql_with_guardrails("Zeige alle Pfarrer", intent_hint="select")
+    llm.generate_sparql_with_guardrails("Zeige alle Pfarrer", intent_hint="insert")
+    registry.swap(OntologySnapshot.from_terms(["http://example.org/Other"], []))
+    llm.generate_sparql_with_guardrails("Zeige alle Pfarrer", intent_hint="select")
+    assert len(_setup) == 3
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    c = TTLCache(maxsize=2, ttl_seconds=60)
+    c.put("a", 1)
+    c.put("b", 2)
+    assert c.get("a") == 1
+    c.put("c", 3)
+    assert c.get("b") is None
+    assert c.get("a") == 1 and c.get("c") == 3
+    assert c.evictions == 1
+
+
+def test_nothing_is_cached_or_coalesced_while_the_ontology_loads(_setup):
+    registry.swap(EMPTY)
+    first = llm.generate_sparql_with_guardrails("Zeige alle Pfarrer")
+    second = llm.generate_sparql_with_guardrails("Zeige alle Pfarrer")
+    assert len(_setup) == 2 and not first["cached"] and not second["cached"]
+    assert len(llm._GEN_CACHE) == 0
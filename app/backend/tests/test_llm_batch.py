@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from app.backend.services import llm
+from app.backend.services.ontology import OntologySnapshot, registry
+
+VOC = llm.VOC
+DRAFT = "```sparql\nPREFIX voc:<" + VOC + ">\nSELECT ?p WHERE { ?p a voc:Pfarrer-in . }\n```"
+
+
+@pytest.fixture(autouse=True)
+def _snapshot():
+    registry.swap(OntologySnapshot.from_terms([VOC + "Pfarrer-in"], [VOC + "vorname"]))
+    llm._GEN_CACHE.clear()
+    yield
+    registry.swap(None)
+
+
+def test_batch_caps_concurrency_and_shares_prompt_prefix(monkeypatch):
+    state = {"inflight": 0, "peak": 0, "systems": set()}
+
+    async def fake_complete(messages, usage):
+        state["inflight"] += 1
+        state["peak"] = max(state["peak"], state["inflight"])
+        state["systems"].add(messages[0]["content"])
+        await asyncio.sleep(0.01)
+        state["inflight"] -= 1
+        return DRAFT
+
+    monkeypatch.setattr(llm, "_acomplete", fake_complete)
+    items = [(f"Zeige Pfarrer Nummer {i}x", None) for i in range(7)]
+
+    async def run():
+        return [r async for r in llm.agenerate_batch(items, concurrency=3)]
+
+    results = asyncio.run(run())
+    assert sorted(i for i, _ in results) == list(range(7))
+    assert all(out["ok"] for _, out in results)
+    assert state["peak"] == 3
+    assert len(state["systems"]) == 1
+
+
+def test_batch_reports_item_errors(monkeypatch):
+    async def failing(messages, usage):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(llm, "_acomplete", failing)
+
+    async def run():
+        return [r async for r in llm.agenerate_batch([("a", None), ("b", None)], concurrency=2)]
+
+    results = dict(asyncio.run(run()))
+    assert results[0]["ok"] is False and "boom" in results[0]["reason"]
+
+
+def test_batch_validates_against_its_pinned_snapshot(monkeypatch):
+    calls = []
+
+    async def reload_during_batch(messages, usage):
+        calls.append(len(messages))
+        registry.swap(OntologySnapshot.from_terms([], []))  # Neuladen mitten im Batch: Pfarrer-in unbekannt
+        return DRAFT
+
+    monkeypatch.setattr(llm, "_acomplete", reload_during_batch)
+
+    async def run():
+        return [r async for r in llm.agenerate_batch([("Zeige Pfarrer", None)], concurrency=1)]
+
+    (_, out), = asyncio.run(run())
+    assert out["ok"] is True and out["attempts"] == 1 and not out["validation"]["warnings"]
+    assert len(calls) == 1  # keine Korrekturrunde wegen des neuen Snapshots
+
+
+def test_ndjson_stream_closed_early_cancels_pending_llm_calls(monkeypatch):
+    from app.backend.routers import nl2sparql
+
+    state = {"calls": 0, "cancelled": 0}
+
+    async def fake_complete(messages, usage):
+        state["calls"] += 1
+        if state["calls"] > 1:  # nur der erste Aufruf wird fertig
+            try:
+                await asyncio.sleep(30)
+            except asyncio.CancelledError:
+                state["cancelled"] += 1
+                raise
+        return DRAFT
+
+    monkeypatch.setattr(llm, "_acomplete", fake_complete)
+    held = []  # hält den Generator am Leben (wie z. B. ein Traceback): Abbruch darf nicht vom GC abhängen
+    monkeypatch.setattr(nl2sparql, "agenerate_batch", lambda *a: held.append(llm.agenerate_batch(*a)) or held[-1])
+    req = nl2sparql.GenerateBatchReq(items=[{"text": f"Zeige Pfarrer {name}"} for name in "ABCD"],
+                                     concurrency=4, stream=True)
+
+    async def run():
+        res = await nl2sparql.generate_batch(req)
+        body = res.body_iterator
+        first = await body.__anext__()
+        await body.aclose()  # Client trennt die Verbindung
+        await asyncio.sleep(0.05)
+        return first, state["cancelled"]  # vor dem Ende von asyncio.run, das Reste ohnehin abbricht
+
+    first, cancelled = asyncio.run(run())
+    assert '"index"' in first and cancelled == 3
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.backend.main import app
+from app.backend.services import llm
+from app.backend.services.ontology import OntologySnapshot, registry
+
+VOC = llm.VOC
+DRAFT = (
+    "Hier ist die Abfrage:\n```SPARQL\nPREFIX voc:<" + VOC + ">\n"
+    "SELECT ?p WHERE { ?p a voc:Pfarrer-in . }\n```\n" + "Danach folgt noch eine lange Erklärung. " * 5
+)
+
+
+@pytest.fixture(autouse=True)
+def _snapshot():
+    registry.swap(OntologySnapshot.from_terms([VOC + "Pfarrer-in"], []))
+    yield
+    registry.swap(None)
+
+
+def _chunks(text, n):
+    return [text[i:i + n] for i in range(0, len(text), n)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 64])
+def test_scanner_detects_block_end_across_chunk_borders(size):
+    sc = llm._SparqlBlockScanner()
+    chunks = _chunks(DRAFT, size)
+    closed_at = None
+    for i, c in enumerate(chunks):
+        if sc.feed(c):
+            closed_at = i
+            break
+    assert closed_at is not None and closed_at < len(chunks) - 1
+    assert sc.sparql == llm._extract_sparql_from_text(DRAFT)
+
+
+def test_stream_stops_consuming_after_code_block(monkeypatch):
+    consumed = []
+
+    async def fake_stream(messages, usage):
+        for c in _chunks(DRAFT, 8):
+            consumed.append(c)
+            yield c
+
+    monkeypatch.setattr(llm, "_astream", fake_stream)
+
+    async def run():
+        return [e async for e in llm.astream_sparql_with_guardrails("Zeige Pfarrer", use_cache=False)]
+
+    events = asyncio.run(run())
+    kinds = [k for k, _ in events]
+    assert kinds[-1] == "result" and set(kinds[:-1]) == {"token"}
+    result = events[-1][1]
+    assert result["ok"] is True and result["attempts"] == 1
+    assert "".join(consumed) != DRAFT
+
+
+class _Backend:
+    name = "fake"
+
+    def __init__(self, fail_after=None):
+        self.closed = False
+        self.fail_after = fail_after
+
+    async def stream(self, messages, usage=None):
+        try:
+            for i, c in enumerate(_chunks(DRAFT, 8)):
+                if i == self.fail_after:
+                    raise RuntimeError("Verbindung abgebrochen")
+                yield c
+        finally:
+            self.closed = True
+
+
+def test_early_exit_closes_backend_stream_and_records_usage(monkeypatch):
+    backend = _Backend()
+    perf = []
+    monkeypatch.setattr(llm, "get_backend", lambda: backend)
+    monkeypatch.setattr(llm, "_perf", lambda kind, **kw: perf.append((kind, kw)))
+
+    async def run():
+        events = []
+        async for kind, data in llm.astream_sparql_with_guardrails("Zeige Pfarrer", use_cache=False):
+            if kind == "result":
+                assert backend.closed  # geschlossen, bevor das Ergebnis geliefert wird
+            events.append((kind, data))
+        return events
+
+    events = asyncio.run(run())
+    streamed = "".join(d["text"] for k, d in events if k == "token")
+    usage = events[-1][1]["usage"]
+    assert usage["output_tokens"] == len(streamed) // 4 > 0 and usage["prompt_tokens"] > 0
+    (kind, row), = [p for p in perf if p[1].get("op") == "stream"]
+    assert kind == "llm" and row["estimated"] is True and row["output_tokens"] == usage["output_tokens"]
+
+
+def test_sse_reports_backend_failure_as_error_event(monkeypatch):
+    backend = _Backend(fail_after=2)
+    monkeypatch.setattr(llm, "get_backend", lambda: backend)
+    monkeypatch.setattr(llm, "_perf", lambda *a, **kw: None)
+    res = TestClient(app).post("/nl2sparql/generate/stream", json={"text": "Zeige Pfarrer"}, headers={"x-api-key": "test-token"})
+    events = [block.split("\n")[0].removeprefix("event: ") for block in res.text.strip().split("\n\n")]
+    assert events == ["start", "token", "token", "error"]
+    assert '"reason": "LLM-Aufruf fehlgeschlagen: Verbindung abgebrochen"' in res.text
+    assert backend.closed
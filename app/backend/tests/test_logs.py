@@ -0,0 +1,101 @@
+import asyncio
+import calendar
+import gzip
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.backend.config import get_settings
+from app.backend.main import app
+from app.backend.services import changelog, segments
+from app.backend.services.security import refresh_rate_limiter, reset_rate_limiter_for_tests
+from app.backend.services.segments import SegmentedLog
+
+T0 = calendar.timegm((2026, 10, 18, 14, 0, 0))
+HEADERS = {"x-api-key": "test-token"}
+STATUS = ["applied", "failed", "applied", "undo_applied"]
+
+
+def _ts(t: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(t))
+
+
+@pytest.fixture
+def changes(monkeypatch, tmp_path):
+    """40 Einträge, einer je 5 Minuten (vier Segmente à 60 Minuten); Blöcke kleiner als eine Zeile."""
+    monkeypatch.setenv("RATE_LIMIT_PER_MINUTE", "1000")
+    monkeypatch.setenv("RATE_LIMIT_BURST", "1000")
+    get_settings.cache_clear()
+    refresh_rate_limiter()
+    monkeypatch.setattr(changelog, "_BLOCK", 16)
+    now = [T0]
+    monkeypatch.setattr(changelog, "log", SegmentedLog(str(tmp_path / "changes.jsonl"), clock=lambda: now[0]))
+    for i in range(40):
+        now[0] = T0 + i * 300
+        changelog.append({"ts": _ts(now[0]), "status": STATUS[i % 4], "sparql": f"# {i}", "pad": "ü" * (i % 7)})
+    yield tmp_path
+    asyncio.run(reset_rate_limiter_for_tests())
+
+
+def _get(**params):
+    res = TestClient(app).get("/logs/recent", params=params, headers=HEADERS)
+    assert res.status_code == 200, res.text
+    body = res.json()
+    return [int(r["sparql"][2:]) for r in body["items"]], body["next_before"]
+
+
+def test_pages_walk_backwards_across_segments(changes):
+    seen, before = [], None
+    while True:
+        params = {"limit": 7}
+        if before:
+            params["before"] = before
+        ids, before = _get(**params)
+        seen.extend(ids)
+        if before is None:
+            break
+        assert len(ids) == 7
+    assert seen == list(range(39, -1, -1))
+
+
+def test_status_and_time_filters(changes):
+    ids, before = _get(limit=3, status="undo_applied")
+    assert ids == [39, 35, 31] and before
+    ids, _ = _get(limit=3, status="undo_applied", before=before)
+    assert ids == [27, 23, 19]
+
+    ids, before = _get(limit=50, status="applied,failed", since=_ts(T0 + 60 * 60), until=_ts(T0 + 90 * 60))
+    assert ids == [18, 17, 16, 14, 13, 12] and before is None
+
+
+def test_reads_only_what_the_page_needs(changes, monkeypatch):
+    opened = []
+    original = segments.Segment.open
+    monkeypatch.setattr(segments.Segment, "open", lambda seg: (opened.append(seg.path.name), original(seg))[1])
+    assert _get(limit=2)[0] == [39, 38]
+    assert opened == ["20261018T1700Z.jsonl"]
+
+
+def test_gzipped_segments_and_legacy_file(changes, monkeypatch):
+    legacy = changes / "changes.jsonl"
+    legacy.write_text(json.dumps({"ts": _ts(T0 - 60), "status": "applied", "sparql": "# -1"}) + "\n", encoding="utf-8")
+    for p in (changes / "changes").glob("2026101[8]T1[45]00Z.jsonl"):
+        with open(p, "rb") as src, gzip.open(p.with_name(p.name + ".gz"), "wb") as dst:
+            dst.write(src.read())
+        p.unlink()
+
+    ids, before = _get(limit=30)
+    assert ids == list(range(39, 9, -1))
+    ids, before = _get(limit=30, before=before)
+    assert ids == list(range(9, -2, -1)) and before is None
+    ids, _ = _get(limit=2, since=_ts(T0 + 25 * 60), until=_ts(T0 + 40 * 60))
+    assert ids == [8, 7]
+
+
+def test_invalid_parameters_are_rejected(changes):
+    c = TestClient(app)
+    assert c.get("/logs/recent", params={"status": "deleted"}, headers=HEADERS).status_code == 400
+    assert c.get("/logs/recent", params={"since": "gestern"}, headers=HEADERS).status_code == 400
+    assert c.get("/logs/recent", params={"before": "kaputt"}, headers=HEADERS).status_code == 400
@@ -0,0 +1,122 @@
+from app.backend.services import ontology
+
+
+def _fake_select(state):
+    def fake(query: str):
+        state["calls"].append(query)
+        if "COUNT" in query:
+            return {"results": {"bindings": [{"terms": {"value": str(len(state["props"]) + 1)}, "labels": {"value": "1"}}]}}
+        if "?c" in query:
+            return {"results": {"bindings": [{"c": {"value": "http://example.org/Class"}, "label": {"value": "Klasse"}}]}}
+        return {"results": {"bindings": [{"p": {"value": p}} for p in state["props"]]}}
+    return fake
+
+
+def test_registry_reloads_only_on_probe_change(monkeypatch):
+    state = {"calls": [], "props": ["http://example.org/a"]}
+    monkeypatch.setattr(ontology.sparql, "query_select", _fake_select(state))
+    monkeypatch.setattr(ontology.sparql, "_perf", lambda *a, **kw: None)
+    reg = ontology.OntologyRegistry()
+
+    snap = reg.snapshot()
+    assert snap.version == 1
+    assert snap.label("http://example.org/Class") == "Klasse"
+    assert "http://example.org/a" in snap.property_set
+
+    state["calls"].clear()
+    assert reg.refresh() is False
+    assert len(state["calls"]) == 1  # nur die Probe
+
+    state["props"].append("http://example.org/b")
+    assert reg.refresh() is True
+    assert reg.snapshot().version == 2
+    assert reg.snapshot().fingerprint != snap.fingerprint
+
+
+def test_forced_refresh_keeps_version_when_unchanged(monkeypatch):
+    state = {"calls": [], "props": ["http://example.org/a"]}
+    monkeypatch.setattr(ontology.sparql, "query_select", _fake_select(state))
+    monkeypatch.setattr(ontology.sparql, "_perf", lambda *a, **kw: None)
+    reg = ontology.OntologyRegistry()
+    first = reg.snapshot()
+
+    assert reg.refresh(force=True) is False
+    assert reg.snapshot().version == first.version
+    assert reg.snapshot().fingerprint == first.fingerprint
+
+
+def test_start_does_not_block_and_serves_placeholder_until_loaded(monkeypatch):
+    import threading
+
+    state = {"calls": [], "props": ["http://example.org/a"]}
+    gate = threading.Event()
+    fake = _fake_select(state)
+
+    def slow(query: str):
+        gate.wait(5)
+        return fake(query)
+
+    monkeypatch.setattr(ontology.sparql, "query_select", slow)
+    monkeypatch.setattr(ontology.sparql, "_perf", lambda *a, **kw: None)
+    monkeypatch.setenv("ONTOLOGY_CHECK_SECONDS", "0")
+    ontology.get_settings.cache_clear()
+    reg = ontology.OntologyRegistry()
+    try:
+        reg.start()
+        assert reg.snapshot() is ontology.EMPTY
+        assert reg.status()["ready"] is False
+
+        gate.set()
+        reg._thread.join(5)
+        status = reg.status()
+        assert status["ready"] is True and status["version"] == 1
+        assert status["last_reload"]["dur_ms"] >= 0
+        assert "http://example.org/a" in reg.snapshot().property_set
+    finally:
+        reg.stop()
+        ontology.get_settings.cache_clear()
+
+
+def test_initial_load_retries_after_failure(monkeypatch):
+    state = {"calls": [], "props": ["http://example.org/a"], "fail": 1}
+    fake = _fake_select(state)
+
+    def flaky(query: str):
+        if state["fail"]:
+            state["fail"] -= 1
+            raise ConnectionError("fuseki down")
+        return fake(query)
+
+    monkeypatch.setattr(ontology.sparql, "query_select", flaky)
+    monkeypatch.setattr(ontology.sparql, "_perf", lambda *a, **kw: None)
+    reg = ontology.OntologyRegistry()
+    reg._run(0, 0, 0)  # ohne Hintergrund-Thread: Fehler, 1 s warten, erneut laden, Ende
+
+    status = reg.status()
+    assert status["ready"] is True
+    assert status["last_check"]["error"] is None
+
+
+def test_placeholder_is_not_ready_endpoints_answer_503(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.backend.main import app
+    from app.backend.services.validator import validate
+
+    monkeypatch.setattr(ontology.registry, "snapshot", lambda: ontology.EMPTY)
+    assert not ontology.EMPTY.ready and ontology.OntologySnapshot.from_terms([], []).ready
+
+    c = TestClient(app)
+    headers = {"x-api-key": "test-token"}
+    for method, path, body in (("get", "/ontology/terms", None),
+                               ("post", "/nl2sparql/generate", {"text": "Zeige alle Pfarrer"}),
+                               ("post", "/nl2sparql/generate/stream", {"text": "Zeige alle Pfarrer"}),
+                               ("post", "/nl2sparql/generate/batch", {"items": [{"text": "Zeige alle Pfarrer"}]})):
+        res = c.request(method, path, json=body, headers=headers)
+        assert res.status_code == 503 and int(res.headers["retry-after"]) >= 1, path
+
+    # Validator meldet ohne Vokabular keine "unbekannten" Terme
+    v = validate("PREFIX voc: <http://example.org/voc#> INSERT DATA { <urn:x> a voc:Pfarrer-in ; voc:name \"A\" }")
+    assert v["ok"] is True and v["suggestions"] == {}
+    assert v["warnings"] == ["Ontologie wird noch geladen – Klassen/Properties nicht geprüft."]
+    assert v["used_uris"]["classes"] == ["http://example.org/voc#Pfarrer-in"]
@@ -0,0 +1,103 @@
+import json
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.backend.config import get_settings
+from app.backend.main import app
+from app.backend.services import monitoring, perflog
+from app.backend.services.segments import SegmentedLog
+
+
+def _lines(path) -> list:
+    return list(SegmentedLog(str(path)).read())
+
+
+@pytest.fixture
+def sink(monkeypatch, tmp_path):
+    monkeypatch.setenv("PERF_LOG_BATCH_SIZE", "3")
+    monkeypatch.setenv("PERF_LOG_FLUSH_MS", "60000")
+    get_settings.cache_clear()
+    s = perflog.PerfSink(str(tmp_path / "perf.jsonl"))
+    yield s
+    s.close()
+
+
+def _wait_for(cond, timeout: float = 2.0) -> bool:
+    t0 = time.monotonic()
+    while time.monotonic() - t0 < timeout:
+        if cond():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_events_are_written_in_batches(sink, tmp_path):
+    path = tmp_path / "perf.jsonl"
+    for i in range(4):
+        sink.emit({"kind": "test", "i": i})
+    assert _wait_for(lambda: len(_lines(path)) == 3)  # volle Batch sofort, Rest wartet auf die Frist
+    time.sleep(0.05)
+    assert len(_lines(path)) == 3
+    assert sink.flush()
+    assert [r["i"] for r in _lines(path)] == [0, 1, 2, 3]
+
+
+def test_flush_interval_and_close(monkeypatch, sink, tmp_path):
+    monkeypatch.setenv("PERF_LOG_FLUSH_MS", "20")
+    get_settings.cache_clear()
+    sink.close()
+    sink.emit({"kind": "test", "i": 0})
+    assert _wait_for(lambda: len(_lines(tmp_path / "perf.jsonl")) == 1)
+
+    sink.emit({"kind": "test", "i": 1})
+    sink.close()  # schreibt den Rest, ein späteres emit startet den Thread neu
+    assert len(_lines(tmp_path / "perf.jsonl")) == 2
+    sink.emit({"kind": "test", "i": 2})
+    assert sink.flush() and len(_lines(tmp_path / "perf.jsonl")) == 3
+
+
+def test_overload_drops_and_counts(monkeypatch, sink):
+    monkeypatch.setenv("PERF_LOG_QUEUE_SIZE", "2")
+    get_settings.cache_clear()
+    monitoring.reset_metrics_for_tests()
+    release = threading.Event()
+    original = sink._write
+    monkeypatch.setattr(sink, "_write", lambda batch: (release.wait(2), original(batch)))
+
+    sink.close()
+    for i in range(20):
+        sink.emit({"kind": "test", "i": i})
+    release.set()
+    sink.flush()
+    assert sink.dropped > 0 and sink.written + sink.dropped == 20
+    assert monitoring._prometheus_registry.get_sample_value(
+        "nl2sparql_perf_events_dropped_total", {"reason": "queue_full"}) == sink.dropped
+
+
+def test_segments_past_retention_are_removed(monkeypatch, sink, tmp_path):
+    monkeypatch.setenv("PERF_LOG_RETENTION_DAYS", "1")
+    get_settings.cache_clear()
+    old = tmp_path / "perf" / "20200101T0000Z.jsonl"
+    old.parent.mkdir()
+    old.write_text(json.dumps({"ts": "2020-01-01T00:00:00Z", "kind": "test"}) + "\n", encoding="utf-8")
+    for i in range(3):
+        sink.emit({"kind": "test", "i": i})
+    assert sink.flush()
+    assert not old.exists()  # beim Öffnen des laufenden Segments aufgeräumt
+    assert [r["i"] for r in _lines(tmp_path / "perf.jsonl")] == [0, 1, 2]
+
+
+def test_http_requests_go_through_the_shared_sink(monkeypatch, tmp_path):
+    s = perflog.PerfSink(str(tmp_path / "perf.jsonl"))
+    monkeypatch.setattr(perflog, "sink", s)
+    try:
+        TestClient(app).get("/health")
+        perflog.event("fuseki", op="select", dur_ms=1.0)
+        assert perflog.flush()
+    finally:
+        s.close()
+    rows = _lines(tmp_path / "perf.jsonl")
+    assert [(r["kind"], r.get("path") or r.get("op")) for r in rows] == [("http", "/health"), ("fuseki", "select")]
@@ -0,0 +1,67 @@
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.backend.config import get_settings
+from app.backend.main import app
+from app.backend.services import perflog, perfstats
+
+
+def _exact(values, q):
+    d = sorted(values)
+    return d[round(q * (len(d) - 1))]
+
+
+def test_sketch_quantiles_are_within_relative_accuracy():
+    rnd = random.Random(7)
+    values = [rnd.lognormvariate(3, 1.2) for _ in range(20000)]
+    a, b = perfstats.Sketch(), perfstats.Sketch()
+    for i, v in enumerate(values):
+        (a if i % 2 else b).add(v)
+    merged = perfstats.merge([a, b])
+    assert merged.n == len(values) and merged.max == max(values)
+    for q in (0.5, 0.95, 0.99, 0.999):
+        assert merged.quantile(q) == pytest.approx(_exact(values, q), rel=0.03)
+
+
+def test_window_only_merges_recent_minutes_and_prunes_old_ones():
+    agg = perfstats.RollingAggregator(retention=10)
+    now = 1_000_000.0
+    agg.observe({"kind": "http", "path": "/nl2sparql/select", "dur_ms": 10}, now=now - 300)
+    agg.observe({"kind": "http", "path": "/nl2sparql/select", "dur_ms": 20}, now=now)
+    agg.observe({"kind": "fuseki", "op": "select", "dur_ms": 5}, now=now)
+    agg.observe({"kind": "fuseki", "op": "breaker", "state": "open"}, now=now)  # ohne Dauer: ignoriert
+
+    assert agg.window(1, now=now)[("http", "/nl2sparql/select")].n == 1
+    assert agg.window(10, now=now)[("http", "/nl2sparql/select")].n == 2
+    assert set(agg.window(10, now=now)) == {("http", "/nl2sparql/select"), ("fuseki", "select")}
+
+    agg.observe({"kind": "http", "path": "/health", "dur_ms": 1}, now=now + 600)
+    assert ("http", "/nl2sparql/select") not in agg.window(10, now=now + 600)
+    assert len(agg._minutes) == 1
+
+
+def test_perf_endpoint_reads_the_aggregate(monkeypatch, tmp_path):
+    monkeypatch.setattr(perfstats, "aggregator", perfstats.RollingAggregator())
+    monkeypatch.setattr(perflog, "sink", perflog.PerfSink(str(tmp_path / "perf.jsonl")))
+    for d in range(1, 101):
+        perflog.event("fuseki", op="select", status=200, dur_ms=float(d))
+    perflog.event("llm", op="complete", dur_ms=800.0)
+    perflog.event("http", path="/nl2sparql/select/123456", method="POST", status=200, dur_ms=12.0)
+
+    headers = {"x-api-key": get_settings().api_auth_token}
+    c = TestClient(app)
+    data = c.get("/metrics/perf?minutes=5&breakdown=true", headers=headers).json()
+    perflog.sink.close()
+
+    sel = data["fuseki"]["select"]
+    assert sel["n"] == 100 and sel["max_ms"] == 100.0
+    assert sel["p50_ms"] == pytest.approx(50, rel=0.03) and sel["p99_ms"] == pytest.approx(99, rel=0.03)
+    assert "p999_ms" in sel and data["fuseki"]["update"]["n"] == 0
+    assert data["ops"]["llm"]["complete"]["n"] == 1
+    assert data["paths"]["/nl2sparql/select/:id"]["n"] == 1
+    assert {"path": "/nl2sparql/select/:id", "count": 1} in data["top_http_paths"]
+
+    assert c.get("/metrics/perf?quantiles=0.9", headers=headers).json()["http"].keys() == {"n", "p90_ms", "max_ms"}
+    assert c.get("/metrics/perf?quantiles=1.5", headers=headers).status_code == 400
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from app.backend.services import llm
+from app.backend.services.ontology import OntologySnapshot, registry
+from app.backend.services.repair import normalize_prefixes, repair_sparql
+from app.backend.services.validator import validate
+
+VOC = llm.VOC
+
+
+@pytest.fixture(autouse=True)
+def _snap():
+    registry.swap(OntologySnapshot.from_terms(
+        [VOC + "Pfarrer-in", VOC + "Pfarrstelle"],
+        [VOC + "vorname", VOC + "nachname", VOC + "hatStelle", VOC + "geburtsdatum"],
+    ))
+    yield registry.snapshot()
+    registry.swap(None)
+
+
+def _repair(q, snap):
+    return repair_sparql(q, validate(q), snap, llm._CANONICAL_PREFIXES)
+
+
+def test_fuzzy_matches_case_hyphen_and_typos(_snap):
+    q = f"""PREFIX voc:<{VOC}>
+SELECT ?p WHERE {{ ?p a voc:Pfarrerin ; voc:Vorname ?v ; voc:geburtsdatm ?g ; <{VOC}hatstelle> ?s . }}"""
+    fixed, fixes = _repair(q, _snap)
+    assert "a voc:Pfarrer-in ;" in fixed
+    assert "voc:vorname ?v" in fixed and "voc:geburtsdatum ?g" in fixed
+    assert f"<{VOC}hatStelle>" in fixed
+    assert len(fixes) == 4
+    assert validate(fixed)["warnings"] == []
+
+
+def test_prefix_normalization_and_hash_artifacts(_snap):
+    q = "PREFIX voc:<http://example.org/wrong#> SELECT ?v WHERE { ?p voc:#vorname ?v ; rdfs:label ?l . }"
+    fixed, fixes = normalize_prefixes(q, llm._CANONICAL_PREFIXES)
+    assert fixed.splitlines()[0] == f"PREFIX voc:<{VOC}>"
+    assert "PREFIX rdfs:<http://www.w3.org/2000/01/rdf-schema#>" in fixed
+    assert "voc:vorname" in fixed and "voc:#" not in fixed
+    assert len(fixes) == 3
+
+
+def test_unrelated_or_ambiguous_terms_are_left_alone(_snap):
+    q = f"PREFIX voc:<{VOC}>\nSELECT ?x WHERE {{ ?p voc:wohnort ?x ; <http://www.w3.org/2000/01/rdf-schema#label> ?l . }}"
+    assert _repair(q, _snap) == (q, [])
+
+
+def test_local_repair_avoids_second_llm_call(monkeypatch):
+    calls = []
+
+    async def fake_complete(messages, usage):
+        calls.append(messages)
+        return f"```sparql\nPREFIX voc:<{VOC}>\nSELECT ?v WHERE {{ ?p a voc:pfarrer_in ; voc:vorname ?v . }}\n```"
+
+    monkeypatch.setattr(llm, "_acomplete", fake_complete)
+    out = asyncio.run(llm.agenerate_sparql_with_guardrails("Zeige Vornamen", use_cache=False))
+    assert len(calls) == 1 and out["attempts"] == 1
+    assert out["repair"]["path"] == "local"
+    assert "voc:Pfarrer-in" in out["sparql"]
+
+
+def test_falls_back_to_llm_when_local_repair_fails(monkeypatch):
+    answers = iter([
+        f"```sparql\nPREFIX voc:<{VOC}>\nSELECT ?v WHERE {{ ?p voc:wohnort ?v . }}\n```",
+        f"```sparql\nPREFIX voc:<{VOC}>\nSELECT ?v WHERE {{ ?p voc:vorname ?v . }}\n```",
+    ])
+
+    async def fake_complete(messages, usage):
+        return next(answers)
+
+    monkeypatch.setattr(llm, "_acomplete", fake_complete)
+    out = asyncio.run(llm.agenerate_sparql_with_guardrails("Zeige Wohnorte", use_cache=False))
+    assert out["attempts"] == 2 and out["repair"]["path"] == "llm"
+    assert out["validation"]["warnings"] == []
@@ -0,0 +1,151 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.backend.config import get_settings
+from app.backend.main import app
+from app.backend.services import monitoring, sparql
+from app.backend.services.resilience import CircuitBreaker, CircuitOpenError
+
+
+@pytest.fixture(autouse=True)
+def _fresh(monkeypatch):
+    rows = []
+    monkeypatch.setattr(sparql, "_perf", lambda *a, **kw: rows.append(kw))
+    monkeypatch.setenv("FUSEKI_RETRY_BACKOFF_MS", "0")
+    monkeypatch.setenv("FUSEKI_BREAKER_FAILURES", "2")
+    get_settings.cache_clear()
+    monitoring.reset_metrics_for_tests()
+    sparql.breaker.reset()
+    sparql._select_latency.clear()
+    yield rows
+    sparql.breaker.reset()
+    sparql._select_latency.clear()
+    get_settings.cache_clear()
+
+
+def _ok(n: int = 1) -> httpx.Response:
+    return httpx.Response(200, json={"head": {"vars": ["n"]}, "results": {"bindings": [{"n": n}]}})
+
+
+def _select(handler, n: int = 1):
+    async def run():
+        sparql._aclients[asyncio.get_running_loop()] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        out = []
+        try:
+            for _ in range(n):
+                try:
+                    out.append(await sparql.aquery_select("SELECT * WHERE { ?s ?p ?o }"))
+                except Exception as ex:
+                    out.append(ex)
+            return out
+        finally:
+            await sparql.aclose()
+    return asyncio.run(run())
+
+
+def test_breaker_opens_probes_and_closes(monkeypatch):
+    monkeypatch.setenv("FUSEKI_BREAKER_OPEN_SECONDS", "0.05")
+    get_settings.cache_clear()
+    seen = []
+    b = CircuitBreaker(on_transition=lambda prev, state, reason: seen.append((prev, state)))
+
+    b.record(False)
+    b.before()
+    b.record(False)
+    with pytest.raises(CircuitOpenError):
+        b.before()
+    time.sleep(0.06)
+    b.before()  # Probe
+    with pytest.raises(CircuitOpenError):
+        b.before()  # nur ein Probe-Aufruf gleichzeitig
+    b.record(True)
+    b.before()
+    assert seen == [("closed", "open"), ("open", "half_open"), ("half_open", "closed")]
+
+
+def test_slow_calls_count_as_failures(monkeypatch):
+    monkeypatch.setenv("FUSEKI_BREAKER_SLOW_MS", "100")
+    get_settings.cache_clear()
+    b = CircuitBreaker()
+    b.record(True, 0.5)
+    b.record(True, 0.5)
+    assert b.state == "open"
+
+
+def test_select_is_retried_on_503(_fresh):
+    hits = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        hits.append(1)
+        return httpx.Response(503) if len(hits) == 1 else _ok()
+
+    out = _select(handler)
+    assert out[0]["results"]["bindings"] == [{"n": 1}]
+    assert len(hits) == 2
+    assert [r["attempt"] for r in _fresh if r.get("op") == "retry"] == [1]
+    assert monitoring._prometheus_registry.get_sample_value(
+        "nl2sparql_fuseki_retries_total", {"operation": "select"}) == 1
+
+
+def test_client_errors_are_not_retried_and_keep_breaker_closed():
+    hits = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        hits.append(1)
+        return httpx.Response(400, content=b"Parse error")
+
+    out = _select(handler, 3)
+    assert all(isinstance(ex, httpx.HTTPStatusError) for ex in out)
+    assert len(hits) == 3 and sparql.breaker.state == "closed"
+
+
+def test_open_breaker_fails_fast_without_network(_fresh):
+    hits = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        hits.append(1)
+        return httpx.Response(500)
+
+    out = _select(handler, 3)
+    assert isinstance(out[0], httpx.HTTPStatusError) and isinstance(out[1], httpx.HTTPStatusError)
+    assert isinstance(out[2], CircuitOpenError)
+    assert len(hits) == 2  # 500 wird nicht wiederholt; der zweite Fehler öffnet den Breaker
+    assert [(r["prev"], r["state"]) for r in _fresh if r.get("op") == "breaker"] == [("closed", "open")]
+    assert monitoring._prometheus_registry.get_sample_value("nl2sparql_fuseki_breaker_state") == 2
+
+
+def test_slow_select_is_hedged(monkeypatch, _fresh):
+    monkeypatch.setenv("FUSEKI_HEDGE", "1")
+    monkeypatch.setenv("FUSEKI_HEDGE_MIN_MS", "20")
+    get_settings.cache_clear()
+    for _ in range(20):
+        sparql._select_latency.add(0.01)
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(1)
+        if len(calls) == 1:
+            await asyncio.sleep(2.0)
+            return _ok(1)
+        return _ok(2)
+
+    t0 = time.perf_counter()
+    out = _select(handler)
+    assert time.perf_counter() - t0 < 1.0
+    assert out[0]["results"]["bindings"] == [{"n": 2}]
+    assert [r["winner"] for r in _fresh if r.get("op") == "hedge"] == ["hedge"]
+
+
+def test_open_breaker_maps_to_503():
+    sparql.breaker.record(False)
+    sparql.breaker.record(False)
+    client = TestClient(app)
+    r = client.post("/nl2sparql/select", json={"sparql": "SELECT * WHERE { ?s ?p ?o }"},
+                    headers={"x-api-key": get_settings().api_auth_token})
+    assert r.status_code == 503
+    assert int(r.headers["retry-after"]) >= 1
+    assert client.get("/health").json()["fuseki"] == "open"
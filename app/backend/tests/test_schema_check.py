@@ -0,0 +1,92 @@
+import pytest
+
+from app.backend.services import ontology, validator
+from app.backend.services.ontology import OntologySnapshot, registry
+from app.backend.services.schema import SchemaIndex
+
+EX = "http://example.org/"
+XSD = "http://www.w3.org/2001/XMLSchema#"
+OWL = "http://www.w3.org/2002/07/owl#"
+PFX = f"PREFIX ex:<{EX}>\nPREFIX xsd:<{XSD}>\n"
+
+
+@pytest.fixture(autouse=True)
+def _snapshot():
+    registry.swap(OntologySnapshot.from_terms(
+        [EX + "Person", EX + "Pfarrer-in", EX + "Stelle", EX + "Gemeinde"],
+        [EX + "hatStelle", EX + "geburtsdatum", EX + "vorname", EX + "gemeinde"],
+        schema=[
+            (EX + "Pfarrer-in", "subClassOf", EX + "Person"),
+            (EX + "hatStelle", "domain", EX + "Person"),
+            (EX + "hatStelle", "range", EX + "Stelle"),
+            (EX + "hatStelle", "type", OWL + "ObjectProperty"),
+            (EX + "geburtsdatum", "range", XSD + "date"),
+            (EX + "geburtsdatum", "type", OWL + "FunctionalProperty"),
+            (EX + "vorname", "range", XSD + "string"),
+        ],
+    ))
+    yield registry.snapshot()
+    registry.swap(None)
+
+
+def test_literal_for_object_property_is_an_error():
+    res = validator.validate(PFX + 'INSERT DATA { ex:p1 a ex:Pfarrer-in ; ex:hatStelle "Pfarrstelle Nord" . }')
+    assert res["ok"] is False
+    assert any("erwartet eine Ressource" in e for e in res["errors"])
+
+
+def test_resource_for_datatype_property_is_an_error():
+    res = validator.validate(PFX + "INSERT DATA { ex:p1 ex:vorname ex:Anna . }")
+    assert any("erwartet ein Literal" in e for e in res["errors"])
+
+
+def test_domain_and_range_respect_subclasses():
+    ok = validator.validate(PFX + "INSERT DATA { ex:p1 a ex:Pfarrer-in ; ex:hatStelle ex:s1 . ex:s1 a ex:Stelle . }")
+    assert ok["ok"] is True and ok["warnings"] == []
+
+    bad = validator.validate(PFX + """
+        INSERT { ?g ex:hatStelle ?x } WHERE { ?g a ex:Gemeinde . ?x a ex:Person . }
+    """)
+    assert bad["ok"] is True
+    assert any("Domain von <http://example.org/hatStelle>" in w for w in bad["warnings"])
+    assert any("Range von <http://example.org/hatStelle>" in w for w in bad["warnings"])
+
+
+def test_datatype_and_functional_warnings():
+    res = validator.validate(PFX + 'INSERT DATA { ex:p1 ex:geburtsdatum "1850-01-01"^^xsd:date, 1850 ; ex:vorname "Anna"@de . }')
+    assert any('Literal "1850"' in w for w in res["warnings"])
+    assert any("funktional" in w for w in res["warnings"])
+    assert not any("vorname" in w for w in res["warnings"])  # langString erfüllt xsd:string
+
+
+def test_where_patterns_are_not_checked():
+    res = validator.validate(PFX + 'DELETE { ?p ex:vorname ?n } WHERE { ?p ex:hatStelle "x" ; ex:vorname ?n . }')
+    assert res["errors"] == []
+
+
+def test_index_is_built_once_per_snapshot(_snapshot):
+    idx = SchemaIndex.for_snapshot(_snapshot)
+    assert SchemaIndex.for_snapshot(_snapshot) is idx
+    assert idx.properties[EX + "geburtsdatum"].kind == "datatype"
+    assert idx.superclasses(EX + "Pfarrer-in") == {EX + "Pfarrer-in", EX + "Person"}
+
+
+def test_schema_axioms_change_fingerprint():
+    a = OntologySnapshot.from_terms([EX + "A"], [EX + "p"])
+    b = OntologySnapshot.from_terms([EX + "A"], [EX + "p"], schema=[(EX + "p", "domain", EX + "A")])
+    assert a.fingerprint != b.fingerprint
+
+
+def test_load_reads_schema_axioms(monkeypatch):
+    def fake(query: str):
+        if "?rel" in query:
+            return {"results": {"bindings": [
+                {"s": {"value": EX + "p"}, "rel": {"value": "range"}, "o": {"value": XSD + "date"}},
+            ]}}
+        if "?c" in query:
+            return {"results": {"bindings": [{"c": {"value": EX + "A"}}]}}
+        return {"results": {"bindings": [{"p": {"value": EX + "p"}}]}}
+
+    monkeypatch.setattr(ontology.sparql, "query_select", fake)
+    snap = ontology._load(1, None)
+    assert snap.schema == ((EX + "p", "range", XSD + "date"),)
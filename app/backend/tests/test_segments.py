@@ -0,0 +1,115 @@
+import calendar
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.backend.main import app
+from app.backend.services import changelog, segments
+from app.backend.services.segments import SegmentedLog
+
+T0 = calendar.timegm((2026, 10, 18, 14, 0, 0))
+
+
+def _ts(t: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(t))
+
+
+@pytest.fixture
+def clock():
+    return [T0]
+
+
+def _log(path, clock, **kw) -> SegmentedLog:
+    return SegmentedLog(str(path), clock=lambda: clock[0], **kw)
+
+
+def _fill(log: SegmentedLog, clock, offsets_min) -> None:
+    for m in offsets_min:
+        clock[0] = T0 + m * 60
+        log.append([{"ts": _ts(clock[0]), "m": m}])
+
+
+def test_rolls_over_and_indexes_minutes(clock, tmp_path):
+    log = _log(tmp_path / "perf.jsonl", clock)
+    _fill(log, clock, [0, 1, 1, 30, 59, 60, 61, 125])
+
+    names = sorted(p.name for p in (tmp_path / "perf").iterdir())
+    assert names == [
+        "20261018T1400Z.idx.json", "20261018T1400Z.jsonl",
+        "20261018T1500Z.idx.json", "20261018T1500Z.jsonl",
+        "20261018T1600Z.idx.json", "20261018T1600Z.jsonl",
+    ]
+    idx = json.loads((tmp_path / "perf" / "20261018T1400Z.idx.json").read_text())
+    assert (idx["first"], idx["last"], idx["lines"]) == (T0, T0 + 59 * 60, 5)
+    assert [m for m, _ in idx["minutes"]] == [T0, T0 + 60, T0 + 30 * 60, T0 + 59 * 60]
+    assert idx["bytes"] == (tmp_path / "perf" / "20261018T1400Z.jsonl").stat().st_size
+
+    # Offsets zeigen auf Zeilenanfänge der jeweiligen Minute
+    with open(tmp_path / "perf" / "20261018T1400Z.jsonl", "rb") as f:
+        for minute, offset in idx["minutes"]:
+            f.seek(offset)
+            assert json.loads(f.readline())["m"] == (minute - T0) / 60
+
+    assert [r["m"] for r in log.read()] == [0, 1, 1, 30, 59, 60, 61, 125]
+    assert [r["m"] for r in log.read(since=T0 + 30 * 60, until=T0 + 61 * 60)] == [30, 59, 60, 61]
+
+
+def test_readers_open_only_overlapping_segments(clock, tmp_path, monkeypatch):
+    log = _log(tmp_path / "perf.jsonl", clock)
+    _fill(log, clock, [h * 60 + 5 for h in range(48)])  # zwei Tage, ein Segment je Stunde
+
+    opened, indexed = [], []
+    original, original_index = segments.Segment.open, segments.read_index
+    monkeypatch.setattr(segments.Segment, "open", lambda seg: (opened.append(seg.path.name), original(seg))[1])
+    monkeypatch.setattr(segments, "read_index", lambda p: (indexed.append(p.name), original_index(p))[1])
+    since = T0 + 47 * 3600 - 30 * 60
+    rows = list(log.read(since=since))
+    assert [r["m"] for r in rows] == [47 * 60 + 5]
+    assert opened == ["20261020T1300Z.jsonl"]
+    assert indexed == ["20261020T1200Z.jsonl", "20261020T1300Z.jsonl"]  # Vorauswahl nach Dateinamen
+
+
+def test_closed_segments_are_gzipped_and_stay_seekable(clock, tmp_path):
+    log = _log(tmp_path / "perf.jsonl", clock, span_minutes=lambda: 10, compress=lambda: True)
+    _fill(log, clock, [0, 3, 7, 12])
+
+    files = sorted(p.name for p in (tmp_path / "perf").iterdir())
+    assert files == [
+        "20261018T1400Z.idx.json", "20261018T1400Z.jsonl.gz",
+        "20261018T1410Z.idx.json", "20261018T1410Z.jsonl",
+    ]
+    first = log.segments()[0]
+    assert first.compressed and first.offset_for(T0 + 7 * 60) > 0
+    assert [r["m"] for r in log.read(since=T0 + 7 * 60)] == [7, 12]
+
+    # nach einem Neustart wird das zuletzt geschriebene Segment beim ersten Wechsel komprimiert
+    _fill(_log(tmp_path / "perf.jsonl", clock, span_minutes=lambda: 10, compress=lambda: True), clock, [25])
+    assert (tmp_path / "perf" / "20261018T1410Z.jsonl.gz").exists()
+    assert [r["m"] for r in log.read()] == [0, 3, 7, 12, 25]
+
+
+def test_retention_and_legacy_file(clock, tmp_path):
+    legacy = tmp_path / "perf.jsonl"
+    legacy.write_text(json.dumps({"ts": _ts(T0 - 3600), "m": -60}) + "\n", encoding="utf-8")
+    log = _log(legacy, clock, retention_days=lambda: 1)
+    _fill(log, clock, [0, 60 * 24 + 5, 60 * 25 + 5])
+
+    # Altbestand wird gelesen, aber nie von der Aufbewahrung angefasst
+    assert [r["m"] for r in log.read()] == [-60, 60 * 24 + 5, 60 * 25 + 5]
+    assert not (tmp_path / "perf" / "20261018T1400Z.jsonl").exists()
+    assert not (tmp_path / "perf" / "20261018T1400Z.idx.json").exists()
+
+
+def test_recent_logs_reads_newest_segments_first(monkeypatch, clock, tmp_path):
+    monkeypatch.setattr(changelog, "log", _log(tmp_path / "changes.jsonl", clock))
+    for m in (0, 1, 61, 62, 125):
+        clock[0] = T0 + m * 60
+        changelog.append({"ts": _ts(clock[0]), "status": "applied", "sparql": f"# {m}"})
+
+    items, _ = changelog.page(4)
+    assert [r["sparql"] for r in items] == ["# 125", "# 62", "# 61", "# 1"]
+    res = TestClient(app).get("/logs/recent", params={"limit": 2}, headers={"x-api-key": "test-token"})
+    assert res.status_code == 200
+    assert [r["sparql"] for r in res.json()["items"]] == ["# 125", "# 62"]
@@ -0,0 +1,89 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.backend.config import get_settings
+from app.backend.services import monitoring, sparql
+
+
+@pytest.fixture(autouse=True)
+def _cache(monkeypatch):
+    monkeypatch.setattr(sparql, "_perf", lambda *a, **kw: None)
+    sparql.refresh_select_cache()
+    monitoring.reset_metrics_for_tests()
+    yield
+    get_settings.cache_clear()
+    sparql.refresh_select_cache()
+
+
+def _serve(steps, handler):
+    """Führt `steps` (Koroutinen-Fabriken) auf einem Loop mit Mock-Transport aus."""
+    async def run():
+        sparql._aclients[asyncio.get_running_loop()] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            return [await step() for step in steps]
+        finally:
+            await sparql.aclose()
+    return asyncio.run(run())
+
+
+def _handler(hits):
+    def handler(request: httpx.Request) -> httpx.Response:
+        hits.append(request.url.path)
+        if request.url.path.endswith("/update"):
+            return httpx.Response(204)
+        return httpx.Response(200, json={"head": {"vars": []}, "results": {"bindings": [{"n": len(hits)}]}})
+    return handler
+
+
+def _counter(result: str) -> float:
+    v = monitoring._prometheus_registry.get_sample_value("nl2sparql_select_cache_total", {"result": result})
+    return v or 0.0
+
+
+def test_normalization_ignores_whitespace_comments_and_prefix_order():
+    a = "PREFIX a:<urn:a#>\nPREFIX b:<urn:b#>\nselect ?x where { ?x a a:K . } # Kommentar"
+    b = "PREFIX b:<urn:b#> PREFIX a:<urn:a#>   SELECT ?x WHERE {\n  ?x a a:K .\n}"
+    assert sparql.normalize_query(a) == sparql.normalize_query(b)
+    assert sparql.normalize_query('SELECT * WHERE { ?x ?p "a  b" }') != sparql.normalize_query('SELECT * WHERE { ?x ?p "a b" }')
+
+
+def test_identical_selects_hit_cache_until_an_update():
+    hits = []
+    q1 = "PREFIX ex:<urn:ex#> SELECT * WHERE { ?s a ex:K }"
+    q2 = "PREFIX ex:<urn:ex#>\n\nselect *\nwhere { ?s a ex:K }"
+    out = _serve([
+        lambda: sparql.aquery_select(q1, cache=True),
+        lambda: sparql.aquery_select(q2, cache=True),
+        lambda: sparql.aquery_update("INSERT DATA { <urn:a> <urn:b> <urn:c> }"),
+        lambda: sparql.aquery_select(q1, cache=True),
+        lambda: sparql.aquery_select(q1),  # ohne cache=True immer an Fuseki
+    ], _handler(hits))
+
+    assert out[0] is out[1]
+    assert out[3] is not out[0]
+    assert len(hits) == 4
+    assert _counter("hit") == 1
+    assert _counter("miss") == 1 and _counter("stale") == 1
+
+
+def test_large_results_are_not_cached(monkeypatch):
+    monkeypatch.setenv("SELECT_CACHE_MAX_ENTRY_BYTES", "10")
+    get_settings.cache_clear()
+    hits = []
+    _serve([lambda: sparql.aquery_select("SELECT * WHERE { ?s ?p ?o }", cache=True)] * 2, _handler(hits))
+    assert len(hits) == 2
+    assert _counter("too_large") == 2
+
+
+def test_evictions_are_counted(monkeypatch):
+    monkeypatch.setenv("SELECT_CACHE_MAX_ENTRIES", "1")
+    get_settings.cache_clear()
+    sparql.refresh_select_cache()
+    hits = []
+    _serve([
+        lambda: sparql.aquery_select("SELECT * WHERE { ?s ?p 1 }", cache=True),
+        lambda: sparql.aquery_select("SELECT * WHERE { ?s ?p 2 }", cache=True),
+    ], _handler(hits))
+    assert _counter("evicted") == 1
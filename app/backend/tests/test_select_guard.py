@@ -0,0 +1,76 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.backend.services import sparql
+from app.backend.services.select_guard import guard_select
+
+
+def test_missing_limit_is_injected_after_order_by():
+    g = guard_select("SELECT ?s WHERE { ?s ?p ?o } ORDER BY ?s # Ende", 100, 1000)
+    assert g.action == "injected" and g.limit == 100
+    assert g.query.endswith("# Ende\nLIMIT 100\n")
+
+
+def test_large_limit_is_clamped_and_subquery_limits_ignored():
+    q = "SELECT * WHERE { { SELECT ?s WHERE { ?s ?p ?o } LIMIT 99999 } } LIMIT 50000 OFFSET 10"
+    g = guard_select(q, 100, 1000)
+    assert g.action == "clamped" and g.limit == 1000
+    assert "LIMIT 99999" in g.query and "LIMIT 1000 OFFSET 10" in g.query
+
+    kept = guard_select("SELECT * WHERE { ?s ?p ?o } LIMIT 5", 100, 1000)
+    assert kept.action == "kept" and kept.query.endswith("LIMIT 5")
+
+
+def test_limit_goes_before_trailing_values_and_ask_is_untouched():
+    g = guard_select("SELECT * WHERE { ?s ?p ?o } VALUES ?s { <urn:a> }", 10, 0)
+    assert g.query == "SELECT * WHERE { ?s ?p ?o } LIMIT 10\nVALUES ?s { <urn:a> }"
+    ask = guard_select("ASK { ?s ?p ?o }", 10, 10)
+    assert ask.action == "none" and ask.query == "ASK { ?s ?p ?o }"
+
+
+def _run(caps, rows=100, form=None):
+    body = json.dumps({"head": {"vars": ["s"]}, "results": {"bindings": [
+        {"s": {"type": "uri", "value": f"urn:x:{i}"}} for i in range(rows)
+    ]}}).encode()
+
+    async def gen():
+        for i in range(0, len(body), 64):
+            yield body[i:i + 64]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if form is not None:
+            form.update(dict(x.split("=", 1) for x in request.content.decode().split("&")))
+        return httpx.Response(200, content=gen())
+
+    async def run():
+        sparql._aclients[asyncio.get_running_loop()] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            return await sparql.aquery_select_capped("SELECT * WHERE { ?s ?p ?o }", caps)
+        finally:
+            await sparql.aclose()
+    return asyncio.run(run())
+
+
+@pytest.fixture(autouse=True)
+def _quiet(monkeypatch):
+    monkeypatch.setattr(sparql, "_perf", lambda *a, **kw: None)
+
+
+def test_row_cap_truncates_and_passes_server_timeout():
+    form = {}
+    data, truncated = _run(sparql.SelectCaps(10, 0, 7.5), form=form)
+    assert truncated == "rows"
+    assert len(data["results"]["bindings"]) == 10
+    assert data["head"] == {"vars": ["s"]}
+    assert form["timeout"] == "7.5"
+
+
+def test_byte_cap_and_complete_results():
+    data, truncated = _run(sparql.SelectCaps(0, 500, 0))
+    assert truncated == "bytes" and 0 < len(data["results"]["bindings"]) < 100
+
+    data, truncated = _run(sparql.SelectCaps(1000, 10_000_000, 0))
+    assert truncated is None and len(data["results"]["bindings"]) == 100
@@ -0,0 +1,150 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.backend.config import get_settings
+from app.backend.main import app
+from app.backend.services import sparql
+
+DOC = json.dumps({
+    "head": {"vars": ["s", "label"]},
+    "results": {"bindings": [
+        {"s": {"type": "uri", "value": f"urn:x:{i}"}, "label": {"type": "literal", "value": f'Zeile {i} mit "}}]" und ä'}}
+        for i in range(50)
+    ]},
+}, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+@pytest.fixture(autouse=True)
+def _quiet(monkeypatch):
+    rows = []
+    monkeypatch.setattr(sparql, "_perf", lambda *a, **kw: rows.append(kw))
+    return rows
+
+
+def _stream(fmt: str, handler, caps=None):
+    async def run():
+        sparql._aclients[asyncio.get_running_loop()] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            content_type, body = await sparql.astream_select("SELECT * WHERE { ?s ?p ?o }", fmt, caps)
+            chunks = [c async for c in body]
+            return content_type, chunks
+        finally:
+            await sparql.aclose()
+    return asyncio.run(run())
+
+
+def _chunked(payload: bytes, size: int, media: str, form=None):
+    async def gen():
+        for i in range(0, len(payload), size):
+            yield payload[i:i + size]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.headers["accept"] == media
+        if form is not None:
+            form.update(dict(x.split("=", 1) for x in request.content.decode().split("&")))
+        return httpx.Response(200, headers={"content-type": media}, content=gen())
+    return handler
+
+
+def test_json_and_csv_are_passed_through_unchanged():
+    ct, chunks = _stream("json", _chunked(DOC, 100, "application/sparql-results+json"))
+    assert ct == "application/sparql-results+json"
+    assert len(chunks) > 1 and b"".join(chunks) == DOC
+
+    csv = b"s,label\r\nurn:x:1,a\r\n"
+    ct, chunks = _stream("csv", _chunked(csv, 5, "text/csv"))
+    assert ct == "text/csv" and b"".join(chunks) == csv
+
+
+def test_ndjson_is_produced_incrementally(_quiet):
+    ct, chunks = _stream("ndjson", _chunked(DOC, 7, "application/sparql-results+json"))
+    assert ct == "application/x-ndjson"
+    lines = b"".join(chunks).decode("utf-8").splitlines()
+    assert len(chunks) > 1
+    assert [json.loads(ln)["s"]["value"] for ln in lines] == [f"urn:x:{i}" for i in range(50)]
+    assert json.loads(lines[3])["label"]["value"] == 'Zeile 3 mit "}]" und ä'
+    assert _quiet[-1]["rows"] == 50 and _quiet[-1]["op"] == "select_stream"
+
+
+def test_error_status_is_raised_before_streaming():
+    with pytest.raises(httpx.HTTPStatusError):
+        _stream("json", lambda request: httpx.Response(400, content=b"Parse error"))
+
+
+def test_json_row_cap_ends_as_valid_json_and_passes_server_timeout(_quiet):
+    form = {}
+    _, chunks = _stream("json", _chunked(DOC, 100, "application/sparql-results+json", form),
+                        sparql.SelectCaps(3, 0, 7.5))
+    data = json.loads(b"".join(chunks))
+    assert data["head"] == {"vars": ["s", "label"]} and data["truncated"] == "rows"
+    assert [b["s"]["value"] for b in data["results"]["bindings"]] == ["urn:x:0", "urn:x:1", "urn:x:2"]
+    assert form["timeout"] == "7.5"
+    assert _quiet[-1]["truncated"] == "rows" and _quiet[-1]["rows"] == 3
+
+    _, chunks = _stream("json", _chunked(DOC, 100, "application/sparql-results+json"), sparql.SelectCaps(50, 0, 0))
+    assert json.loads(b"".join(chunks)) == json.loads(DOC)  # nichts gekappt: kein `truncated`
+
+
+def test_ndjson_byte_cap_stops_at_a_row_boundary(_quiet):
+    _, chunks = _stream("ndjson", _chunked(DOC, 7, "application/sparql-results+json"), sparql.SelectCaps(0, 1000, 0))
+    out = b"".join(chunks)
+    assert 0 < len(out) <= 1000 and out.endswith(b"\n")
+    lines = out.decode("utf-8").splitlines()
+    assert [json.loads(ln)["s"]["value"] for ln in lines] == [f"urn:x:{i}" for i in range(len(lines))]
+    assert _quiet[-1]["truncated"] == "bytes" and _quiet[-1]["rows"] == len(lines)
+
+
+def test_csv_row_cap_keeps_header_and_quoted_line_breaks():
+    csv = b's,label\r\nurn:x:1,"zwei\r\nZeilen"\r\nurn:x:2,b\r\nurn:x:3,c\r\nurn:x:4,d'
+    _, chunks = _stream("csv", _chunked(csv, 5, "text/csv"), sparql.SelectCaps(2, 0, 0))
+    assert b"".join(chunks) == b's,label\r\nurn:x:1,"zwei\r\nZeilen"\r\nurn:x:2,b\r\n'
+
+    _, chunks = _stream("tsv", _chunked(csv.replace(b",", b"\t"), 3, "text/tab-separated-values"),
+                        sparql.SelectCaps(10, 0, 0))
+    assert b"".join(chunks) == csv.replace(b",", b"\t")  # letzte Zeile ohne Umbruch bleibt erhalten
+
+
+def test_endpoint_applies_limit_guard_and_caps(monkeypatch):
+    monkeypatch.setenv("SELECT_DEFAULT_LIMIT", "25")
+    monkeypatch.setenv("SELECT_MAX_ROWS", "10")
+    monkeypatch.setenv("SELECT_MAX_BYTES", "4096")
+    monkeypatch.setenv("SELECT_TIMEOUT_SECONDS", "12")
+    get_settings.cache_clear()
+    calls = []
+
+    async def fake_stream(query, fmt="json", caps=None):
+        calls.append((query, fmt, caps))
+
+        async def body():
+            yield b"s\r\n"
+        return "text/csv", body()
+
+    monkeypatch.setattr(sparql, "astream_select", fake_stream)
+    res = TestClient(app).post("/nl2sparql/select/stream", json={"sparql": "SELECT * WHERE { ?s ?p ?o }"},
+                               headers={"accept": "text/csv", "x-api-key": "test-token"})
+    assert res.status_code == 200 and res.content == b"s\r\n"
+    assert res.headers["x-select-limit"] == "25" and res.headers["x-select-limit-action"] == "injected"
+    query, fmt, caps = calls[0]
+    assert query.rstrip().endswith("LIMIT 25") and fmt == "csv"
+    assert caps == sparql.SelectCaps(10, 4096, 12.0)
+
+
+def test_splitter_keeps_only_the_open_row():
+    sp = sparql._BindingSplitter()
+    assert sp.feed('{"head":{},"results":{"bindings":[{"a":1},{"a":') == [{"a": 1}]
+    assert sp.buf == '{"a":'
+    assert sp.feed('2}]}}') == [{"a": 2}] and sp.done
+
+
+@pytest.mark.parametrize("accept,fmt", [
+    (None, "json"),
+    ("text/csv", "csv"),
+    ("text/tab-separated-values;q=0.9, application/x-ndjson", "ndjson"),
+    ("text/html, */*", "json"),
+])
+def test_negotiate_format(accept, fmt):
+    assert sparql.negotiate_format(accept) == fmt
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from app.backend.services import llm
+from app.backend.services.ontology import OntologySnapshot, registry
+from app.backend.services.singleflight import SingleFlight
+
+
+@pytest.fixture(autouse=True)
+def _setup(monkeypatch):
+    registry.swap(OntologySnapshot.from_terms(["http://example.org/Class"], ["http://example.org/prop"]))
+    monkeypatch.setenv("GEN_CACHE_MAX_ENTRIES", "0")  # nur Coalescing, kein Cache
+    llm.get_settings.cache_clear()
+    llm.refresh_generation_cache()
+    calls = []
+
+    async def fake_generate(anon_text, intent_hint, retry_if_invalid, snap, prefix=None, candidates=None):
+        calls.append(anon_text)
+        await asyncio.sleep(0.05)
+        return {"ok": True, "sparql": 'INSERT DATA { <urn:x> <urn:p> "PH1" . }', "validation": {"ok": True}, "attempts": 1}
+
+    monkeypatch.setattr(llm, "_agenerate", fake_generate)
+    yield calls
+    monkeypatch.delenv("GEN_CACHE_MAX_ENTRIES")
+    llm.get_settings.cache_clear()
+    llm.refresh_generation_cache()
+    registry.swap(None)
+
+
+def test_concurrent_identical_requests_share_one_generation(_setup):
+    async def run():
+        return await asyncio.gather(
+            llm.agenerate_sparql_with_guardrails('Füge die Person "Anna" hinzu'),
+            llm.agenerate_sparql_with_guardrails('Füge die Person "Berta" hinzu'),
+            llm.agenerate_sparql_with_guardrails("Zeige alle Pfarrer"),
+        )
+
+    a, b, c = asyncio.run(run())
+    assert len(_setup) == 2
+    assert [a["coalesced"], b["coalesced"], c["coalesced"]] == [False, True, False]
+    assert a["placeholders"] == {"PH1": '"Anna"'} and b["placeholders"] == {"PH1": '"Berta"'}
+    assert a["sparql"] == b["sparql"]
+
+
+def test_sequential_requests_and_use_cache_false_are_not_coalesced(_setup):
+    llm.generate_sparql_with_guardrails("Zeige alle Pfarrer")
+    llm.generate_sparql_with_guardrails("Zeige alle Pfarrer")
+
+    async def run():
+        return await asyncio.gather(*(llm.agenerate_sparql_with_guardrails("Zeige alle Pfarrer", use_cache=False) for _ in range(2)))
+
+    asyncio.run(run())
+    assert len(_setup) == 4
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    sf = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def run():
+        leader = asyncio.create_task(sf.do("k", work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(sf.do("k", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(run()) == (42, True)
+    assert len(sf) == 0
+
+
+def test_work_is_cancelled_when_the_last_caller_leaves():
+    sf = SingleFlight()
+    state = {"cancelled": False}
+
+    async def work():
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+
+    async def run():
+        callers = [asyncio.create_task(sf.do("k", work)) for _ in range(2)]
+        await asyncio.sleep(0)
+        callers[0].cancel()
+        await asyncio.sleep(0.01)
+        alive = not state["cancelled"]  # ein Aufrufer wartet noch
+        callers[1].cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+        return alive, state["cancelled"], len(sf)
+
+    assert asyncio.run(run()) == (True, True, 0)
+
+
+def test_different_candidate_counts_are_not_coalesced(_setup):
+    async def run():
+        return await asyncio.gather(
+            llm.agenerate_sparql_with_guardrails("Zeige alle Pfarrer"),
+            llm.agenerate_sparql_with_guardrails("Zeige alle Pfarrer", candidates=3),
+            llm.agenerate_sparql_with_guardrails("Zeige alle Pfarrer", candidates=1),
+        )
+
+    a, b, c = asyncio.run(run())
+    assert len(_setup) == 2
+    assert [a["coalesced"], b["coalesced"], c["coalesced"]] == [False, False, True]
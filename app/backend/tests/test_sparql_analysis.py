@@ -0,0 +1,58 @@
+from app.backend.config import get_settings
+from app.backend.routers.nl2sparql import _ensure_changes_graph, _is_update_query, _make_undo
+from app.backend.services.llm import _contains_disallowed
+from app.backend.services.pseudonymizer import mask_sparql_for_log
+from app.backend.services.sparql_analysis import analyze
+
+EX = "http://example.org/"
+PFX = f"PREFIX ex:<{EX}> PREFIX rdf:<http://www.w3.org/1999/02/22-rdf-syntax-ns#>\n"
+
+
+def test_analysis_collects_predicates_classes_and_prefixes():
+    a = analyze(PFX + 'INSERT DATA { <urn:s> a ex:Person ; ex:name "Max", "M." ; ex:knows [ ex:name "Anna"@de ] . }')
+    assert a.operation == "INSERT DATA" and a.is_update
+    assert a.prefixes["ex"] == EX and len(a.prefix_decls) == 2
+    assert a.classes == {EX + "Person"}
+    assert a.predicates == {EX + "name", EX + "knows"}
+
+
+def test_keywords_in_literals_and_names_are_not_matched():
+    q = PFX + 'SELECT ?s WHERE { ?s ex:address "ADD; DROP GRAPH <x>" . FILTER(?s != ex:copy) }'
+    a = analyze(q)
+    assert a.operation == "SELECT" and not a.is_update
+    assert _contains_disallowed(q) is None
+    assert not _is_update_query(q)
+    assert _contains_disallowed(PFX + "DROP GRAPH <urn:g>") == "DROP"
+
+
+def test_select_predicates_ignore_filters_values_and_graph_names():
+    q = PFX + """SELECT ?n WHERE {
+      VALUES ?t { ex:A ex:B }
+      GRAPH <urn:g> { ?s rdf:type ?t ; ex:name ?n . }
+      OPTIONAL { ?s ex:age ?age FILTER(?age > 3) }
+    } LIMIT 5"""
+    a = analyze(q)
+    assert a.predicates == {EX + "name", EX + "age"}
+    assert "urn:g" in a.graphs
+
+
+def test_ensure_changes_graph_and_undo():
+    g = get_settings().changes_graph
+    q = PFX + 'INSERT DATA { <urn:s> ex:name "x" . }'
+    wrapped = _ensure_changes_graph(q)
+    assert wrapped.startswith("PREFIX ex:")
+    assert analyze(wrapped).graphs == {g}
+    undo = _make_undo(wrapped)
+    assert analyze(undo).operation == "DELETE DATA"
+    assert f"GRAPH <{g}>" in undo and undo.startswith("PREFIX ex:")
+
+    modify = PFX + 'DELETE { ?s ex:name ?o } INSERT { ?s ex:name "y" } WHERE { ?s ex:name ?o }'
+    out = _ensure_changes_graph(modify)
+    assert out.index("PREFIX rdf:") < out.index(f"WITH <{g}>") < out.index("DELETE")
+    assert _make_undo(modify) is None
+
+
+def test_masking_uses_tokens():
+    masked = mask_sparql_for_log('INSERT DATA { <urn:x> voc:vorname "Max", """Moritz""" ; voc:nachname ?n ; voc:ort "Berlin" . }')
+    assert "Max" not in masked and "Moritz" not in masked
+    assert "?n" in masked and '"Berlin"' in masked
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from app.backend.services import llm
+from app.backend.services.ontology import OntologySnapshot, registry
+
+VOC = llm.VOC
+VALID = f"```sparql\nPREFIX voc:<{VOC}>\nSELECT ?v WHERE {{ ?p voc:vorname ?v . }}\n```"
+INVALID = f"```sparql\nPREFIX voc:<{VOC}>\nSELECT ?v WHERE {{ ?p voc:wohnort ?v . }}\n```"
+
+
+@pytest.fixture(autouse=True)
+def _snap():
+    registry.swap(OntologySnapshot.from_terms([VOC + "Pfarrer-in"], [VOC + "vorname", VOC + "nachname"]))
+    yield
+    registry.swap(None)
+
+
+def _fake(monkeypatch, script):
+    """script: je Kandidat (Temperatur-Index) -> (Verzögerung s, Antwort)."""
+    calls, cancelled = [], []
+
+    async def fake_complete(messages, usage, temperature=None):
+        i = len(calls)
+        calls.append(temperature)
+        delay, text = script[i]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(i)
+            raise
+        usage["prompt_tokens"] = usage.get("prompt_tokens", 0) + 100
+        usage["output_tokens"] = usage.get("output_tokens", 0) + 10
+        return text
+
+    monkeypatch.setattr(llm, "_acomplete", fake_complete)
+    return calls, cancelled
+
+
+def test_first_valid_candidate_wins_and_rest_is_cancelled(monkeypatch):
+    calls, cancelled = _fake(monkeypatch, [(0.05, INVALID), (0.01, VALID), (1.0, VALID)])
+    out = asyncio.run(llm.agenerate_sparql_with_guardrails("Zeige Vornamen", use_cache=False, candidates=3))
+    assert out["ok"] and out["attempts"] == 1 and "voc:vorname" in out["sparql"]
+    assert calls[0] is None and calls[1] == calls[2] and calls[1] > 0.2
+    assert sorted(cancelled) == [0, 2]
+    assert out["usage"]["candidates"] == 3 and out["usage"]["wasted_tokens"] == 0
+
+
+def test_all_candidates_invalid_falls_back_to_retry(monkeypatch):
+    calls, _ = _fake(monkeypatch, [(0.01, INVALID), (0.02, INVALID), (0.01, VALID)])
+    out = asyncio.run(llm.agenerate_sparql_with_guardrails("Zeige Wohnorte", use_cache=False, candidates=2))
+    assert len(calls) == 3 and out["attempts"] == 2 and out["ok"]
+    assert out["usage"]["wasted_tokens"] == 220
+
+
+def test_candidate_count_is_capped(monkeypatch):
+    monkeypatch.setenv("GEN_CANDIDATES_MAX", "2")
+    llm.get_settings.cache_clear()
+    try:
+        assert llm._candidate_count(8) == 2 and llm._candidate_count(None) == 1
+    finally:
+        monkeypatch.delenv("GEN_CANDIDATES_MAX")
+        llm.get_settings.cache_clear()
@@ -0,0 +1,50 @@
+import pytest
+
+from app.backend.services import validator
+from app.backend.services.ontology import OntologySnapshot, registry
+from app.backend.services.suggest import TrigramIndex
+
+EX = "http://example.org/"
+
+
+@pytest.fixture(autouse=True)
+def _snapshot():
+    registry.swap(OntologySnapshot.from_terms(
+        [EX + "Pfarrer-in", EX + "Gemeinde"],
+        [EX + "vorname", EX + "nachname", EX + "geburtsdatum", EX + "hatStelle"],
+        labels={EX + "hatStelle": ("Pfarrstelle",)},
+    ))
+    yield registry.snapshot()
+    registry.swap(None)
+
+
+def test_unknown_terms_carry_ranked_suggestions():
+    res = validator.validate(
+        f"PREFIX ex:<{EX}>\nSELECT * WHERE {{ ?s a ex:Pfarrerin ; ex:geburtsdatm ?d ; ex:stelle ?x . }}"
+    )
+    sug = res["suggestions"]
+    assert sug[EX + "Pfarrerin"][0]["iri"] == EX + "Pfarrer-in"
+    assert sug[EX + "geburtsdatm"][0]["iri"] == EX + "geburtsdatum"
+    assert sug[EX + "stelle"][0] == {"iri": EX + "hatStelle", "score": sug[EX + "stelle"][0]["score"], "label": "Pfarrstelle"}
+    assert any("meinten Sie <http://example.org/geburtsdatum>?" in w for w in res["warnings"])
+
+
+def test_index_is_built_once_per_snapshot_and_scores_sorted(_snapshot):
+    idx = TrigramIndex.for_snapshot(_snapshot, "property")
+    assert TrigramIndex.for_snapshot(_snapshot, "property") is idx
+    hits = idx.lookup("nachnahme")
+    assert hits[0][0] == EX + "nachname"
+    assert [s for _, s in hits] == sorted((s for _, s in hits), reverse=True)
+    assert idx.lookup("xyz") == []
+
+
+def test_prompt_selection_repair_and_suggestions_split_local_names_alike():
+    from app.backend.services import repair, term_index
+    from app.backend.services.suggest import local_key, local_name, namespace
+
+    assert term_index.local_name is local_name and repair.namespace is namespace
+    for uri, ns, local in ((EX + "Pfarrer-in", EX, "Pfarrer-in"),
+                           ("http://example.org/voc#hat_Stelle", "http://example.org/voc#", "hat_Stelle"),
+                           ("urn:voc:nachName", "urn:voc:", "nachName")):
+        assert (namespace(uri), local_name(uri)) == (ns, local)
+    assert local_key("urn:voc:nachName") == local_key(EX + "nach-name") == "nachname"
@@ -0,0 +1,43 @@
+from app.backend.services.ontology import OntologySnapshot
+from app.backend.services.term_index import TermIndex, select_terms
+
+VOC = "http://meta-pfarrerbuch.evangelische-archive.de/vocabulary#"
+CLASSES = [VOC + c for c in ("Gemeinde", "Kirche", "Ort", "Pfarrer-in", "Stelle")]
+PROPS = [VOC + p for p in ("geburtsdatum", "hatStelle", "istInGemeinde", "nachname", "sterbedatum", "vorname")] + \
+    [VOC + f"zusatz{i:03d}" for i in range(200)]
+
+
+def _snap():
+    return OntologySnapshot.from_terms(CLASSES, PROPS, {VOC + "Ort": ["Wohnort"]})
+
+
+def test_german_stems_prefixes_and_compounds_match():
+    scores = TermIndex.for_snapshot(_snap()).score("Zeige alle Pfarrerinnen mit Vornamen und ihrer Pfarrstelle PH1")
+    assert VOC + "Pfarrer-in" in scores
+    assert VOC + "vorname" in scores
+    assert VOC + "hatStelle" in scores
+    assert VOC + "sterbedatum" not in scores
+
+
+def test_hyphen_ellipsis_is_expanded():
+    scores = TermIndex.for_snapshot(_snap()).score("Zeige Pfarrer:innen mit Vor- und Nachnamen.")
+    assert VOC + "vorname" in scores and VOC + "nachname" in scores
+
+
+def test_labels_are_indexed():
+    scores = TermIndex.for_snapshot(_snap()).score("Lösche den Wohnort")
+    assert VOC + "Ort" in scores
+
+
+def test_select_terms_ranks_hits_first_and_respects_budget():
+    snap = _snap()
+    classes, props = select_terms(snap, "Ändere den Nachnamen", budget_tokens=40, max_classes=10, max_properties=10)
+    assert props[0] == VOC + "nachname"
+    assert len(props) <= 10
+    full_c, full_p = select_terms(snap, "Ändere den Nachnamen", budget_tokens=100000, max_classes=1000, max_properties=1000)
+    assert len(full_c) == len(CLASSES) and len(full_p) == len(PROPS)
+
+
+def test_index_is_built_once_per_snapshot():
+    snap = _snap()
+    assert TermIndex.for_snapshot(snap) is TermIndex.for_snapshot(snap)
@@ -1,17 +1,17 @@
 import pytest
 
 from app.backend.services import validator
+from app.backend.services.ontology import OntologySnapshot, registry
 
 
-def test_validator_warns_on_unknown_property(monkeypatch):
-    def fake_select(query: str):
-        if "?x" in query:
-            return {"results": {"bindings": [{"x": {"value": "http://example.org/Class"}}]}}
-        return {"results": {"bindings": [{"p": {"value": "http://example.org/prop"}}]}}
+@pytest.fixture(autouse=True)
+def _snapshot():
+    registry.swap(OntologySnapshot.from_terms(["http://example.org/Class"], ["http://example.org/prop"]))
+    yield
+    registry.swap(None)
 
-    monkeypatch.setattr(validator.sparql, "query_select", fake_select)
-    validator._allowed_sets.cache_clear()
 
+def test_validator_warns_on_unknown_property():
     res = validator.validate(
         "PREFIX ex:<http://example.org/>\nSELECT * WHERE { ?s ex:unknown ?o . }"
     )
@@ -19,15 +19,7 @@ def test_validator_warns_on_unknown_property(monkeypatch):
     assert any("Unbekanntes Property" in w for w in res["warnings"])
 
 
-def test_validator_recognises_known_terms(monkeypatch):
-    def fake_select(query: str):
-        if "?x" in query:
-            return {"results": {"bindings": [{"x": {"value": "http://example.org/Class"}}]}}
-        return {"results": {"bindings": [{"p": {"value": "http://example.org/prop"}}]}}
-
-    monkeypatch.setattr(validator.sparql, "query_select", fake_select)
-    validator._allowed_sets.cache_clear()
-
+def test_validator_recognises_known_terms():
     res = validator.validate(
         "PREFIX ex:<http://example.org/>\nSELECT * WHERE { ?s ex:prop ?o ; a <http://example.org/Class> . }"
     )
@@ -0,0 +1,112 @@
+"""
+Durchsatz-Benchmark der Guardrail-Pipeline gegen den lokalen LLM-Stub oder das Template-Backend.
+
+    PYTHONPATH=. python app/backend/tools/bench_generate.py --concurrency 1,8,32,64 --requests 128
+    PYTHONPATH=. python app/backend/tools/bench_generate.py --backend template   # ohne HTTP, nur Pipeline
+    PYTHONPATH=. python app/backend/tools/bench_generate.py --invalid-rate 0.2 --jitter 0.5 --candidates 2
+
+Vergleicht je Parallelität:
+  * threadpool – synchroner Aufruf im Starlette-Threadpool (40 Worker, neuer Client je Call;
+                 entspricht dem früheren `def generate`)
+  * async      – `agenerate_sparql_with_guardrails` auf einem Event-Loop mit langlebigem Client
+und gibt neben dem Durchsatz p50/p95 je Request aus (`--candidates` für spekulative Entwürfe).
+"""
+import argparse
+import asyncio
+import os
+import threading
+import time
+from typing import List, Tuple
+
+for k, v in {
+    "FUSEKI_BASE_URL": "http://127.0.0.1:3030", "FUSEKI_DATASET": "bench",
+    "FUSEKI_USER": "bench", "FUSEKI_PASSWORD": "bench",
+    "OPENAI_API_KEY": "sk-bench", "API_AUTH_TOKEN": "bench",
+}.items():
+    os.environ.setdefault(k, v)
+
+import anyio.to_thread  # noqa: E402
+import uvicorn  # noqa: E402
+
+from app.backend.config import get_settings  # noqa: E402
+from app.backend.services import llm  # noqa: E402
+from app.backend.services.ontology import OntologySnapshot, registry  # noqa: E402
+from app.backend.tools.llm_stub import create_app  # noqa: E402
+
+VOC = llm.VOC
+PROMPT = "Zeige alle Pfarrer mit Vor- und Nachnamen."
+
+
+def _start_stub(port: int, latency_ms: float, invalid_rate: float, jitter: float) -> uvicorn.Server:
+    app = create_app(latency_ms, invalid_rate=invalid_rate, jitter=jitter)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def _run(mode: str, n: int, conc: int, candidates: int) -> Tuple[float, List[float], int]:
+    sem = asyncio.Semaphore(conc)
+    lat: List[float] = []
+    ok = 0
+
+    async def one():
+        nonlocal ok
+        async with sem:
+            t = time.perf_counter()
+            if mode == "async":
+                out = await llm.agenerate_sparql_with_guardrails(PROMPT, use_cache=False, candidates=candidates)
+            else:
+                out = await anyio.to_thread.run_sync(
+                    lambda: llm.generate_sparql_with_guardrails(PROMPT, use_cache=False, candidates=candidates)
+                )
+            lat.append(time.perf_counter() - t)
+            ok += bool(out.get("ok"))
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(n)))
+    return time.perf_counter() - t0, sorted(lat), ok
+
+
+def _pct(sorted_vals: List[float], q: float) -> float:
+    return sorted_vals[min(len(sorted_vals) - 1, int(q * len(sorted_vals)))] * 1000.0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--concurrency", default="1,8,32,64")
+    ap.add_argument("--requests", type=int, default=128)
+    ap.add_argument("--latency-ms", type=float, default=500.0)
+    ap.add_argument("--port", type=int, default=9100)
+    ap.add_argument("--candidates", type=int, default=1)
+    ap.add_argument("--invalid-rate", type=float, default=0.0, help="Anteil ungültiger Stub-Entwürfe")
+    ap.add_argument("--jitter", type=float, default=0.0, help="Streuung der Stub-Latenz (±Anteil)")
+    ap.add_argument("--backend", choices=("openai", "openai_compat", "template"), default="openai",
+                    help="openai/openai_compat laufen gegen den lokalen Stub")
+    a = ap.parse_args()
+
+    os.environ["LLM_BACKEND"] = a.backend
+    os.environ["LLM_BASE_URL"] = f"http://127.0.0.1:{a.port}/v1"
+    os.environ["LLM_TEMPLATE_LATENCY_MS"] = str(a.latency_ms)
+    os.environ["GEN_CANDIDATES_MAX"] = str(max(1, a.candidates))
+    get_settings.cache_clear()
+    registry.swap(OntologySnapshot.from_terms([VOC + "Pfarrer-in"], [VOC + "vorname", VOC + "nachname"]))
+    server = _start_stub(a.port, a.latency_ms, a.invalid_rate, a.jitter) if a.backend != "template" else None
+
+    print(f"backend={a.backend} latency={a.latency_ms:.0f}ms requests={a.requests} "
+          f"candidates={a.candidates} invalid_rate={a.invalid_rate} jitter={a.jitter}")
+    print(f"{'conc':>5s} {'mode':>11s} {'total_s':>8s} {'req/s':>8s} {'p50_ms':>8s} {'p95_ms':>8s} {'ok':>5s}")
+    try:
+        for conc in [int(c) for c in a.concurrency.split(",")]:
+            for mode in ("threadpool", "async"):
+                dt, lat, ok = asyncio.run(_run(mode, a.requests, conc, a.candidates))
+                print(f"{conc:5d} {mode:>11s} {dt:8.2f} {a.requests / dt:8.1f} "
+                      f"{_pct(lat, 0.5):8.0f} {_pct(lat, 0.95):8.0f} {ok:5d}")
+    finally:
+        if server:
+            server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
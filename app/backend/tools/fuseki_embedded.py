@@ -0,0 +1,35 @@
+"""
+Lokaler Fuseki-Ersatz auf Basis von rdflib (kein Java, kein Netz) für Tests und Lasttests.
+
+    PYTHONPATH=. python app/backend/tools/fuseki_embedded.py --port 3030 vendor/pfarrerdaten
+    FUSEKI_BASE_URL=http://127.0.0.1:3030 FUSEKI_DATASET=combined uvicorn app.backend.main:app
+
+Lädt N-Triples/Turtle in den Default-Graph und N-Quads/TriG in ihre Named Graphs
+(Dateien oder Verzeichnisse, auch .gz) und beantwortet `/<dataset>/sparql`,
+`/<dataset>/update` und `/<dataset>/data` (Graph Store Protocol) wie Fuseki; der
+Dataset-Name im Pfad ist beliebig. Mit `--auth user:pass` verlangen Updates und
+schreibende `/data`-Zugriffe Basic Auth. Ohne Server im selben Prozess:
+`FUSEKI_BACKEND=embedded` (siehe `services/embedded_store.py`).
+"""
+import argparse
+import time
+
+from app.backend.services.embedded_store import EmbeddedStore, create_app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("paths", nargs="*", help="RDF-Dateien oder Verzeichnisse")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=3030)
+    ap.add_argument("--auth", default="", help="user:pass für Updates und schreibende /data-Zugriffe")
+    a = ap.parse_args()
+
+    store = EmbeddedStore()
+    t0 = time.perf_counter()
+    n = store.load(a.paths)
+    print(f"{n} Quads aus {len(a.paths)} Pfad(en) in {time.perf_counter() - t0:.1f} s geladen")
+    credentials = tuple(a.auth.split(":", 1)) if a.auth else None
+    uvicorn.run(create_app(store, credentials), host=a.host, port=a.port, log_level="warning")
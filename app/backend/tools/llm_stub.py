@@ -0,0 +1,146 @@
+"""
+Lokaler LLM-Stub für Last- und Latenztests (kein Netz, keine Kosten).
+
+    PYTHONPATH=. python app/backend/tools/llm_stub.py --port 9100 --latency-ms 800
+    LLM_BASE_URL=http://127.0.0.1:9100/v1 uvicorn app.backend.main:app
+
+Beantwortet POST /v1/responses (LLM_BACKEND=openai) und POST /v1/chat/completions
+(LLM_BACKEND=openai_compat) nach einer festen Wartezeit mit einem gültigen
+```sparql```-Block im Format der OpenAI Responses API. Mit `"stream": true`
+werden `response.output_text.delta`-Events (SSE) über die Wartezeit verteilt
+gesendet, gefolgt von einem Erklärtext nach dem Codeblock. `--invalid-rate` liefert
+anteilig Entwürfe mit unbekanntem Property, `--jitter` streut die Wartezeit (±Anteil) –
+für Einzelantworten und Streams gleichermaßen.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+VOC = "http://meta-pfarrerbuch.evangelische-archive.de/vocabulary#"
+STUB_SPARQL = f"""```sparql
+PREFIX voc:<{VOC}>
+
+SELECT ?person ?vor ?nach WHERE {{
+  ?person a voc:Pfarrer-in ;
+          voc:vorname ?vor ;
+          voc:nachname ?nach .
+}} LIMIT 20
+```"""
+STUB_INVALID = STUB_SPARQL.replace("voc:vorname", "voc:unbekanntesFeld")
+STUB_TRAILER = "\n\nDie Abfrage listet Pfarrer:innen mit Vor- und Nachnamen; LIMIT begrenzt die Ausgabe."
+
+
+def _sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+def _parts(text: str, chunk_chars: int = 12):
+    body = text + STUB_TRAILER
+    return [body[i:i + chunk_chars] for i in range(0, len(body), chunk_chars)]
+
+
+async def _stream(text: str, wait: float, prompt_chars: int):
+    chunks = _parts(text)
+    delay = wait / max(1, len(chunks))
+    item_id = f"msg_{uuid.uuid4().hex}"
+    yield _sse({"type": "response.created", "sequence_number": 0, "response": {"id": f"resp_{uuid.uuid4().hex}", "status": "in_progress", "output": []}})
+    for n, c in enumerate(chunks, start=1):
+        await asyncio.sleep(delay)
+        yield _sse({"type": "response.output_text.delta", "sequence_number": n, "item_id": item_id,
+                    "output_index": 0, "content_index": 0, "delta": c, "logprobs": []})
+    usage = {"input_tokens": prompt_chars // 4, "output_tokens": len(text) // 4, "total_tokens": (prompt_chars + len(text)) // 4}
+    yield _sse({"type": "response.completed", "sequence_number": len(chunks) + 1,
+                "response": {"id": item_id, "status": "completed", "output": [], "usage": usage}})
+
+
+def create_app(latency_ms: float = 800.0, text: str = STUB_SPARQL, invalid_rate: float = 0.0, jitter: float = 0.0) -> FastAPI:
+    app = FastAPI(title="LLM stub")
+
+    def draw():
+        wait = latency_ms * random.uniform(1.0 - jitter, 1.0 + jitter) / 1000.0
+        return wait, (STUB_INVALID if random.random() < invalid_rate else text)
+
+    @app.post("/v1/responses")
+    async def responses(req: Request):
+        body = await req.json()
+        # Stream und Einzelantwort mit derselben Wartezeit-/Fehlerverteilung (vergleichbare Messungen)
+        wait, answer = draw()
+        prompt_chars = sum(len(str(m.get("content", ""))) for m in body.get("input") or [])
+        if body.get("stream"):
+            return StreamingResponse(_stream(answer, wait, prompt_chars), media_type="text/event-stream")
+        await asyncio.sleep(wait)
+        return {
+            "id": f"resp_{uuid.uuid4().hex}",
+            "object": "response",
+            "created_at": int(time.time()),
+            "model": body.get("model", "stub"),
+            "status": "completed",
+            "output": [{
+                "type": "message",
+                "id": f"msg_{uuid.uuid4().hex}",
+                "status": "completed",
+                "role": "assistant",
+                "content": [{"type": "output_text", "text": answer, "annotations": []}],
+            }],
+            "parallel_tool_calls": False,
+            "tool_choice": "auto",
+            "tools": [],
+            "usage": {
+                "input_tokens": prompt_chars // 4,
+                "output_tokens": len(answer) // 4,
+                "total_tokens": (prompt_chars + len(answer)) // 4,
+            },
+        }
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(req: Request):
+        body = await req.json()
+        created, model = int(time.time()), body.get("model", "stub")
+        wait, answer = draw()
+        prompt_chars = sum(len(str(m.get("content", ""))) for m in body.get("messages") or [])
+        usage = {"prompt_tokens": prompt_chars // 4, "completion_tokens": len(answer) // 4,
+                 "total_tokens": (prompt_chars + len(answer)) // 4}
+        if body.get("stream"):
+            async def chunks():
+                parts = _parts(answer)
+                for c in parts:
+                    await asyncio.sleep(wait / len(parts))
+                    chunk = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": created, "model": model,
+                             "choices": [{"index": 0, "delta": {"content": c}, "finish_reason": None}]}
+                    yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                if (body.get("stream_options") or {}).get("include_usage"):
+                    last = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": created, "model": model,
+                            "choices": [], "usage": usage}
+                    yield f"data: {json.dumps(last, ensure_ascii=False)}\n\n"
+                yield "data: [DONE]\n\n"
+            return StreamingResponse(chunks(), media_type="text/event-stream")
+        await asyncio.sleep(wait)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": answer}}],
+            "usage": usage,
+        }
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=9100)
+    ap.add_argument("--latency-ms", type=float, default=800.0)
+    ap.add_argument("--invalid-rate", type=float, default=0.0)
+    ap.add_argument("--jitter", type=float, default=0.0)
+    a = ap.parse_args()
+    uvicorn.run(create_app(a.latency_ms, invalid_rate=a.invalid_rate, jitter=a.jitter), host=a.host, port=a.port, log_level="warning")
@@ -1,17 +1,31 @@
-import json, sys, statistics
+"""
+Latenz-Übersicht je Art und Pfad/Operation aus dem segmentierten Perf-Log.
+
+    PYTHONPATH=. python app/backend/tools/perf_report.py                  # alles
+    PYTHONPATH=. python app/backend/tools/perf_report.py --minutes 60     # nur die letzte Stunde
+
+Mit `--minutes` werden nur die Segmente geöffnet, die das Zeitfenster überlappen, und darin
+per Index an die passende Minute gesprungen; ein altes einzelnes `perf.jsonl` wird mitgelesen.
+Braucht keine Backend-Konfiguration; `--segment-minutes` muss nur zu LOG_SEGMENT_MINUTES des
+Schreibers passen (Vorauswahl der Segmente ohne Index).
+"""
+import argparse
+import os
+import time
 from collections import defaultdict
 
-f = sys.argv[1] if len(sys.argv) > 1 else "app/backend/logs/perf.jsonl"
-rows = []
-with open(f, "r", encoding="utf-8") as fh:
-    for line in fh:
-        try:
-            rows.append(json.loads(line))
-        except Exception:
-            pass
+from app.backend.services.segments import SegmentedLog
+
+ap = argparse.ArgumentParser()
+ap.add_argument("path", nargs="?", default="app/backend/logs/perf.jsonl")
+ap.add_argument("--minutes", type=int, default=0, help="nur die letzten N Minuten (0 = alles)")
+ap.add_argument("--segment-minutes", type=int, default=int(os.getenv("LOG_SEGMENT_MINUTES", "60")))
+a = ap.parse_args()
+since = time.time() - a.minutes * 60 if a.minutes > 0 else None
 
 groups = defaultdict(list)
-for r in rows:
+log = SegmentedLog(a.path, span_minutes=lambda: a.segment_minutes, compress=lambda: False)
+for r in log.read(since=since):
     key = (r.get("kind"), r.get("path") or r.get("op"))
     if "dur_ms" in r:
         groups[key].append(r["dur_ms"])
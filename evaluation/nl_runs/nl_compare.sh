@@ -28,7 +28,7 @@ for d in "$RUNS_DIR"/run_*; do
   run=$(basename "$d" | sed 's/run_//')
   for f in "$d"/gen_*.json; do
     [ -f "$f" ] || continue
-    row="$(jq -c "{run:.run, prompt_id:.prompt_id, kind:.kind, prompt:.prompt, sparql:(.sparql // \"\")}" "$f")"
+    row="$(jq -c "{run:.run, prompt_id:.prompt_id, kind:.kind, prompt:.prompt, sparql:(.sparql // \"\"), prompt_tokens:(.response.usage.prompt_tokens // null), prompt_chars:(.response.usage.prompt_chars // null)}" "$f")"
     s=$(echo "$row" | jq -r '.sparql')
     h=$(sha256 "$s")
     echo "$row" | jq --arg h "$h" '. + {sha256:$h}' >> "$OUT_SUMMARY"
@@ -82,7 +82,9 @@ jq -s '
     prompt_id: .[0].prompt_id,
     kind: (.[0].kind),
     n: length,
-    uniq: ( group_by(.sha256) | length )
+    uniq: ( group_by(.sha256) | length ),
+    prompt_tokens_avg: ( [ .[].prompt_tokens | select(. != null and . > 0) ] | if length > 0 then (add / length) else null end ),
+    prompt_chars_avg:  ( [ .[].prompt_chars  | select(. != null) ] | if length > 0 then (add / length) else null end )
   })
 ' "$OUT_SUMMARY" > "$OUT_PSTATS"
 
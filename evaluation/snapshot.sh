@@ -7,6 +7,8 @@ OUT_DIR="evaluation"
 RUNS_DIR="$OUT_DIR/nl_runs"
 RUNS="${RUNS:-5}"             # Anzahl Wiederholungen, z.B. 5 oder 10
 SELECT_LIMIT="${SELECT_LIMIT:-0}"  # 0 = ohne extra LIMIT injizieren
+BATCH="${BATCH:-0}"           # 1 = alle Prompts eines Runs über /nl2sparql/generate/batch
+BATCH_CONCURRENCY="${BATCH_CONCURRENCY:-4}"
 
 mkdir -p "$RUNS_DIR"
 
@@ -39,6 +41,13 @@ call_generate() {
   || echo '{}'
 }
 
+call_generate_batch() {
+  curl -s -X POST "$BASE/nl2sparql/generate/batch" \
+    -H 'Content-Type: application/json' \
+    -d "$(echo "$PROMPTS_JSON" | jq --argjson c "$BATCH_CONCURRENCY" '{items: map({text}), concurrency: $c}')" \
+  || echo '{}'
+}
+
 call_select() {
   local sparql="$1"
   curl -s -X POST "$BASE/nl2sparql/select" \
@@ -78,6 +87,11 @@ for r in $(seq 1 "$RUNS"); do
   mkdir -p "$RDIR"
   echo "  • Run $r → $RDIR"
 
+  BATCH_RAW='{}'
+  if [ "$BATCH" = "1" ]; then
+    BATCH_RAW="$(call_generate_batch)"
+  fi
+
   idx=0
   echo "$PROMPTS_JSON" | jq -c '.[]' | while read -r P; do
     idx=$((idx+1))
@@ -85,8 +99,12 @@ for r in $(seq 1 "$RUNS"); do
     kind=$(echo "$P" | jq -r '.kind')
     text=$(echo "$P" | jq -r '.text')
 
-    # 2.1 Generate
-    GEN_RAW="$(call_generate "$text")"
+    # 2.1 Generate (einzeln oder aus dem Batch-Ergebnis)
+    if [ "$BATCH" = "1" ]; then
+      GEN_RAW="$(echo "$BATCH_RAW" | jq -c --argjson i "$((idx-1))" '(.items // [])[$i] // {}')"
+    else
+      GEN_RAW="$(call_generate "$text")"
+    fi
     SPARQL=$(echo "$GEN_RAW" | jq -r "$jq_sparql")
 
     # Optional: deterministisches LIMIT für SELECT hinzufügen (Varianz senken)
@@ -102,7 +102,13 @@ export async function executeToken(token: string): Promise<ExecuteResponse> {
 }
 export async function runSelect(
   sparqlText: string
-): Promise<{ ok: boolean; results: SPARQLSelectJSON }> {
+): Promise<{
+  ok: boolean;
+  results: SPARQLSelectJSON;
+  truncated?: boolean;
+  truncated_by?: "rows" | "bytes" | null;
+  limit?: { value: number | null; action: "kept" | "injected" | "clamped" | "none" };
+}> {
   const r = await api().post("/nl2sparql/select", { sparql: sparqlText });
   return r.data;
 }
@@ -22,6 +22,7 @@ export interface ValidationResult {
   errors: string[];
   warnings: string[];
   used_uris: { classes: string[]; properties: string[] };
+  suggestions?: Record<string, { iri: string; score: number; label?: string | null }[]>;
 }
 
 export interface ExplainResult {
@@ -53,6 +54,9 @@ export interface GenerateResponse {
   confirm_token: string;
   ttl_seconds: number;
   attempts: number;
+  repair?: { path: "none" | "local" | "llm"; fixes: string[] } | null;
+  cached?: boolean;
+  coalesced?: boolean;
 }
 
 export interface SPARQLBinding {
@@ -77,6 +81,7 @@ export interface LogRecord {
 }
 export interface LogsRecent {
   items: LogRecord[];
+  next_before?: string | null;
 }
 
 export interface UndoRequest {
@@ -92,6 +97,8 @@ export type PerfStats = {
   n: number;
   p50_ms: number;
   p95_ms: number;
+  p99_ms?: number;
+  p999_ms?: number;
   max_ms: number;
 };
 
@@ -100,4 +107,6 @@ export type PerfMetrics = {
   http: PerfStats;
   fuseki: { select: PerfStats; update: PerfStats };
   top_http_paths: { path: string; count: number }[];
+  paths?: Record<string, PerfStats>;
+  ops?: Record<string, Record<string, PerfStats>>;
 };